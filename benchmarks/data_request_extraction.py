@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the extraction of data request outputs from large response bodies, before and after compiling them.
+
+Usage: PYTHONPATH=. python benchmarks/data_request_extraction.py [--items 100 10000] [--outputs 10 200] [--seconds 0.5]
+"""
+
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Callable
+from unittest.mock import MagicMock
+
+from packages.eightballer.skills.rust_broker.strategy import DataRequestModel
+
+
+def make_body(items: int) -> bytes:
+    """Build a response with a dict of markets and a list of items, prices as numeric strings and floats."""
+    body = {
+        "markets": {
+            f"market{index}": {"price": f"{index}.{index:05d}", "volume": index * 1.25} for index in range(items)
+        },
+        "items": [{"id": index, "price": {"usd": str(index / 7)}} for index in range(items)],
+    }
+    return json.dumps(body).encode("utf-8")
+
+
+def make_outputs(items: int, outputs: int) -> List[Dict[str, str]]:
+    """Spread outputs across the markets, keyed by dotted paths the legacy extraction can follow too."""
+    step = max(items // outputs, 1)
+    return [
+        {"name": f"output{index}", "json_path": f"markets.market{(index * step) % items}.price"}
+        for index in range(outputs)
+    ]
+
+
+def legacy_extract(body: bytes, outputs: List[Dict[str, str]], decimals: int) -> Dict[str, Any]:
+    """Extract outputs as the handlers did, finding each dotted path and converting numbers through a float."""
+
+    def find(dotted_path: str, data: Dict[str, Any]) -> Any:
+        value = data
+        for key in dotted_path.split("."):
+            value = value.get(key, {})
+        return None if value == {} else value
+
+    def is_number(value: Any) -> bool:
+        if value is None:
+            return False
+        try:
+            float(value)
+            return True
+        except ValueError:
+            return False
+
+    data = json.loads(body)
+    observations = {}
+    for output in outputs:
+        value = find(output["json_path"], data)
+        if is_number(value):
+            observations[output["name"]] = {"value": int(float(value) * 10**decimals), "decimals": decimals}
+        elif isinstance(value, str):
+            observations[output["name"]] = {"value": value}
+    return observations
+
+
+def rate(function: Callable[[], object], seconds: float) -> float:
+    """Call a function repeatedly for a while and return the calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        function()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 10000], help="markets and items in a body")
+    parser.add_argument("--outputs", type=int, nargs="+", default=[10, 200], help="outputs extracted per body")
+    parser.add_argument("--seconds", type=float, default=0.5, help="seconds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'items':>8}{'body KiB':>10}{'outputs':>9}{'legacy/s':>12}{'compiled/s':>12}{'speedup':>9}")
+    for items in args.items:
+        body = make_body(items)
+        for outputs in args.outputs:
+            specs = make_outputs(items, outputs)
+            model = DataRequestModel(name="data_request_model", skill_context=MagicMock(), outputs=specs)
+            legacy_rate = rate(lambda: legacy_extract(body, specs, model.decimals), args.seconds)  # noqa: B023
+            compiled_rate = rate(lambda: model.extract(body), args.seconds)  # noqa: B023
+            print(
+                f"{items:>8}{len(body) / 1024:>10.0f}{outputs:>9}{legacy_rate:>12.0f}{compiled_rate:>12.0f}"
+                f"{compiled_rate / legacy_rate:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
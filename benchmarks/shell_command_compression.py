@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the envelope size and end-to-end latency of plain and compressed shell_command results.
+
+Usage: PYTHONPATH=. python benchmarks/shell_command_compression.py [--sizes-kb 16 256 1024 8192] [--repeats 5]
+"""
+
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from typing import Dict
+from unittest.mock import MagicMock
+
+from aea.identity.base import Identity
+from aea.configurations.base import ConnectionConfig
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.compression import read_output
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer
+from packages.eightballer.connections.shell_command.connection import ShellCommandConnection
+from benchmarks.skill_dialogues import SkillDialogues, envelope_it
+
+
+
+
+def write_log(path: str, size: int) -> None:
+    """Write output in the shape of broker debug logs, with changing fields so that it is not trivially compressible."""
+    lines, written, i = [], 0, 0
+    while written < size:
+        i += 1
+        timestamp = f"2024-05-01T12:{i // 60 % 60:02d}:{i % 60:02d}Z"
+        line = f"{timestamp} DEBUG broker::scores provider={i * 7919 % 10007} score=0.{i}\n"
+        lines.append(line)
+        written += len(line)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("".join(lines)[:size])
+
+
+async def measure(size: int, compress: bool, repeats: int) -> Dict[str, float]:
+    """Run a command producing the given output size and time it from request to decoded output."""
+    with tempfile.NamedTemporaryFile(suffix=".log") as log:
+        write_log(log.name, size)
+        return await measure_log(log.name, size, compress, repeats)
+
+
+async def measure_log(path: str, size: int, compress: bool, repeats: int) -> Dict[str, float]:
+    """Cat a log through the connection and time it from request to decoded output."""
+    configuration = ConnectionConfig(
+        connection_id=ShellCommandConnection.connection_id,
+        restricted_to_protocols={ShellCommandMessage.protocol_id},
+        stdout_buffer_size=size,
+        compression_threshold=0,
+    )
+    identity = Identity("bench", address="bench_address", public_key="bench_public_key")
+    connection = ShellCommandConnection(configuration=configuration, data_dir=MagicMock(), identity=identity)
+    await connection.connect()
+    dialogues = SkillDialogues("eightballer/bench_skill:0.1.0")
+    latencies, envelope_bytes = [], 0
+    for _ in range(repeats):
+        request, _ = dialogues.create(
+            counterparty=str(ShellCommandConnection.connection_id),
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command="cat",
+            args=(path,),
+            options={},
+            await_completion=True,
+            compress_output=compress,
+        )
+        start = time.perf_counter()
+        await connection.send(envelope_it(request))
+        result = (await connection.receive()).message
+        # what crosses a process boundary: the encoded envelope, decoded and read on the other side
+        encoded = ShellCommandSerializer.encode(result)
+        stdout, _ = read_output(ShellCommandSerializer.decode(encoded))
+        latencies.append(time.perf_counter() - start)
+        envelope_bytes = len(encoded)
+        assert len(stdout) == size
+    await connection.disconnect()
+    return {"envelope_bytes": envelope_bytes, "latency_ms": statistics.median(latencies) * 1e3}
+
+
+def main() -> None:
+    """Run the benchmark over growing outputs and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[16, 256, 1024, 8192], help="output sizes in KiB")
+    parser.add_argument("--repeats", type=int, default=5, help="commands per measurement")
+    args = parser.parse_args()
+
+    print(f"{'output KiB':>10}  {'result':<12}{'envelope KiB':>14}{'latency ms':>12}")
+    for size_kb in args.sizes_kb:
+        for name, compress in (("plain", False), ("compressed", True)):
+            result = asyncio.run(measure(size_kb * 1024, compress, args.repeats))
+            print(f"{size_kb:>10}  {name:<12}{result['envelope_bytes'] / 1024:>14.1f}{result['latency_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
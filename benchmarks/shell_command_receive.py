@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the idle cost and delivery latency of the shell_command receive path.
+
+Usage: PYTHONPATH=. python benchmarks/shell_command_receive.py [--idle 2.0] [--envelopes 500]
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Any, List, Optional
+from unittest.mock import MagicMock
+
+from aea.mail.base import Envelope
+from aea.identity.base import Identity
+from aea.configurations.base import ConnectionConfig
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.connections.shell_command.connection import ShellCommandConnection
+
+
+class PollingShellCommandConnection(ShellCommandConnection):
+    """The receive path as it was before, returning None whenever the in-queue is empty."""
+
+    async def receive(self, *args: Any, **kwargs: Any) -> Optional[Envelope]:
+        """Poll the in-queue without waiting."""
+        del args, kwargs
+        self._ensure_connected()
+        try:
+            return self.channel._in_queue.get_nowait()  # pylint: disable=protected-access
+        except asyncio.QueueEmpty:
+            return None
+
+
+def make_connection(connection_class: type) -> ShellCommandConnection:
+    """Build a connection outside of an agent."""
+    configuration = ConnectionConfig(
+        connection_id=ShellCommandConnection.connection_id,
+        restricted_to_protocols={ShellCommandMessage.protocol_id},
+    )
+    identity = Identity("bench", address="bench_address", public_key="bench_public_key")
+    return connection_class(configuration=configuration, data_dir=MagicMock(), identity=identity)
+
+
+async def receiving_loop(connection: ShellCommandConnection, received: List[float], stop: asyncio.Event) -> None:
+    """Mirror the multiplexer receiving loop: one receive task per connection, re-armed on completion."""
+    stopped = asyncio.ensure_future(stop.wait())
+    while not stop.is_set():
+        task = asyncio.ensure_future(connection.receive())
+        done, _ = await asyncio.wait({task, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        if task not in done:
+            task.cancel()
+            break
+        envelope = task.result()
+        if envelope is not None:
+            received.append(time.perf_counter() - envelope)
+
+
+async def measure(connection_class: type, idle_seconds: float, n_envelopes: int) -> dict:
+    """Measure idle CPU time and put-to-receive latency for a connection class."""
+    connection = make_connection(connection_class)
+    await connection.connect()
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    loop_task = asyncio.ensure_future(receiving_loop(connection, latencies, stop))
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(idle_seconds)
+    idle_cpu = (time.process_time() - cpu_start) / idle_seconds
+
+    for _ in range(n_envelopes):
+        # the envelope stand-in carries its enqueue timestamp
+        connection.channel._in_queue.put_nowait(time.perf_counter())  # pylint: disable=protected-access
+        await asyncio.sleep(0.001)
+    while len(latencies) < n_envelopes:
+        await asyncio.sleep(0.01)
+
+    stop.set()
+    await loop_task
+    await connection.disconnect()
+    latencies.sort()
+    return {
+        "idle_cpu_percent": idle_cpu * 100,
+        "latency_p50_us": statistics.median(latencies) * 1e6,
+        "latency_p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=2.0, help="seconds to sit idle")
+    parser.add_argument("--envelopes", type=int, default=500, help="envelopes to deliver")
+    args = parser.parse_args()
+
+    results = {
+        "polling (before)": asyncio.run(measure(PollingShellCommandConnection, args.idle, args.envelopes)),
+        "awaiting (after)": asyncio.run(measure(ShellCommandConnection, args.idle, args.envelopes)),
+    }
+    print(f"{'receive path':<20}{'idle cpu %':>12}{'p50 us':>12}{'p99 us':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<20}{result['idle_cpu_percent']:>12.1f}"
+            f"{result['latency_p50_us']:>12.1f}{result['latency_p99_us']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the generated and the fast-path shell_command serializers across payload sizes.
+
+Usage: PYTHONPATH=. python benchmarks/shell_command_serializer.py [--sizes 64 4096 65536] [--seconds 0.5]
+"""
+
+import time
+import argparse
+from typing import Callable
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer
+from packages.eightballer.protocols.shell_command.fast_serialization import FastShellCommandSerializer
+
+
+def make_message(size: int) -> ShellCommandMessage:
+    """Build an output chunk carrying a payload of the given size, as the connection streams them."""
+    return ShellCommandMessage(
+        performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+        dialogue_reference=("a" * 32, "b" * 32),
+        message_id=7,
+        target=6,
+        stdout="x" * size,
+        stderr="",
+        sequence=3,
+    )
+
+
+def rate(function: Callable[[], object], seconds: float) -> float:
+    """Call a function repeatedly for a while and return the calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            function()
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 4096, 65536], help="payload sizes in bytes")
+    parser.add_argument("--seconds", type=float, default=0.5, help="seconds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'payload':>10}{'codec':>16}{'encode/s':>12}{'decode/s':>12}")
+    for size in args.sizes:
+        message = make_message(size)
+        encoded = ShellCommandSerializer.encode(message)
+        assert FastShellCommandSerializer.encode(message) == encoded
+        codecs = {
+            "generated": (ShellCommandSerializer.encode, ShellCommandSerializer.decode),
+            "fast": (FastShellCommandSerializer.encode, FastShellCommandSerializer.decode),
+            "fast trusted": (
+                FastShellCommandSerializer.encode,
+                lambda data: FastShellCommandSerializer.decode(data, trusted=True),
+            ),
+        }
+        for name, (encode, decode) in codecs.items():
+            encode_rate = rate(lambda: encode(message), args.seconds)  # pylint: disable=cell-var-from-loop
+            decode_rate = rate(lambda: decode(encoded), args.seconds)  # pylint: disable=cell-var-from-loop
+            print(f"{size:>10}{name:>16}{encode_rate:>12.0f}{decode_rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
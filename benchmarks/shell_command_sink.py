@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the agent CPU spent on the output of a chatty child, buffered in Python versus sunk to log files.
+
+Usage: PYTHONPATH=. python benchmarks/shell_command_sink.py [--megabytes 256]
+"""
+
+import time
+import asyncio
+import resource
+import argparse
+import tempfile
+from typing import Dict
+from pathlib import Path
+
+from packages.eightballer.connections.shell_command.sinks import OutputSink
+from packages.eightballer.connections.shell_command.buffers import ProcessOutput
+from packages.eightballer.connections.shell_command.process import ChildProcess
+from packages.eightballer.connections.shell_command.connection import (
+    DEFAULT_READ_SIZE,
+    DEFAULT_STDERR_BUFFER_SIZE,
+    DEFAULT_STDOUT_BUFFER_SIZE,
+)
+
+
+async def buffered(argv: list) -> None:
+    """Read the output into the ring buffers, as the connection does without a sink."""
+    process = await ChildProcess.spawn(argv)
+    output = ProcessOutput(DEFAULT_STDOUT_BUFFER_SIZE, DEFAULT_STDERR_BUFFER_SIZE)
+
+    async def read(stream, name):
+        while True:
+            data = await stream.read(DEFAULT_READ_SIZE)
+            if not data:
+                return
+            output.write(name, data)
+
+    await asyncio.gather(read(process.stdout, "stdout"), read(process.stderr, "stderr"), process.wait())
+
+
+async def sunk(argv: list, directory: str) -> None:
+    """Splice the output into rotating log files."""
+    process = await ChildProcess.spawn(argv, connect=False)
+    sink = OutputSink(Path(directory) / "bench", 64 * 1024 * 1024, 2)
+    await asyncio.gather(sink.drain(process.pipes), process.wait())
+
+
+def measure(coroutine) -> Dict[str, float]:
+    """Measure the wall, user and system time of the agent over a run."""
+    wall, before = time.perf_counter(), resource.getrusage(resource.RUSAGE_SELF)
+    asyncio.run(coroutine)
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "wall": time.perf_counter() - wall,
+        "user": after.ru_utime - before.ru_utime,
+        "system": after.ru_stime - before.ru_stime,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=256, help="output the child writes")
+    args = parser.parse_args()
+    argv = ["sh", "-c", f"yes 'a chatty log line from the child process' | head -c {args.megabytes * 1024 * 1024}"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {"buffered": measure(buffered(argv)), "sink": measure(sunk(argv, directory))}
+    print(f"{'output path':<12}{'wall s':>10}{'user s':>10}{'system s':>10}{'MB/s':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<12}{result['wall']:>10.2f}{result['user']:>10.3f}{result['system']:>10.3f}"
+            f"{args.megabytes / result['wall']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
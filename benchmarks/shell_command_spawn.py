@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Benchmark the launch latency and spawn rate of shell_command processes, direct and via the spawn server.
+
+Usage: PYTHONPATH=. python benchmarks/shell_command_spawn.py [--spawns 200] [--heap-mb 0 512 2048]
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Any, Dict, List, Callable, Awaitable
+
+from packages.eightballer.connections.shell_command.process import ChildProcess, SpawnServer
+
+
+COMMAND = ["true"]
+
+
+async def measure(spawn: Callable[..., Awaitable[ChildProcess]], n_spawns: int) -> Dict[str, float]:
+    """Measure launch latency and the rate of spawn-and-reap cycles."""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(n_spawns):
+        launched = time.perf_counter()
+        process = await spawn(COMMAND)
+        latencies.append(time.perf_counter() - launched)
+        await process.wait()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "spawns_per_second": n_spawns / elapsed,
+        "launch_p50_us": statistics.median(latencies) * 1e6,
+        "launch_p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+async def run(n_spawns: int) -> Dict[str, Dict[str, float]]:
+    """Measure both spawn paths with the current heap."""
+    spawn_server = SpawnServer()
+    await spawn_server.start()
+    try:
+        return {
+            "direct": await measure(ChildProcess.spawn, n_spawns),
+            "spawn server": await measure(spawn_server.spawn, n_spawns),
+        }
+    finally:
+        await spawn_server.stop()
+
+
+def main() -> None:
+    """Run the benchmark over growing heaps and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spawns", type=int, default=200, help="processes to spawn per measurement")
+    parser.add_argument("--heap-mb", type=int, nargs="+", default=[0, 512, 2048], help="agent heap sizes to test")
+    args = parser.parse_args()
+
+    print(f"{'heap MB':>8}  {'spawn path':<14}{'spawns/s':>10}{'p50 us':>10}{'p99 us':>10}")
+    heap: List[Any] = []
+    for heap_mb in sorted(args.heap_mb):
+        # touch the pages so that they are mapped and have to be copied on fork
+        while len(heap) < heap_mb:
+            heap.append(bytearray(b"x" * 1024 * 1024))
+        for name, result in asyncio.run(run(args.spawns)).items():
+            print(
+                f"{heap_mb:>8}  {name:<14}{result['spawns_per_second']:>10.1f}"
+                f"{result['launch_p50_us']:>10.1f}{result['launch_p99_us']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
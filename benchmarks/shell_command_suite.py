@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Run the shell_command benchmark suite, write its results as JSON and check them against a baseline.
+
+The suite covers message construction and consistency checks, serializer encode and decode across payload sizes,
+dialogue update throughput, and the spawn rate, time to first output and output throughput of the connection.
+
+Usage:
+    PYTHONPATH=. python benchmarks/shell_command_suite.py --output results.json
+    PYTHONPATH=. python benchmarks/shell_command_suite.py --output new.json --baseline results.json
+
+With a baseline, the run fails when a metric is worse than the baseline by more than its regression threshold.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+from typing import Any, Dict, List, Tuple, Callable
+from unittest.mock import MagicMock
+
+from aea.identity.base import Identity
+from aea.configurations.base import ConnectionConfig
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer
+from packages.eightballer.connections.shell_command.connection import (
+    ShellCommandConnection,
+    ShellCommandDialogues as ConnectionDialogues,
+)
+from benchmarks.skill_dialogues import SkillDialogues, envelope_it
+
+
+SKILL_ADDRESS = "eightballer/bench_skill:0.1.0"
+PAYLOAD_SIZES = (64, 4096, 65536)
+HIGHER, LOWER = "higher", "lower"
+
+# allowed regression, as a fraction of the baseline, by metric prefix; the longest matching prefix wins
+REGRESSION_THRESHOLDS = {
+    "": 0.15,
+    "channel.": 0.30,
+    "channel.first_output": 0.50,
+}
+
+Metrics = Dict[str, Tuple[float, str]]
+
+
+def rate(function: Callable[[], Any], seconds: float) -> float:
+    """Call a function repeatedly for a while and return the calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            function()
+        calls += 50
+    return calls / (time.perf_counter() - start)
+
+
+def output_chunk(size: int, **kwargs: Any) -> ShellCommandMessage:
+    """Build an output chunk carrying a payload of the given size."""
+    return ShellCommandMessage(
+        performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+        stdout="x" * size,
+        stderr="",
+        sequence=1,
+        **kwargs,
+    )
+
+
+def bench_messages(seconds: float) -> Metrics:
+    """Measure message construction, which includes the consistency checks, and the checks alone."""
+    request = ShellCommandMessage(
+        performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+        command="sh",
+        args=("-c", "true"),
+        options={},
+        await_completion=True,
+    )
+    return {
+        "message.construct_output_chunk_per_s": (rate(lambda: output_chunk(64), seconds), HIGHER),
+        "message.is_consistent_execute_command_per_s": (
+            rate(request._is_consistent, seconds),  # pylint: disable=protected-access
+            HIGHER,
+        ),
+    }
+
+
+def bench_serializer(seconds: float) -> Metrics:
+    """Measure serializer encode and decode across payload sizes."""
+    metrics: Metrics = {}
+    for size in PAYLOAD_SIZES:
+        message = output_chunk(size, dialogue_reference=("a" * 32, "b" * 32), message_id=2, target=1)
+        encoded = ShellCommandSerializer.encode(message)
+        # pylint: disable=cell-var-from-loop
+        encode_rate = rate(lambda: ShellCommandSerializer.encode(message), seconds)
+        decode_rate = rate(lambda: ShellCommandSerializer.decode(encoded), seconds)
+        metrics[f"serializer.encode_{size}_per_s"] = (encode_rate, HIGHER)
+        metrics[f"serializer.decode_{size}_per_s"] = (decode_rate, HIGHER)
+    return metrics
+
+
+def bench_dialogues(n_dialogues: int, replies: int) -> Metrics:
+    """Measure dialogue updates, with the skill and the connection exchanging a request, chunks and a result."""
+    skill = SkillDialogues(SKILL_ADDRESS)
+    connection = ConnectionDialogues(str(ShellCommandConnection.connection_id))
+    updates = 0
+    start = time.perf_counter()
+    for _ in range(n_dialogues):
+        request, _ = skill.create(
+            counterparty=str(ShellCommandConnection.connection_id),
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command="true",
+            args=(),
+            options={},
+        )
+        dialogue = connection.update(request)
+        for sequence in range(1, replies + 1):
+            chunk = dialogue.reply(
+                performative=ShellCommandMessage.Performative.OUTPUT_CHUNK, stdout="x", stderr="", sequence=sequence
+            )
+            skill.update(chunk)
+        result = dialogue.reply(
+            performative=ShellCommandMessage.Performative.COMMAND_RESULT, stdout="", stderr="", exit_code=0
+        )
+        skill.update(result)
+        # every message is an update on the side sending it and on the side receiving it
+        updates += 2 * (replies + 2)
+    return {"dialogues.updates_per_s": (updates / (time.perf_counter() - start), HIGHER)}
+
+
+async def bench_channel(n_spawns: int, output_mb: int) -> Metrics:
+    """Measure spawn rate, time to first output and output throughput through the connection."""
+    configuration = ConnectionConfig(
+        connection_id=ShellCommandConnection.connection_id,
+        restricted_to_protocols={ShellCommandMessage.protocol_id},
+    )
+    identity = Identity("bench", address="bench_address", public_key="bench_public_key")
+    connection = ShellCommandConnection(configuration=configuration, data_dir=MagicMock(), identity=identity)
+    await connection.connect()
+    dialogues = SkillDialogues(SKILL_ADDRESS)
+
+    async def execute(command: str, *args: str, **kwargs: Any) -> None:
+        request, _ = dialogues.create(
+            counterparty=str(ShellCommandConnection.connection_id),
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command=command,
+            args=args,
+            options={},
+            **kwargs,
+        )
+        await connection.send(envelope_it(request))
+
+    async def receive() -> ShellCommandMessage:
+        return (await asyncio.wait_for(connection.receive(), timeout=60)).message
+
+    try:
+        start = time.perf_counter()
+        for _ in range(n_spawns):
+            await execute("true", await_completion=True)
+        for _ in range(n_spawns):
+            await receive()
+        spawns_per_s = n_spawns / (time.perf_counter() - start)
+
+        first_output: List[float] = []
+        for _ in range(20):
+            start = time.perf_counter()
+            await execute("sh", "-c", "echo ready; sleep 0.2", stream_output=True)
+            message = await receive()
+            first_output.append(time.perf_counter() - start)
+            while message.performative == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                message = await receive()
+
+        with tempfile.NamedTemporaryFile() as output:
+            output.write(b"x" * 1024 * 1024 * output_mb)
+            output.flush()
+            received = 0
+            start = time.perf_counter()
+            await execute("cat", output.name, stream_output=True)
+            message = await receive()
+            while message.performative == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                received += len(message.stdout)
+                message = await receive()
+            output_mb_per_s = received / 1024 / 1024 / (time.perf_counter() - start)
+    finally:
+        await connection.disconnect()
+    return {
+        "channel.spawns_per_s": (spawns_per_s, HIGHER),
+        "channel.first_output_p50_ms": (statistics.median(first_output) * 1e3, LOWER),
+        "channel.output_mb_per_s": (output_mb_per_s, HIGHER),
+    }
+
+
+def threshold(metric: str) -> float:
+    """Get the allowed regression of a metric."""
+    prefix = max((prefix for prefix in REGRESSION_THRESHOLDS if metric.startswith(prefix)), key=len)
+    return REGRESSION_THRESHOLDS[prefix]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Compare results with a baseline, returning the regressions."""
+    regressions = []
+    for metric, result in results["metrics"].items():
+        if metric not in baseline["metrics"]:
+            continue
+        value, expected = result["value"], baseline["metrics"][metric]["value"]
+        change = (value - expected) / expected if result["direction"] == HIGHER else (expected - value) / expected
+        if change < -threshold(metric):
+            regressions.append(f"{metric}: {value:.4g} against {expected:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    """Run the suite, write the results and check them against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--seconds", type=float, default=0.5, help="seconds per throughput measurement")
+    parser.add_argument("--dialogues", type=int, default=2000, help="dialogues to run through the dialogues")
+    parser.add_argument("--spawns", type=int, default=200, help="commands to run through the connection")
+    parser.add_argument("--output-mb", type=int, default=64, help="MiB of output to stream through the connection")
+    args = parser.parse_args()
+
+    metrics: Metrics = {}
+    metrics.update(bench_messages(args.seconds))
+    metrics.update(bench_serializer(args.seconds))
+    metrics.update(bench_dialogues(args.dialogues, replies=4))
+    metrics.update(asyncio.run(bench_channel(args.spawns, args.output_mb)))
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": {metric: {"value": value, "direction": direction} for metric, (value, direction) in metrics.items()},
+    }
+
+    for metric, (value, direction) in metrics.items():
+        print(f"{metric:<48}{value:>14.1f}  ({direction} is better)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
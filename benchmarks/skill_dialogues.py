@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""The skill side of shell_command dialogues, shared by the benchmarks driving the connection."""
+
+from typing import Any
+
+from aea.common import Address
+from aea.mail.base import Message, Envelope
+from aea.protocols.dialogue.base import Dialogue as BaseDialogue
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.dialogues import ShellCommandDialogue, BaseShellCommandDialogues
+
+
+def envelope_it(message: ShellCommandMessage) -> Envelope:
+    """Envelope a message sent by the skill."""
+    return Envelope(to=message.to, sender=message.sender, message=message)
+
+
+class SkillDialogues(BaseShellCommandDialogues):
+    """The shell_command dialogues of a skill requesting commands from the connection."""
+
+    def __init__(self, self_address: Address, **kwargs: Any) -> None:
+        """
+        Initialise the dialogues.
+
+        :param self_address: the address of the skill.
+        :param kwargs: keyword arguments.
+        """
+
+        def role_from_first_message(message: Message, receiver_address: Address) -> BaseDialogue.Role:
+            """Infer the role of the skill, which is always the one requesting commands."""
+            del message, receiver_address
+            return ShellCommandDialogue.Role.CLI_SHELL
+
+        BaseShellCommandDialogues.__init__(
+            self, self_address=self_address, role_from_first_message=role_from_first_message, **kwargs
+        )
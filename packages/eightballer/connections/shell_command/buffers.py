@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""Bounded capture and chunking of process output for the Shell Command connection."""
+
+import codecs
+import asyncio
+from typing import Dict, List, Callable, Optional
+
+
+STREAMS = ("stdout", "stderr")
+
+
+class OutputRingBuffer:
+    """Fixed-size byte ring buffer keeping the most recent output of a stream."""
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialise the ring buffer.
+
+        :param capacity: the maximum number of bytes retained, 0 discarding all output.
+        """
+
+        if capacity < 0:
+            raise ValueError(f"Buffer capacity must be positive or 0, got {capacity}.")
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+        self.bytes_written = 0
+        self.lines_written = 0
+        self.bytes_dropped = 0
+        self.lines_dropped = 0
+
+    def __len__(self) -> int:
+        """Get the number of bytes currently retained."""
+        return self._size
+
+    def write(self, data: bytes) -> None:
+        """Append data, overwriting the oldest bytes once the buffer is full."""
+
+        length = len(data)
+        self.bytes_written += length
+        self.lines_written += data.count(b"\n")
+        if length >= self.capacity:
+            if not self.capacity:
+                self._count_dropped(data, 0, length)
+                return
+            self._drop(self._size)
+            self._count_dropped(data, 0, length - self.capacity)
+            self._buffer[:] = data[length - self.capacity :]
+            self._start = 0
+            self._size = self.capacity
+            return
+
+        overflow = self._size + length - self.capacity
+        if overflow > 0:
+            self._drop(overflow)
+        end = (self._start + self._size) % self.capacity
+        first = min(length, self.capacity - end)
+        self._buffer[end : end + first] = data[:first]
+        self._buffer[: length - first] = data[first:]
+        self._size += length
+
+    def _drop(self, count: int) -> None:
+        """Discard the oldest count bytes."""
+
+        first = min(count, self.capacity - self._start)
+        self._count_dropped(self._buffer, self._start, self._start + first)
+        self._count_dropped(self._buffer, 0, count - first)
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+
+    def _count_dropped(self, data: bytes, start: int, end: int) -> None:
+        """Account for the bytes and lines in data[start:end] being discarded."""
+
+        if end > start:
+            self.bytes_dropped += end - start
+            self.lines_dropped += data.count(b"\n", start, end)
+
+    def getvalue(self) -> bytes:
+        """Get the retained bytes, oldest first."""
+
+        end = self._start + self._size
+        if end <= self.capacity:
+            return bytes(self._buffer[self._start : end])
+        return bytes(self._buffer[self._start :] + self._buffer[: end - self.capacity])
+
+    def tail(self, size: int) -> bytes:
+        """Get the most recent size bytes."""
+
+        return self.getvalue()[-size:] if size else b""
+
+    def text(self) -> str:
+        """Decode the retained output, skipping a line truncated by the ring wrapping."""
+
+        data = self.getvalue()
+        if self.bytes_dropped and data:
+            newline = data.find(b"\n")
+            data = data[newline + 1 :] if newline != -1 else b""
+        return data.decode("utf-8", errors="replace")
+
+    def lines(self) -> List[str]:
+        """Split the retained output into lines."""
+
+        return self.text().splitlines()
+
+
+class ProcessOutput:
+    """Bounded capture of the stdout and stderr of a process."""
+
+    def __init__(self, stdout_size: int, stderr_size: int) -> None:
+        """
+        Initialise the capture.
+
+        :param stdout_size: the number of stdout bytes retained.
+        :param stderr_size: the number of stderr bytes retained.
+        """
+
+        self.streams: Dict[str, OutputRingBuffer] = {
+            "stdout": OutputRingBuffer(stdout_size),
+            "stderr": OutputRingBuffer(stderr_size),
+        }
+
+    @property
+    def stdout(self) -> OutputRingBuffer:
+        """Get the stdout buffer."""
+        return self.streams["stdout"]
+
+    @property
+    def stderr(self) -> OutputRingBuffer:
+        """Get the stderr buffer."""
+        return self.streams["stderr"]
+
+    def write(self, stream: str, data: bytes) -> None:
+        """Append data read from a stream."""
+        self.streams[stream].write(data)
+
+    @property
+    def bytes_dropped(self) -> int:
+        """Get the number of bytes dropped across both streams."""
+        return self.stdout.bytes_dropped + self.stderr.bytes_dropped
+
+    @property
+    def lines_dropped(self) -> int:
+        """Get the number of lines dropped across both streams."""
+        return self.stdout.lines_dropped + self.stderr.lines_dropped
+
+
+class OutputChunker:
+    """Coalesces process output into chunks bounded by size and a time window."""
+
+    def __init__(self, emit: Callable[[str, str], None], chunk_size: int, chunk_interval: float) -> None:
+        """
+        Initialise the chunker.
+
+        :param emit: callable receiving the decoded stdout and stderr of each chunk.
+        :param chunk_size: the number of buffered bytes which triggers a chunk.
+        :param chunk_interval: the maximum number of seconds output is held back.
+        """
+
+        self._emit = emit
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self._buffers = {stream: bytearray() for stream in STREAMS}
+        self._decoders = {stream: codecs.getincrementaldecoder("utf-8")(errors="replace") for stream in STREAMS}
+        self._buffered = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def feed(self, stream: str, data: bytes) -> None:
+        """Buffer output read from a stream, emitting a chunk once the size limit is reached."""
+
+        self._buffers[stream] += data
+        self._buffered += len(data)
+        if self._buffered >= self.chunk_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(self.chunk_interval, self.flush)
+
+    def flush(self, final: bool = False) -> None:
+        """Emit the buffered output as a single chunk."""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        decoded = []
+        for stream in STREAMS:
+            buffer = self._buffers[stream]
+            decoded.append(self._decoders[stream].decode(bytes(buffer), final=final))
+            buffer.clear()
+        self._buffered = 0
+        if any(decoded):
+            self._emit(*decoded)
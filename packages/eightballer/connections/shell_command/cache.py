@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""The cache of the results of idempotent commands run by the Shell Command connection."""
+
+import os
+import time
+import hashlib
+from typing import Dict, List, Tuple, Callable, Iterable, Optional, NamedTuple
+from collections import OrderedDict
+
+
+DEFAULT_MAX_SIZE = 256
+
+
+class CachedResult(NamedTuple):
+    """The result of a command, as replied to the dialogue which ran it."""
+
+    stdout: str
+    stderr: str
+    exit_code: int
+    resource_usage: Dict[str, float]
+
+
+def cache_key(
+    command: List[str],
+    env: Dict[str, str],
+    cwd: Optional[str] = None,
+    env_names: Iterable[str] = (),
+    files: Iterable[str] = (),
+) -> str:
+    """
+    Hash what the result of a command depends on into its key.
+
+    :param command: the executable and arguments of the command.
+    :param env: the environment the command runs in.
+    :param cwd: the working directory of the command.
+    :param env_names: the variables of the environment the result depends on.
+    :param files: the files the result depends on, by their modification time and size.
+    :return: the key.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    for part in command:
+        digest.update(part.encode("utf-8", errors="surrogateescape") + b"\0")
+    digest.update(f"\1{cwd or ''}\1".encode("utf-8"))
+    for name in sorted(env_names):
+        value = env.get(name)
+        digest.update(f"{name}={value}\0".encode("utf-8") if value is not None else f"{name}\0".encode("utf-8"))
+    digest.update(b"\1")
+    for path in files:
+        try:
+            stat = os.stat(path if cwd is None else os.path.join(cwd, path))
+            digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode("utf-8"))
+        except OSError:
+            digest.update(f"{path}\0missing\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """A size-bounded LRU cache of command results, each kept for the ttl it was stored with."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialise the cache.
+
+        :param max_size: the number of results kept, the least recently used being evicted first.
+        :param clock: the clock the ttls are measured with.
+        """
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, float, CachedResult]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[CachedResult, float]]:
+        """
+        Get a result which has not expired.
+
+        :param key: the key of the command.
+        :return: the result and its age in seconds, or None on a miss.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, expires_at, result = entry
+        now = self._clock()
+        if now >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result, now - stored_at
+
+    def put(self, key: str, result: CachedResult, ttl: float) -> None:
+        """Store a result for ttl seconds, evicting the least recently used results beyond the size of the cache."""
+
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        now = self._clock()
+        self._entries[key] = (now, now + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        """Get the number of results stored, including those expired but not yet looked up."""
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the counters of the cache."""
+
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -25,10 +25,15 @@ import asyncio
 import json
 import logging
 import os
+import time
+import shlex
+import signal
 import subprocess
 from abc import abstractmethod
-import sys
-from typing import Any, Set, Dict, Callable, Optional, cast
+from functools import partial
+from pathlib import Path
+from collections import deque
+from typing import Any, Set, Dict, List, Tuple, Deque, Callable, Optional, Sequence, cast
 from asyncio.events import AbstractEventLoop
 
 from aea.common import Address
@@ -41,10 +46,57 @@ from packages.eightballer.protocols.shell_command.dialogues import (
     ShellCommandDialogue,
     BaseShellCommandDialogues,
 )
+from packages.eightballer.protocols.shell_command.compression import ZLIB, CODECS, compress_output
+from packages.eightballer.protocols.shell_command.fast_serialization import TrustedShellCommandMessage
+from packages.eightballer.connections.shell_command.buffers import OutputChunker, ProcessOutput
+from packages.eightballer.connections.shell_command.cache import CachedResult, ResultCache, cache_key
+from packages.eightballer.connections.shell_command.sinks import OutputSink, validate_sink
+from packages.eightballer.connections.shell_command.metrics import ConnectionMetrics
+from packages.eightballer.connections.shell_command.limits import CgroupManager, child_limiter, validate_limits
+from packages.eightballer.connections.shell_command.process import (
+    ChildProcess,
+    SpawnServer,
+    spawn_pipeline,
+    pipeline_resource_usage,
+)
+from packages.eightballer.connections.shell_command.profiles import CommandProfile
+from packages.eightballer.connections.shell_command.registry import ProcessRegistry, terminate_processes
+from packages.eightballer.connections.shell_command.scheduler import DEFAULT_COMMAND_CLASS, CommandScheduler
+from packages.eightballer.connections.shell_command.supervisor import Supervisor, RestartPolicy, CrashLoopError
 
 
 sys.stdout.reconfigure(line_buffering=True) 
 CONNECTION_ID = PublicId.from_str("eightballer/shell_command:0.1.0")
+DEFAULT_RECEIVE_BATCH_SIZE = 16
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_CHUNK_INTERVAL = 0.1
+DEFAULT_ECHO_OUTPUT = False
+DEFAULT_READ_SIZE = 64 * 1024
+DEFAULT_STDOUT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_STDERR_BUFFER_SIZE = 256 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RESTART_BACKOFF_INITIAL = 0.5
+DEFAULT_RESTART_BACKOFF_MAX = 30.0
+DEFAULT_CRASH_LOOP_RESTARTS = 5
+DEFAULT_CRASH_LOOP_WINDOW = 60.0
+DEFAULT_PROBE_INTERVAL = 0.5
+DEFAULT_READY_TIMEOUT = 30.0
+DEFAULT_USE_SPAWN_SERVER = False
+DEFAULT_SINK_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_SINK_BACKUP_COUNT = 3
+DEFAULT_CGROUP_ROOT = None
+DEFAULT_TRUSTED_MESSAGES = False
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+DEFAULT_COMPRESSION_CODEC = ZLIB
+DEFAULT_COMPRESSION_LEVEL = None
+DEFAULT_TERMINATE_GRACE_PERIOD = 5.0
+DEFAULT_STATUS_SAMPLE_INTERVAL = 1.0
+DEFAULT_STATUS_TAIL_SIZE = 4096
+DEFAULT_STATUS_HISTORY_SIZE = 64
+DEFAULT_STDIN_BUFFER_SIZE = 1024 * 1024
+DEFAULT_RESULT_CACHE_SIZE = 256
+BATCH_INVALID_COMMAND_EXIT_CODE = 127
+OUTPUT_DRAIN_TIMEOUT = 1.0
 
 
 _default_logger = logging.getLogger("aea.packages.eightballer.connections.shell_command")
@@ -53,11 +105,12 @@ _default_logger = logging.getLogger("aea.packages.eightballer.connections.shell_
 class ShellCommandDialogues(BaseShellCommandDialogues):
     """The dialogues class keeps track of all shell_command dialogues."""
 
-    def __init__(self, self_address: Address, **kwargs) -> None:
+    def __init__(self, self_address: Address, trusted: bool = False, **kwargs) -> None:
         """
         Initialize dialogues.
 
         :param self_address: self address
+        :param trusted: whether to build replies without checking their consistency
         :param kwargs: keyword arguments
         """
 
@@ -79,6 +132,9 @@ class ShellCommandDialogues(BaseShellCommandDialogues):
             role_from_first_message=role_from_first_message,
             **kwargs,
         )
+        if trusted:
+            # replies built by the connection are consistent by construction
+            self._message_class = TrustedShellCommandMessage
 
 
 class BaseAsyncChannel:
@@ -107,6 +163,7 @@ class BaseAsyncChannel:
         self._tasks: Set[asyncio.Task] = set()
         self._in_queue: Optional[asyncio.Queue] = None
         self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.metrics = ConnectionMetrics()
         self.logger = _default_logger
         self.working_directory = "."
 
@@ -114,7 +171,7 @@ class BaseAsyncChannel:
     @abstractmethod
     def performative_handlers(
         self,
-    ) -> Dict[Message.Performative, Callable[[Message, Dialogue], Message]]:
+    ) -> Dict[Message.Performative, Callable[[Message, Dialogue], Optional[Message]]]:
         """Performative to message handler mapping."""
 
     @abstractmethod
@@ -132,6 +189,7 @@ class BaseAsyncChannel:
         It sends the envelope, waits for and receives the result.
         The result is translated into a response envelope.
         Finally, the response envelope is sent to the in-queue.
+        Handlers which reply asynchronously return None and put their own replies.
 
         :param query_envelope: The envelope containing a protocol message.
         """
@@ -156,28 +214,77 @@ class BaseAsyncChannel:
             self.logger.warning(f"Could not create dialogue for message={message}")
             return
 
+        start = time.perf_counter()
         response_message = await handler(message, dialogue)
+        self.metrics.handler_duration(message.performative.value).observe(time.perf_counter() - start)
+        if response_message is None:
+            return
         self.logger.info(f"returning message: {response_message}")
+        self._put_reply(str(envelope.sender), response_message)
+
+    def _put_reply(self, to: Address, response_message: Message) -> None:
+        """
+        Wrap a response message in an envelope and put it on the in-queue.
+
+        :param to: the address of the recipient.
+        :param response_message: the message to deliver.
+        """
 
         response_envelope = Envelope(
-            to=str(envelope.sender),
+            to=to,
             sender=str(self.connection_id),
             message=response_message,
             protocol_specification_id=self.message_type.protocol_specification_id,
         )
-
-        await self._in_queue.put(response_envelope)
+        self._in_queue.put_nowait(response_envelope)
+        self.metrics.enqueued(self._in_queue.qsize())
 
     async def get_message(self) -> Optional[Envelope]:
-        """Check the in-queue for envelopes."""
+        """Wait for the next envelope on the in-queue, returns None once the channel is stopped."""
 
         if self.is_stopped:
             return None
-        try:
-            envelope = self._in_queue.get_nowait()
-            return envelope
-        except asyncio.QueueEmpty:
-            return None
+        envelope = await self._in_queue.get()
+        if envelope is not None:
+            self.metrics.dequeued()
+        return envelope
+
+    async def get_messages(self, max_messages: int) -> List[Envelope]:
+        """
+        Wait for the next envelope and drain up to max_messages envelopes from the in-queue.
+
+        :param max_messages: the maximum number of envelopes to return.
+        :return: the envelopes received, empty once the channel is stopped.
+        """
+
+        envelope = await self.get_message()
+        if envelope is None:
+            return []
+        envelopes = [envelope]
+        while len(envelopes) < max_messages:
+            try:
+                envelope = self._in_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if envelope is None:
+                break
+            self.metrics.dequeued()
+            envelopes.append(envelope)
+        return envelopes
+
+    def _wake_receivers(self) -> None:
+        """Unblock any pending get_message call after the channel is stopped."""
+
+        if self._in_queue is not None:
+            self._in_queue.put_nowait(None)
+
+    def _create_task(self, coro) -> asyncio.Task:
+        """Schedule a coroutine which is cancelled on disconnect."""
+
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
 
     async def _cancel_tasks(self) -> None:
         """Cancel all requests tasks pending."""
@@ -195,14 +302,15 @@ class BaseAsyncChannel:
             except BaseException:  # noqa
                 pass  # nosec
 
-    async def _cancel_processes(self):
-        """Forcefully cancel all running processes."""
-        for process in list(self._running_processes):
-            self.logger.info(f"Killing process {process.pid}")
-            process.kill()
-            process.wait()
-            self._running_processes.remove(process)
-            
+    async def _cancel_processes(self) -> None:
+        """Terminate all running processes and their process groups, killing those which do not exit in time."""
+
+        for supervisor in self._supervisors.values():
+            supervisor.stop()
+        processes = list(self.processes)
+        if processes:
+            self.logger.info(f"Terminating processes {[process.pid for process in processes]}")
+        await terminate_processes(processes, self.terminate_grace_period)
 
 
 class ShellCommandAsyncChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attributes
@@ -223,11 +331,64 @@ class ShellCommandAsyncChannel(BaseAsyncChannel):  # pylint: disable=too-many-in
 
         super().__init__(agent_address, connection_id, message_type=ShellCommandMessage)
 
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.chunk_interval = DEFAULT_CHUNK_INTERVAL
+        self.echo_output = DEFAULT_ECHO_OUTPUT
+        self.read_size = DEFAULT_READ_SIZE
+        self.stdout_buffer_size = DEFAULT_STDOUT_BUFFER_SIZE
+        self.stderr_buffer_size = DEFAULT_STDERR_BUFFER_SIZE
+        self.max_concurrency = DEFAULT_MAX_CONCURRENCY
+        self.class_limits: Dict[str, int] = {}
+        self.restart_backoff_initial = DEFAULT_RESTART_BACKOFF_INITIAL
+        self.restart_backoff_max = DEFAULT_RESTART_BACKOFF_MAX
+        self.crash_loop_restarts = DEFAULT_CRASH_LOOP_RESTARTS
+        self.crash_loop_window = DEFAULT_CRASH_LOOP_WINDOW
+        self.probe_interval = DEFAULT_PROBE_INTERVAL
+        self.ready_timeout = DEFAULT_READY_TIMEOUT
+        self.use_spawn_server = DEFAULT_USE_SPAWN_SERVER
+        self.sink_max_bytes = DEFAULT_SINK_MAX_BYTES
+        self.sink_backup_count = DEFAULT_SINK_BACKUP_COUNT
+        self.cgroup_root = DEFAULT_CGROUP_ROOT
+        self.trusted_messages = DEFAULT_TRUSTED_MESSAGES
+        self.compression_threshold = DEFAULT_COMPRESSION_THRESHOLD
+        self.compression_codec = DEFAULT_COMPRESSION_CODEC
+        self.compression_level: Optional[int] = DEFAULT_COMPRESSION_LEVEL
+        self.terminate_grace_period = DEFAULT_TERMINATE_GRACE_PERIOD
+        self.status_sample_interval = DEFAULT_STATUS_SAMPLE_INTERVAL
+        self.status_tail_size = DEFAULT_STATUS_TAIL_SIZE
+        self.status_history_size = DEFAULT_STATUS_HISTORY_SIZE
+        self.stdin_buffer_size = DEFAULT_STDIN_BUFFER_SIZE
+        self.result_cache_size = DEFAULT_RESULT_CACHE_SIZE
+        self.profiles_config: Dict[str, Dict[str, Any]] = {}
         for key, value in kwargs.items():
             setattr(self, key, value)
+        validate_sink(self.sink_max_bytes, self.sink_backup_count)
+
+        self.scheduler = CommandScheduler(self.max_concurrency, self.class_limits)
+        self.restart_policy = RestartPolicy(
+            backoff_initial=self.restart_backoff_initial,
+            backoff_max=self.restart_backoff_max,
+            crash_loop_restarts=self.crash_loop_restarts,
+            crash_loop_window=self.crash_loop_window,
+        )
 
-        self._running_processes: Set[subprocess.Popen] = set()
-        self._dialogues = ShellCommandDialogues(str(ShellCommandConnection.connection_id))
+        if self.compression_codec not in CODECS:
+            self.logger.warning(f"Compression codec {self.compression_codec} is unavailable, using {ZLIB}.")
+            self.compression_codec = ZLIB
+        self.cgroups = CgroupManager(self.cgroup_root)
+        if self.cgroup_root and not self.cgroups.available:
+            self.logger.warning(f"{self.cgroup_root} is not a writable cgroup v2 directory, ignoring cgroup limits.")
+        self.profiles: Dict[str, CommandProfile] = {}
+        self.spawn_server: Optional[SpawnServer] = None
+        self._process_cgroups: Dict[ChildProcess, Path] = {}
+        self.processes = ProcessRegistry(self.status_history_size, self.status_tail_size)
+        self._supervisors: Dict[str, Supervisor] = {}
+        self.result_cache = ResultCache(self.result_cache_size)
+        self.bytes_dropped = 0
+        self.lines_dropped = 0
+        self._dialogues = ShellCommandDialogues(
+            str(ShellCommandConnection.connection_id), trusted=self.trusted_messages
+        )
         self.logger.debug("Initialised the Shell Command channel")
 
     async def connect(self, loop: AbstractEventLoop) -> None:
@@ -240,8 +401,17 @@ class ShellCommandAsyncChannel(BaseAsyncChannel):  # pylint: disable=too-many-in
         if self.is_stopped:
             self._loop = loop
             self._in_queue = asyncio.Queue()
+            self.metrics.clear_queue()
             self.is_stopped = False
             try:
+                self.profiles = {
+                    name: CommandProfile.from_config(name, config).resolve()
+                    for name, config in self.profiles_config.items()
+                }
+                if self.use_spawn_server:
+                    self.spawn_server = SpawnServer()
+                    await self.spawn_server.start()
+                self._create_task(self._sample_processes())
                 self.logger.info("Shell Command has connected.")
             except Exception as error:  # pragma: nocover # pylint: disable=broad-except
                 self.is_stopped = True
@@ -254,8 +424,14 @@ class ShellCommandAsyncChannel(BaseAsyncChannel):  # pylint: disable=too-many-in
         if self.is_stopped:
             return
 
+        # processes go first, as the tasks waiting on them unregister them when cancelled
+        await self._cancel_processes()
         await self._cancel_tasks()
+        if self.spawn_server is not None:
+            await self.spawn_server.stop()
+            self.spawn_server = None
         self.is_stopped = True
+        self._wake_receivers()
         self.logger.info("Shell Command has shutdown.")
 
     @property
@@ -263,110 +439,832 @@ class ShellCommandAsyncChannel(BaseAsyncChannel):  # pylint: disable=too-many-in
         self,
     ) -> Dict[
         ShellCommandMessage.Performative,
-        Callable[[ShellCommandMessage, ShellCommandDialogue], ShellCommandMessage],
+        Callable[[ShellCommandMessage, ShellCommandDialogue], Optional[ShellCommandMessage]],
     ]:
         """Map performative to handler."""
         return {
             ShellCommandMessage.Performative.EXECUTE_COMMAND: self.execute_command,
+            ShellCommandMessage.Performative.EXECUTE_BATCH: self.execute_batch,
+            ShellCommandMessage.Performative.EXECUTE_PIPELINE: self.execute_pipeline,
+            ShellCommandMessage.Performative.SEND_SIGNAL: self.send_signal,
+            ShellCommandMessage.Performative.TERMINATE: self.terminate,
+            ShellCommandMessage.Performative.QUERY_STATUS: self.query_status,
+            ShellCommandMessage.Performative.WRITE_STDIN: self.write_stdin,
+            ShellCommandMessage.Performative.QUERY_METRICS: self.query_metrics,
         }
 
     
 
-    async def _stream_output(self, process, stream_output=True, fmt=""):
-        """Stream both stdout and stderr in real-time with optimized async approach."""
+    async def _stream_output(self, process: ChildProcess, output: ProcessOutput, on_output=None) -> None:
+        """Read stdout and stderr in chunks into bounded buffers until both streams reach end of file."""
 
-        stdout_lines = []
-        stderr_lines = []
+        first_byte = True
 
-        # Function to read stdout asynchronously
-        async def read_stdout():
+        async def read_stream(stream, name):
+            nonlocal first_byte
             while True:
-                output = await process.stdout.readline()
-                if process.returncode is not None:  # If the output is empty, the process is done
+                data = await stream.read(self.read_size)
+                if not data:
                     break
-                if output:
-                    output = output.decode("utf-8").strip()  # Manually decode bytes to string
-                    stdout_lines.append(output)
-                    if stream_output:
-                        print(fmt + output)
-                    sys.stdout.flush()
-
-        # Function to read stderr asynchronously
-        async def read_stderr():
-            while True:
-                error = await process.stderr.readline()
-                if error == b'' and process.returncode is not None:  # If the output is empty, the process is done
-                    break
-                if error:
-                    error = error.decode("utf-8").strip()  # Manually decode bytes to string
-                    stderr_lines.append(error)
-                    if stream_output:
-                        print(fmt + error)
-                    sys.stderr.flush()
+                if first_byte:
+                    first_byte = False
+                    self.metrics.first_byte_latency.observe(time.monotonic() - process.started_at)
+                output.write(name, data)
+                if on_output is not None:
+                    on_output(name, data)
+                if self.echo_output:
+                    print(data.decode("utf-8", errors="replace"), end="")
+
+        await asyncio.gather(
+            read_stream(process.stdout, "stdout"),
+            read_stream(process.stderr, "stderr"),
+        )
+        if output.bytes_dropped:
+            self.bytes_dropped += output.bytes_dropped
+            self.lines_dropped += output.lines_dropped
+            self.logger.debug(
+                f"Process {process.pid} dropped {output.bytes_dropped} bytes ({output.lines_dropped} lines) of output."
+            )
 
-        # Start both tasks concurrently
-        await asyncio.gather(read_stdout(), read_stderr())
+    async def _finish_process(
+        self,
+        process: ChildProcess,
+        output: ProcessOutput,
+        on_output=None,
+        timeout: Optional[float] = None,
+        sink: Optional[OutputSink] = None,
+        upstream: Sequence[ChildProcess] = (),
+    ) -> bool:
+        """
+        Wait for a process to exit and for its output to drain, killing its process group on timeout.
+
+        :param process: the process to wait for.
+        :param output: the buffers capturing the output of the process.
+        :param on_output: optional callable receiving each chunk of output read.
+        :param timeout: the number of seconds the process may run for, unlimited if None.
+        :param sink: the log files receiving the output instead of the buffers, if any.
+        :param upstream: the earlier stages of a pipeline ending with the process, waited for and killed with it.
+        :return: False if the process timed out, True otherwise.
+        """
 
-        return process, stdout_lines, stderr_lines
+        status = self.processes.status(process)
+        if status is not None:
+            status.output = sink if sink is not None else output
+        if sink is not None:
+            reader = asyncio.ensure_future(sink.drain(process.pipes))
+        else:
+            reader = asyncio.ensure_future(self._stream_output(process, output, on_output))
+        processes = [*upstream, process]
+        try:
+            try:
+                if upstream:
+                    await asyncio.wait_for(asyncio.gather(*(stage.wait() for stage in processes)), timeout)
+                else:
+                    await asyncio.wait_for(process.wait(), timeout)
+                completed = True
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Process {process.pid} timed out after {timeout} seconds, killing it.")
+                for stage in processes:
+                    stage.kill_group()
+                await asyncio.gather(*(stage.wait() for stage in processes))
+                completed = False
+            # a grandchild may still hold the pipes open once the process itself has exited
+            await asyncio.wait({reader}, timeout=OUTPUT_DRAIN_TIMEOUT)
+        finally:
+            reader.cancel()
+            for stage in processes:
+                if stage.stdin is not None:
+                    stage.stdin.abort()
+                self.processes.remove(stage)
+                group = self._process_cgroups.pop(stage, None)
+                if group is not None:
+                    self.cgroups.remove(group)
+        return completed
+
+    async def _run_process(
+        self, command, env_vars=None, cwd=None, connect=True, limits=None, stdin=False
+    ) -> ChildProcess:
+        """Run the command under its limits and return the process, with its stdin open for writing if asked."""
+        if limits:
+            validate_limits(limits)
+        env = env_vars if env_vars else None
+        group = self.cgroups.create(limits) if limits else None
+        start = time.perf_counter()
+        try:
+            if stdin or limits:
+                # the spawn server only hands back the output pipes of the commands it spawns, and limits are
+                # applied in the child before it execs so that it never runs unconstrained
+                process = await ChildProcess.spawn(
+                    command,
+                    env=env,
+                    cwd=cwd,
+                    connect=connect,
+                    stdin_buffer_size=self.stdin_buffer_size,
+                    stdin=subprocess.PIPE if stdin else None,
+                    preexec_fn=child_limiter(limits, group) if limits else None,
+                )
+            elif self.spawn_server is not None and self.spawn_server.is_running:
+                process = await self.spawn_server.spawn(command, env=env, cwd=cwd, connect=connect)
+            else:
+                process = await ChildProcess.spawn(command, env=env, cwd=cwd, connect=connect)
+        except (OSError, subprocess.SubprocessError) as error:
+            if group is not None:
+                self.cgroups.remove(group)
+            if isinstance(error, subprocess.SubprocessError):
+                # Popen only reports that the limits could not be applied in the child, not why
+                raise OSError(f"Could not apply the limits {limits} to {command[0]}.") from error
+            raise
+        self.metrics.spawn_latency.observe(time.perf_counter() - start)
+        if group is not None:
+            self._process_cgroups[process] = group
+        return process
+
+    def _make_sink(self, message: ShellCommandMessage) -> Optional[OutputSink]:
+        """Build the log files sinking the output of a command, if it asks for them."""
+        if message.sink is None:
+            return None
+        return OutputSink(message.sink, self.sink_max_bytes, self.sink_backup_count)
 
+    async def execute_command(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """Handle ShellCommandMessage with EXECUTE_COMMAND Perfomative"""
 
-    async def _run_process(self, command, env_vars=None):
-        """Run the command and return the process."""
-        return await asyncio.create_subprocess_exec(
-            *command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env_vars if env_vars else None,
+        if message.supervise:
+            self._create_task(self._supervise_command(message, dialogue))
+            return None
 
+        key = self._result_cache_key(message)
+        if key is None:
+            self._create_task(self._schedule_command(message, dialogue))
+            return None
+        cached = self.result_cache.get(key)
+        if cached is None:
+            self._create_task(self._schedule_command(message, dialogue, partial(self._run_command, result_key=key)))
+            return None
+        result, age = cached
+        self.logger.debug(f"Replying with the result of {message.command} cached {age:.3f}s ago.")
+        resource_usage = {**result.resource_usage, "cache_age": age}
+        self._create_task(
+            self._reply_result(message, dialogue, result.stdout, result.stderr, result.exit_code, resource_usage)
         )
+        return None
 
-    async def execute_command(self, message: ShellCommandMessage, dialogue: ShellCommandDialogue) -> ShellCommandMessage:
-        """Handle ShellCommandMessage with EXECUTE_COMMAND Perfomative"""
+    def _result_cache_key(self, message: ShellCommandMessage) -> Optional[str]:
+        """
+        Get the key of the result of a command in the result cache, if it may be cached.
 
-        command = message.command
-        options = message.options
+        Only commands asking for a cache_ttl whose result is a single reply are cached, those streaming or
+        sinking their output, or taking input, are always run.
+        """
 
-        command_list = [command] + list(message.args) + [f"{k}={v}" for k, v in options.items()]
+        if message.cache_ttl is None or self.result_cache.max_size <= 0:
+            return None
+        if message.stream_output or message.sink is not None or message.open_stdin:
+            return None
+        try:
+            command_list, env_vars, cwd = self._build_command(message)
+        except ValueError:
+            # the error is replied to when the command is run
+            return None
+        env = env_vars if env_vars is not None else os.environ
+        return cache_key(command_list, env, cwd, message.cache_env or (), message.cache_files or ())
 
-        env_vars = os.environ.copy()
-        if message.env_vars is not None:
-            env_vars_json = message.env_vars.decode("utf-8")
-            env_vars = json.loads(env_vars_json)
-            env_vars.update(env_vars)
+    def _build_command(
+        self, message: ShellCommandMessage
+    ) -> Tuple[List[str], Optional[Dict[str, str]], Optional[str]]:
+        """
+        Build the argument list, environment and working directory of a command.
 
-        stream_output = True
-        timeout = 0
+        The env_vars of a message are set on top of the environment of its profile, or of the agent. The
+        command of a message using a profile is ignored in favour of the executable of the profile.
+        """
 
-        async def execute_command(command):
-            """Execute the command, stream output, and return the logs."""
-            self.logger.info(f"Executing command: {command}")
-            process = await self._run_process(command, env_vars=env_vars)
-            self.logger.info("Process started: %s", process)
-            self._running_processes.add(process)
-            future = self._stream_output(process, fmt="", stream_output=stream_output)
-            self._tasks.add(asyncio.ensure_future(future))
-            proc, stdout_lines, stderr_lines = process, [], []
-            return proc, stdout_lines, stderr_lines
+        args = list(message.args) + [f"{k}={v}" for k, v in message.options.items()]
+        env_overrides = self._env_overrides(message)
 
-        proc, stdout_lines, stderr_lines = await execute_command(command_list)
+        if message.profile is not None:
+            profile = self.profiles.get(message.profile)
+            if profile is None:
+                raise ValueError(f"Unknown profile {message.profile}, expected one of {sorted(self.profiles)}.")
+            command_list, env_vars = profile.build(args, env_overrides)
+            return command_list, env_vars, profile.cwd
 
-        if proc.returncode is None:
-            self.logger.info(f"Command started successfully: {command_list}")
+        # without overrides the agent environment is inherited as is
+        env_vars = {**os.environ, **env_overrides} if env_overrides else None
+        return [message.command] + args, env_vars, None
+
+    @staticmethod
+    def _env_overrides(message: ShellCommandMessage) -> Optional[Dict[str, str]]:
+        """Decode the env_vars of a message, a JSON object of the variables to set."""
+
+        return json.loads(message.env_vars.decode("utf-8")) if message.env_vars is not None else None
+
+    async def execute_batch(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """Handle ShellCommandMessage with EXECUTE_BATCH Perfomative"""
+
+        if message.parallelism is not None and message.parallelism < 1:
             return dialogue.reply(
-                performative=ShellCommandMessage.Performative.COMMAND_RESULT,
-                stderr=stderr_lines,
-                stdout=stdout_lines,
-                exit_code=-1,
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=f"Parallelism must be at least 1, got {message.parallelism}.",
+            )
+        self._create_task(self._run_batch(message, dialogue))
+        return None
+
+    async def _run_batch(self, message: ShellCommandMessage, dialogue: ShellCommandDialogue) -> None:
+        """
+        Run the commands of a batch and reply with their results in a single message.
+
+        At most parallelism commands of the batch run at once, each holding a scheduler slot while it runs,
+        so that a batch shares the connection fairly with other dialogues.
+        """
+
+        start = time.perf_counter()
+        reference = dialogue.dialogue_label.dialogue_starter_reference
+        command_class = message.command_class or DEFAULT_COMMAND_CLASS
+        parallelism = asyncio.Semaphore(message.parallelism or self.max_concurrency)
+        results: List[Tuple[int, str, str]] = [(-1, "", "")] * len(message.commands)
+        queue_wait = 0.0
+        try:
+            env_overrides = self._env_overrides(message)
+        except ValueError as error:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=str(error),
+            )
+            self._put_reply(message.sender, reply)
+            return
+        env_vars = {**os.environ, **env_overrides} if env_overrides else None
+
+        async def run(index: int, command: str) -> None:
+            nonlocal queue_wait
+            async with parallelism:
+                wait = await self.scheduler.acquire(command_class, message.priority or 0, message.sender)
+                queue_wait += wait
+                try:
+                    results[index] = await self._run_batch_command(command, env_vars, message.timeout, reference)
+                finally:
+                    self.scheduler.release(command_class)
+
+        self.logger.info(f"Executing a batch of {len(message.commands)} commands.")
+        await asyncio.gather(*(run(index, command) for index, command in enumerate(message.commands)))
+        exit_codes, stdouts, stderrs = zip(*results) if results else ((), (), ())
+        reply = dialogue.reply(
+            performative=ShellCommandMessage.Performative.BATCH_RESULT,
+            exit_codes=exit_codes,
+            stdouts=stdouts,
+            stderrs=stderrs,
+            resource_usage={"wall_time": time.perf_counter() - start, "queue_wait": queue_wait},
+        )
+        self._put_reply(message.sender, reply)
+
+    async def _run_batch_command(
+        self, command: str, env_vars: Optional[Dict[str, str]], timeout: Optional[float], reference: str
+    ) -> Tuple[int, str, str]:
+        """
+        Run one command of a batch, a shell-quoted command line run without a shell.
+
+        Failures are reported in the result of the command rather than failing the batch: a command which
+        cannot be started exits 127 as it would from a shell, and a command killed on timeout says so in
+        its stderr.
+        """
+
+        try:
+            command_list = shlex.split(command)
+            if not command_list:
+                raise ValueError("Empty command.")
+            process = await self._run_process(command_list, env_vars=env_vars)
+        except (OSError, ValueError) as error:
+            return BATCH_INVALID_COMMAND_EXIT_CODE, "", f"{command}: {error}"
+        self.processes.add(reference, process)
+        output = ProcessOutput(self.stdout_buffer_size, self.stderr_buffer_size)
+        completed = await self._finish_process(process, output, timeout=timeout)
+        stderr = output.stderr.text()
+        if not completed:
+            stderr += f"Command timed out after {timeout} seconds.\n"
+        return process.returncode, output.stdout.text(), stderr
+
+    async def execute_pipeline(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """Handle ShellCommandMessage with EXECUTE_PIPELINE Perfomative"""
+
+        if not message.stages:
+            return dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message="A pipeline needs at least one stage.",
+            )
+        self._create_task(self._schedule_command(message, dialogue, self._run_pipeline))
+        return None
+
+    async def _run_pipeline(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue, queue_wait: float
+    ) -> None:
+        """
+        Run the stages of a pipeline, shell-quoted command lines run without a shell, and reply once all exit.
+
+        Only the output of the last stage, and the stderr the stages share, is read by the connection. The
+        exit code is that of the last stage, or with pipefail that of the last stage to fail.
+        """
+
+        to = message.sender
+        try:
+            stages = [shlex.split(stage) for stage in message.stages]
+            if not all(stages):
+                raise ValueError("Empty pipeline stage.")
+            env_overrides = self._env_overrides(message)
+            env_vars = {**os.environ, **env_overrides} if env_overrides else None
+            self.logger.info(f"Executing pipeline: {stages}")
+            start = time.perf_counter()
+            processes = await spawn_pipeline(stages, env=env_vars)
+            self.metrics.spawn_latency.observe(time.perf_counter() - start)
+        except (OSError, ValueError) as error:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=str(error),
             )
+            self._put_reply(to, reply)
+            return
+        for process in processes:
+            self.processes.add(dialogue.dialogue_label.dialogue_starter_reference, process)
+
+        output = ProcessOutput(self.stdout_buffer_size, self.stderr_buffer_size)
+        chunker = self._make_chunker(to, dialogue) if message.stream_output else None
+        on_output = chunker.feed if chunker is not None else None
+        last = processes[-1]
+        completed = await self._finish_process(last, output, on_output, message.timeout, upstream=processes[:-1])
+        if chunker is not None:
+            chunker.flush(final=True)
+        if not completed:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.TIMEOUT_ERROR,
+                message=f"Pipeline timed out after {message.timeout} seconds.",
+            )
+            self._put_reply(to, reply)
+            return
+
+        exit_codes = tuple(process.returncode for process in processes)
+        exit_code = exit_codes[-1]
+        if message.pipefail:
+            exit_code = next((code for code in reversed(exit_codes) if code != 0), 0)
+        resource_usage = pipeline_resource_usage(processes)
+        resource_usage["queue_wait"] = queue_wait
+        reply = dialogue.reply(
+            performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+            stdout=output.stdout.text() if chunker is None else "",
+            stderr=output.stderr.text() if chunker is None else "",
+            exit_code=exit_code,
+            resource_usage=resource_usage,
+            stage_exit_codes=exit_codes,
+        )
+        self._put_reply(to, reply)
+
+    def _find_processes(self, message: ShellCommandMessage) -> List[ChildProcess]:
+        """Find the running processes a control message refers to, by dialogue reference or by pid."""
 
-        error = f"command failed with exit code {proc.returncode}"
+        if message.process_reference is not None:
+            return self.processes.find(message.process_reference)
+        if message.process_id is not None:
+            process = self.processes.get(message.process_id)
+            return [process] if process is not None else []
+        raise ValueError("A process_reference or a process_id is required.")
+
+    async def send_signal(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """Handle ShellCommandMessage with SEND_SIGNAL Perfomative"""
+
+        try:
+            sig = signal.Signals(message.signal_number)
+            processes = self._find_processes(message)
+            if not processes:
+                raise ValueError("No running process matches the request.")
+        except ValueError as error:
+            return dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=str(error),
+            )
+        for process in processes:
+            self.logger.info(f"Sending {sig.name} to process {process.pid}")
+            process.send_signal(sig)
         return dialogue.reply(
+            performative=ShellCommandMessage.Performative.CONTROL_RESULT,
+            pids=tuple(process.pid for process in processes),
+            exit_codes=(),
+        )
+
+    async def terminate(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """
+        Handle ShellCommandMessage with TERMINATE Perfomative
+
+        The supervisor of the referenced dialogue, if any, stops restarting its process. The reply waits for the
+        processes to exit, which happens off the handler so that other messages are handled meanwhile.
+        """
+
+        try:
+            processes = self._find_processes(message)
+            reference = message.process_reference
+            if reference is None and processes:
+                reference = self.processes.reference_of(processes[0])
+            supervisor = self._supervisors.get(reference) if reference is not None else None
+            if not processes and supervisor is None:
+                raise ValueError("No running process matches the request.")
+        except ValueError as error:
+            return dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=str(error),
+            )
+        if supervisor is not None:
+            supervisor.stop()
+        self._create_task(self._terminate(message, dialogue, processes))
+        return None
+
+    async def query_status(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """
+        Handle ShellCommandMessage with QUERY_STATUS Perfomative
+
+        The status is read from the output the connection holds and the last usage sample, without touching
+        the processes themselves, so that it is cheap enough to poll every tick.
+        """
+
+        if message.process_reference is None and message.process_id is None:
+            statuses, error_message = [], "A process_reference or a process_id is required."
+        else:
+            statuses = self.processes.statuses(message.process_reference, message.process_id)
+            error_message = "No process matches the request."
+        if not statuses:
+            return dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=error_message,
+            )
+        tail_size = message.tail_size if message.tail_size is not None else self.status_tail_size
+        return dialogue.reply(
+            performative=ShellCommandMessage.Performative.STATUS_RESULT,
+            pids=tuple(status.pid for status in statuses),
+            running=tuple(status.running for status in statuses),
+            exit_codes=tuple(status.exit_code for status in statuses),
+            uptimes=tuple(status.uptime for status in statuses),
+            bytes_emitted=tuple(status.bytes_emitted for status in statuses),
+            cpu_times=tuple(status.cpu_time for status in statuses),
+            rss=tuple(status.rss for status in statuses),
+            stdout_tails=tuple(
+                status.tail("stdout", tail_size).decode("utf-8", errors="replace") for status in statuses
+            ),
+            stderr_tails=tuple(
+                status.tail("stderr", tail_size).decode("utf-8", errors="replace") for status in statuses
+            ),
+        )
+
+    async def write_stdin(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """
+        Handle ShellCommandMessage with WRITE_STDIN Perfomative
+
+        The data is written at once, or refused when the stdin buffer of the process cannot take it. The reply
+        waits for the buffer to drain into the pipe, and with eof for stdin to be closed, so that a writer
+        waiting on each reply is paced by the process reading its input.
+        """
+
+        try:
+            processes = [process for process in self._find_processes(message) if process.stdin is not None]
+            if not processes:
+                raise ValueError("No running process with an open stdin matches the request.")
+            # the latest process of a dialogue, as a supervised command is restarted
+            process = processes[-1]
+            process.stdin.write(message.data)
+        except (ValueError, BufferError) as error:
+            error_code = (
+                ShellCommandMessage.ErrorCode.COMMAND_EXECUTION_FAILURE
+                if isinstance(error, BufferError)
+                else ShellCommandMessage.ErrorCode.INVALID_COMMAND
+            )
+            return dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=error_code,
+                message=str(error),
+            )
+        self._create_task(self._drain_stdin(message, dialogue, process))
+        return None
+
+    async def _drain_stdin(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue, process: ChildProcess
+    ) -> None:
+        """Wait for the data written to the stdin of a process to drain, then reply."""
+
+        try:
+            if message.eof:
+                await process.stdin.close()
+            else:
+                await process.stdin.drain()
+        except ConnectionError as error:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.COMMAND_EXECUTION_FAILURE,
+                message=f"Process {process.pid} closed its stdin: {error}",
+            )
+        else:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.CONTROL_RESULT,
+                pids=(process.pid,),
+                exit_codes=(),
+            )
+        self._put_reply(message.sender, reply)
+
+    async def query_metrics(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue
+    ) -> Optional[ShellCommandMessage]:
+        """Handle ShellCommandMessage with QUERY_METRICS Perfomative"""
+
+        return dialogue.reply(
+            performative=ShellCommandMessage.Performative.METRICS_RESULT,
+            metrics=self.metrics.snapshot(
+                self._in_queue.qsize(),
+                self.processes.running(),
+                self.result_cache.stats() if self.result_cache.max_size > 0 else None,
+            ),
+        )
+
+    async def _sample_processes(self) -> None:
+        """Sample the cpu time and rss of the running processes, for their status."""
+
+        while True:
+            await asyncio.sleep(self.status_sample_interval)
+            self.processes.sample()
+
+    async def _terminate(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue, processes: List[ChildProcess]
+    ) -> None:
+        """Terminate processes and reply with their exit codes."""
+
+        grace_period = message.grace_period if message.grace_period is not None else self.terminate_grace_period
+        self.logger.info(f"Terminating processes {[process.pid for process in processes]}")
+        exit_codes = await terminate_processes(processes, grace_period)
+        reply = dialogue.reply(
+            performative=ShellCommandMessage.Performative.CONTROL_RESULT,
+            pids=tuple(process.pid for process in processes),
+            exit_codes=tuple(exit_codes),
+        )
+        self._put_reply(message.sender, reply)
+
+    async def _supervise_command(self, message: ShellCommandMessage, dialogue: ShellCommandDialogue) -> None:
+        """
+        Keep a long-running command alive, reporting its lifecycle as process events.
+
+        Supervised commands run outside the scheduler, as they would otherwise hold a slot for good.
+        The dialogue only ends when the command crash-loops or cannot be started.
+        """
+
+        to = message.sender
+        reference = dialogue.dialogue_label.dialogue_starter_reference
+        sink = self._make_sink(message)
+        chunker = self._make_chunker(to, dialogue) if message.stream_output and sink is None else None
+        on_output = chunker.feed if chunker is not None else None
+
+        async def spawn() -> ChildProcess:
+            process = await self._run_process(
+                command_list,
+                env_vars=env_vars,
+                cwd=cwd,
+                connect=sink is None,
+                limits=message.limits,
+                stdin=bool(message.open_stdin),
+            )
+            self.processes.add(reference, process)
+            if supervisor.stopped:
+                # terminated while starting, after the registered processes were signalled
+                process.kill_group(signal.SIGTERM)
+            return process
+
+        async def watch(process: ChildProcess) -> None:
+            output = ProcessOutput(self.stdout_buffer_size, self.stderr_buffer_size)
+            await self._finish_process(process, output, on_output, sink=sink)
+            if chunker is not None:
+                chunker.flush(final=True)
+
+        def emit(event: str, process: ChildProcess, restarts: int, exit_code: int = -1, message: str = "") -> None:
+            self.logger.info(f"Supervised process {process.pid} {event}: {command_list}")
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.PROCESS_EVENT,
+                event=event,
+                pid=process.pid,
+                restarts=restarts,
+                exit_code=exit_code,
+                message=message or None,
+            )
+            self._put_reply(to, reply)
+
+        try:
+            command_list, env_vars, cwd = self._build_command(message)
+            self.logger.info(f"Supervising command: {command_list}")
+            supervisor = Supervisor(
+                spawn,
+                watch,
+                emit,
+                self.restart_policy,
+                ready_probe=message.ready_probe,
+                probe_interval=self.probe_interval,
+                ready_timeout=self.ready_timeout,
+            )
+            self._supervisors[reference] = supervisor
+            process = await supervisor.run()
+        except (OSError, ValueError) as error:
+            error_code, error_message = ShellCommandMessage.ErrorCode.INVALID_COMMAND, str(error)
+        except CrashLoopError as error:
+            error_code, error_message = ShellCommandMessage.ErrorCode.COMMAND_EXECUTION_FAILURE, str(error)
+        else:
+            # stopped by a terminate request, which ends the dialogue with the last exit code
+            self.logger.info(f"Stopped supervising {message.command}")
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+                stdout="",
+                stderr="",
+                exit_code=process.returncode if process is not None else -1,
+            )
+            self._put_reply(to, reply)
+            return
+        finally:
+            self._supervisors.pop(reference, None)
+        self.logger.error(f"Stopped supervising {message.command}: {error_message}")
+        reply = dialogue.reply(
             performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
-            error=error,
-            stderr=stderr_lines,
-            stdout=stdout_lines,
-            exit_code=proc.returncode
+            error=error_code,
+            message=error_message,
+        )
+        self._put_reply(to, reply)
+
+    async def _schedule_command(
+        self, message: ShellCommandMessage, dialogue: ShellCommandDialogue, run: Optional[Callable] = None
+    ) -> None:
+        """
+        Wait for an execution slot, then run the command, or the pipeline with run, while holding it.
+
+        A detached command gives its slot back once it is replied to, rather than once its process exits.
+        """
+
+        command_class = message.command_class or DEFAULT_COMMAND_CLASS
+        queue_wait = await self.scheduler.acquire(command_class, message.priority or 0, message.sender)
+        if queue_wait > 0:
+            self.logger.debug(f"Command waited {queue_wait:.3f}s for a slot: {self.scheduler.stats()}")
+        held = True
+
+        def release() -> None:
+            nonlocal held
+            if held:
+                held = False
+                self.scheduler.release(command_class)
+
+        try:
+            await (run or partial(self._run_command, release=release))(message, dialogue, queue_wait)
+        finally:
+            release()
+
+    async def _run_command(
+        self,
+        message: ShellCommandMessage,
+        dialogue: ShellCommandDialogue,
+        queue_wait: float,
+        result_key: Optional[str] = None,
+        release: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Run a command and reply to its dialogue.
+
+        Detached commands are replied to as soon as they are spawned, giving back their execution slot with
+        release. Tracked commands, which await completion, stream their output, have a timeout or are cached,
+        are replied to once the process exits. The result of a command with a result_key is stored in the
+        result cache for its cache_ttl.
+        """
+
+        to = message.sender
+        sink = self._make_sink(message)
+        try:
+            command_list, env_vars, cwd = self._build_command(message)
+            self.logger.info(f"Executing command: {command_list}")
+            process = await self._run_process(
+                command_list,
+                env_vars=env_vars,
+                cwd=cwd,
+                connect=sink is None,
+                limits=message.limits,
+                stdin=bool(message.open_stdin),
+            )
+        except (OSError, ValueError) as error:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.INVALID_COMMAND,
+                message=str(error),
+            )
+            self._put_reply(to, reply)
+            return
+        self.logger.info(f"Process started: {process.pid}")
+        self.processes.add(dialogue.dialogue_label.dialogue_starter_reference, process)
+
+        tracked = (
+            message.stream_output or message.await_completion or message.timeout is not None or result_key is not None
+        )
+        if not tracked:
+            self.logger.info(f"Command started successfully: {command_list}")
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+                stderr="",
+                stdout="",
+                exit_code=-1,
+            )
+            self._put_reply(to, reply)
+            if release is not None:
+                release()
+
+        output = ProcessOutput(self.stdout_buffer_size, self.stderr_buffer_size)
+        chunker = self._make_chunker(to, dialogue) if message.stream_output and sink is None else None
+        on_output = chunker.feed if chunker is not None else None
+
+        completed = await self._finish_process(process, output, on_output, message.timeout, sink)
+        if chunker is not None:
+            chunker.flush(final=True)
+        if not tracked:
+            return
+
+        if not completed:
+            reply = dialogue.reply(
+                performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
+                error=ShellCommandMessage.ErrorCode.TIMEOUT_ERROR,
+                message=f"Command timed out after {message.timeout} seconds.",
+            )
+            self._put_reply(to, reply)
+            return
+
+        # streamed or sunk output is not repeated in the result
+        if chunker is not None or sink is not None:
+            stdout, stderr = "", ""
+        else:
+            stdout, stderr = output.stdout.text(), output.stderr.text()
+        resource_usage = process.resource_usage
+        resource_usage["queue_wait"] = queue_wait
+        if result_key is not None:
+            result = CachedResult(stdout, stderr, process.returncode, dict(resource_usage))
+            self.result_cache.put(result_key, result, message.cache_ttl)
+        await self._reply_result(message, dialogue, stdout, stderr, process.returncode, resource_usage)
+
+    async def _reply_result(
+        self,
+        message: ShellCommandMessage,
+        dialogue: ShellCommandDialogue,
+        stdout: str,
+        stderr: str,
+        exit_code: int,
+        resource_usage: Dict[str, float],
+    ) -> None:
+        """Reply with the result of a command, its output compressed if it asks for it and is large enough."""
+
+        compressed_output = None
+        if message.compress_output and len(stdout) + len(stderr) >= self.compression_threshold:
+            # zlib and zstd release the GIL, megabytes of output are compressed off the loop
+            compressed_output = await asyncio.get_running_loop().run_in_executor(
+                None, compress_output, stdout, stderr, self.compression_codec, self.compression_level
+            )
+            stdout, stderr = "", ""
+        reply = dialogue.reply(
+            performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            resource_usage=resource_usage,
+            compressed_output=compressed_output,
         )
+        self._put_reply(message.sender, reply)
+
+    def _make_chunker(self, to: Address, dialogue: ShellCommandDialogue) -> OutputChunker:
+        """Create a chunker replying to the dialogue with output chunks."""
+
+        sequence = 0
+
+        def emit(stdout: str, stderr: str) -> None:
+            nonlocal sequence
+            sequence += 1
+            chunk = dialogue.reply(
+                performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                stdout=stdout,
+                stderr=stderr,
+                sequence=sequence,
+            )
+            self._put_reply(to, chunk)
+
+        return OutputChunker(emit, self.chunk_size, self.chunk_interval)
 
 
 class ShellCommandConnection(Connection):
@@ -381,9 +1279,41 @@ class ShellCommandConnection(Connection):
         :param kwargs: keyword arguments
         """
 
-        keys = []
+        keys = [
+            "chunk_size",
+            "chunk_interval",
+            "echo_output",
+            "read_size",
+            "stdout_buffer_size",
+            "stderr_buffer_size",
+            "max_concurrency",
+            "class_limits",
+            "restart_backoff_initial",
+            "restart_backoff_max",
+            "crash_loop_restarts",
+            "crash_loop_window",
+            "probe_interval",
+            "ready_timeout",
+            "use_spawn_server",
+            "sink_max_bytes",
+            "sink_backup_count",
+            "cgroup_root",
+            "trusted_messages",
+            "compression_threshold",
+            "compression_codec",
+            "compression_level",
+            "terminate_grace_period",
+            "status_sample_interval",
+            "status_tail_size",
+            "status_history_size",
+            "stdin_buffer_size",
+            "result_cache_size",
+        ]
         config = kwargs["configuration"].config
-        custom_kwargs = {key: config.pop(key) for key in keys}
+        custom_kwargs = {key: config.pop(key) for key in keys if key in config}
+        if "profiles" in config:
+            custom_kwargs["profiles_config"] = config.pop("profiles")
+        receive_batch_size = config.pop("receive_batch_size", DEFAULT_RECEIVE_BATCH_SIZE)
         super().__init__(**kwargs)
 
         self.channel = ShellCommandAsyncChannel(
@@ -391,6 +1321,8 @@ class ShellCommandConnection(Connection):
             connection_id=self.connection_id,
             **custom_kwargs,
         )
+        self.receive_batch_size = receive_batch_size
+        self._receive_buffer: Deque[Envelope] = deque()
 
     async def connect(self) -> None:
         """Connect to a Shell Command."""
@@ -399,6 +1331,7 @@ class ShellCommandConnection(Connection):
             return
 
         with self._connect_context():
+            self._receive_buffer.clear()
             self.channel.logger = self.logger
             await self.channel.connect(self.loop)
 
@@ -432,9 +1365,14 @@ class ShellCommandConnection(Connection):
         del args, kwargs
 
         self._ensure_connected()
+        if self._receive_buffer:
+            return self._receive_buffer.popleft()
         try:
-            result = await self.channel.get_message()
-            return result
+            envelopes = await self.channel.get_messages(self.receive_batch_size)
         except Exception as e:  # noqa
             self.logger.info(f"Exception on receive {e}")
             return None
+        if not envelopes:
+            return None
+        self._receive_buffer.extend(envelopes[1:])
+        return envelopes[0]
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Resource limits, scheduling priorities and cgroup placement of commands run by the Shell Command connection."""
+
+import os
+import resource
+import itertools
+from typing import Dict, Callable, Optional
+from pathlib import Path
+
+import psutil
+
+
+RLIMITS = {
+    "address_space": resource.RLIMIT_AS,
+    "open_files": resource.RLIMIT_NOFILE,
+    "cpu_time": resource.RLIMIT_CPU,
+}
+PRIORITY_KEYS = ("nice", "io_class", "io_priority")
+CGROUP_FILES = {
+    "cpu_weight": "cpu.weight",
+    "memory_max": "memory.max",
+    "pids_max": "pids.max",
+}
+LIMIT_KEYS = frozenset(RLIMITS) | frozenset(PRIORITY_KEYS) | frozenset(CGROUP_FILES)
+
+
+def validate_limits(limits: Dict[str, int]) -> None:
+    """
+    Check that every limit of a command is one the connection knows how to apply.
+
+    :param limits: the limits of the command.
+    """
+
+    unknown = set(limits) - LIMIT_KEYS
+    if unknown:
+        raise ValueError(f"Unknown limits {sorted(unknown)}, expected some of {sorted(LIMIT_KEYS)}.")
+
+
+def child_limiter(limits: Dict[str, int], group: Optional[Path] = None) -> Callable[[], None]:
+    """
+    Build the function applying the limits of a command in its process, between the fork and the exec.
+
+    The process joins its cgroup first, so that nothing it forks escapes the group, and is constrained before
+    running any of the command. Everything is worked out up front, leaving the forked child to make syscalls.
+
+    :param limits: the limits of the process; rlimits are set as both soft and hard limit.
+    :param group: the cgroup the process joins, if any.
+    :return: the function, to be run in the child as the preexec_fn of subprocess.Popen.
+    """
+
+    procs = str(group / "cgroup.procs") if group is not None else None
+    rlimits = [(limit, (limits[key], limits[key])) for key, limit in RLIMITS.items() if key in limits]
+    nice = limits.get("nice")
+    ionice = "io_class" in limits or "io_priority" in limits
+
+    def limit() -> None:
+        if procs is not None:
+            fd = os.open(procs, os.O_WRONLY)
+            try:
+                os.write(fd, str(os.getpid()).encode())
+            finally:
+                os.close(fd)
+        for rlimit, value in rlimits:
+            resource.setrlimit(rlimit, value)
+        if nice is not None:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+        if ionice:
+            psutil.Process().ionice(limits.get("io_class", psutil.IOPRIO_CLASS_BE), limits.get("io_priority"))
+
+    return limit
+
+
+class CgroupManager:
+    """
+    Places commands in cgroup v2 groups of their own, below a delegated root.
+
+    Placement is skipped when the root is not a writable cgroup v2 hierarchy, so the same configuration
+    runs on hosts without one.
+    """
+
+    def __init__(self, root: Optional[str]) -> None:
+        """
+        Initialise the cgroup manager.
+
+        :param root: the delegated cgroup directory to create groups in, None to disable placement.
+        """
+
+        self.root = Path(root) if root else None
+        self.available = (
+            self.root is not None
+            and (self.root / "cgroup.controllers").exists()
+            and os.access(self.root, os.W_OK)
+        )
+        self._groups = itertools.count()
+
+    def create(self, limits: Dict[str, int]) -> Optional[Path]:
+        """
+        Create a new group carrying the cgroup limits of a command, for its process to join before it execs.
+
+        :param limits: the limits of the command.
+        :return: the group, or None when no group was needed or placement is unavailable.
+        """
+
+        if not self.available or not any(key in limits for key in CGROUP_FILES):
+            return None
+        group = self.root / f"command-{os.getpid()}-{next(self._groups)}"
+        group.mkdir()
+        try:
+            for key, filename in CGROUP_FILES.items():
+                if key in limits:
+                    (group / filename).write_text(str(limits[key]))
+        except OSError:
+            self.remove(group)
+            raise
+        return group
+
+    @staticmethod
+    def remove(group: Path) -> bool:
+        """Remove the group of a process which has exited, which fails while descendants remain in it."""
+
+        try:
+            group.rmdir()
+        except OSError:
+            return False
+        return True
+
+
+def sample_usage(pid: int) -> Dict[str, float]:
+    """
+    Sample the cpu, memory, io and context switches of a running process.
+
+    :param pid: the pid of the process.
+    :return: the usage, empty once the process is gone.
+    """
+
+    try:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            cpu = process.cpu_times()
+            ctx_switches = process.num_ctx_switches()
+            usage = {
+                "user_time": cpu.user,
+                "system_time": cpu.system,
+                "cpu_time": cpu.user + cpu.system,
+                "rss": float(process.memory_info().rss),
+                "voluntary_ctx_switches": float(ctx_switches.voluntary),
+                "involuntary_ctx_switches": float(ctx_switches.involuntary),
+            }
+            try:
+                io = process.io_counters()
+                usage["io_read_bytes"] = float(io.read_bytes)
+                usage["io_write_bytes"] = float(io.write_bytes)
+            except (psutil.AccessDenied, AttributeError):
+                pass
+    except psutil.Error:
+        return {}
+    return usage
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Metrics of the Shell Command connection, recorded on the hot path and summarised on request."""
+
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Iterable, Optional
+from collections import deque
+
+from packages.eightballer.connections.shell_command.registry import ProcessStatus
+
+
+# doubling from 100us to about 100s
+LATENCY_BUCKETS = tuple(0.0001 * 2**exponent for exponent in range(21))
+QUANTILES = (0.5, 0.9, 0.99)
+
+SPAWN_LATENCY = "shell_command_spawn_latency_seconds"
+FIRST_BYTE_LATENCY = "shell_command_first_byte_seconds"
+ENVELOPE_WAIT = "shell_command_envelope_wait_seconds"
+HANDLER_DURATION = "shell_command_handler_duration_seconds"
+IN_QUEUE_DEPTH = "shell_command_in_queue_depth"
+IN_QUEUE_MAX_DEPTH = "shell_command_in_queue_max_depth"
+OUTPUT_BYTES_RATE = "shell_command_output_bytes_per_second"
+OUTPUT_LINES_RATE = "shell_command_output_lines_per_second"
+RESULT_CACHE_SIZE = "shell_command_result_cache_size"
+RESULT_CACHE_HITS = "shell_command_result_cache_hits"
+RESULT_CACHE_MISSES = "shell_command_result_cache_misses"
+RESULT_CACHE_EVICTIONS = "shell_command_result_cache_evictions"
+
+SUMMARIES = {
+    SPAWN_LATENCY: ("Time taken to spawn a process.", ()),
+    FIRST_BYTE_LATENCY: ("Time from the spawn of a process to its first byte of output.", ()),
+    ENVELOPE_WAIT: ("Time a reply waits in the in-queue of the connection.", ()),
+    HANDLER_DURATION: ("Time a handler holds the event loop, by performative.", ("performative",)),
+}
+GAUGES = {
+    IN_QUEUE_DEPTH: ("Number of replies waiting in the in-queue of the connection.", ()),
+    IN_QUEUE_MAX_DEPTH: ("Largest number of replies waiting in the in-queue of the connection.", ()),
+    RESULT_CACHE_SIZE: ("Number of command results held in the result cache.", ()),
+    RESULT_CACHE_HITS: ("Number of commands answered from the result cache.", ()),
+    RESULT_CACHE_MISSES: ("Number of cacheable commands run as their result was not cached.", ()),
+    RESULT_CACHE_EVICTIONS: ("Number of results evicted from the full result cache.", ()),
+}
+# reported by pid in a snapshot, and pushed to Prometheus as totals so that no series outlives its process
+PROCESS_GAUGES = {
+    OUTPUT_BYTES_RATE: "Bytes of output per second of the running processes.",
+    OUTPUT_LINES_RATE: "Lines of output per second of the running processes.",
+}
+
+
+class Histogram:
+    """Counts of observations in fixed buckets, cheap enough to record on every event."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """
+        Initialise the histogram.
+
+        :param bounds: the upper bounds of the buckets, ascending, the last bucket taking anything larger.
+        """
+
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record an observation."""
+
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, quantile: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in, capped at the largest observation."""
+
+        rank = quantile * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def metric_key(name: str, labels: Optional[Dict[str, str]] = None) -> str:
+    """Format the key of a metric, its name followed by its labels as in the Prometheus exposition format."""
+
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{label}="{value}"' for label, value in sorted(labels.items())) + "}"
+
+
+def parse_metric_key(key: str) -> Tuple[str, Dict[str, str]]:
+    """Split the key of a metric into its name and its labels."""
+
+    name, _, labels = key.partition("{")
+    if not labels:
+        return name, {}
+    pairs = (pair.split("=", 1) for pair in labels[:-1].split(","))
+    return name, {label: value.strip('"') for label, value in pairs}
+
+
+def prometheus_metrics() -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """
+    Get the name, description and label names of the gauges a snapshot is pushed to Prometheus as.
+
+    Summaries are pushed as a gauge of their quantiles, labelled by quantile, along with their count and sum.
+    """
+
+    metrics = []
+    for name, (description, labels) in SUMMARIES.items():
+        metrics.append((name, description, labels + ("quantile",)))
+        metrics.append((f"{name}_count", f"{description} Number of observations.", labels))
+        metrics.append((f"{name}_sum", f"{description} Sum of observations.", labels))
+    for name, (description, labels) in GAUGES.items():
+        metrics.append((name, description, labels))
+    for name, description in PROCESS_GAUGES.items():
+        metrics.append((name, description, ()))
+    return metrics
+
+
+def prometheus_values(snapshot: Dict[str, float]) -> Dict[str, float]:
+    """
+    Get the values a snapshot is pushed to Prometheus as, by key as formatted by metric_key.
+
+    The series of each process are summed into a total across the running processes, which falls back to 0
+    once they have all exited.
+    """
+
+    values = dict.fromkeys(PROCESS_GAUGES, 0.0)
+    for key, value in snapshot.items():
+        name = key.partition("{")[0]
+        if name in PROCESS_GAUGES:
+            values[name] += value
+        else:
+            values[key] = value
+    return values
+
+
+class ConnectionMetrics:
+    """
+    The metrics of a Shell Command connection.
+
+    Recording only counts into fixed buckets, so that it costs a few hundred nanoseconds per event. Quantiles
+    and per-process rates are only computed when a snapshot is taken.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the metrics."""
+
+        self.spawn_latency = Histogram()
+        self.first_byte_latency = Histogram()
+        self.envelope_wait = Histogram()
+        self.handler_durations: Dict[str, Histogram] = {}
+        self.in_queue_max_depth = 0
+        self._enqueued_at: deque = deque()
+
+    def handler_duration(self, performative: str) -> Histogram:
+        """Get the histogram of the durations of the handler of a performative."""
+
+        histogram = self.handler_durations.get(performative)
+        if histogram is None:
+            histogram = self.handler_durations[performative] = Histogram()
+        return histogram
+
+    def enqueued(self, depth: int) -> None:
+        """Record a reply put on the in-queue, which now holds depth replies."""
+
+        self._enqueued_at.append(time.perf_counter())
+        if depth > self.in_queue_max_depth:
+            self.in_queue_max_depth = depth
+
+    def dequeued(self) -> None:
+        """Record the oldest reply on the in-queue being taken off it."""
+
+        if self._enqueued_at:
+            self.envelope_wait.observe(time.perf_counter() - self._enqueued_at.popleft())
+
+    def clear_queue(self) -> None:
+        """Forget the replies on an in-queue which is discarded."""
+        self._enqueued_at.clear()
+
+    def snapshot(
+        self,
+        in_queue_depth: int,
+        statuses: Iterable[ProcessStatus] = (),
+        result_cache: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, float]:
+        """
+        Take a snapshot of the metrics.
+
+        :param in_queue_depth: the number of replies on the in-queue.
+        :param statuses: the statuses of the running processes, whose output rates are reported.
+        :param result_cache: the counters of the result cache, if enabled.
+        :return: the value of each metric by key, as formatted by metric_key.
+        """
+
+        metrics: Dict[str, float] = {}
+        self._summarise(metrics, SPAWN_LATENCY, self.spawn_latency)
+        self._summarise(metrics, FIRST_BYTE_LATENCY, self.first_byte_latency)
+        self._summarise(metrics, ENVELOPE_WAIT, self.envelope_wait)
+        for performative, histogram in self.handler_durations.items():
+            self._summarise(metrics, HANDLER_DURATION, histogram, {"performative": performative})
+        metrics[IN_QUEUE_DEPTH] = float(in_queue_depth)
+        metrics[IN_QUEUE_MAX_DEPTH] = float(self.in_queue_max_depth)
+        for status in statuses:
+            uptime = status.uptime
+            if uptime <= 0:
+                continue
+            labels = {"pid": str(status.pid)}
+            metrics[metric_key(OUTPUT_BYTES_RATE, labels)] = status.bytes_emitted / uptime
+            lines = status.lines_emitted
+            if lines is not None:
+                metrics[metric_key(OUTPUT_LINES_RATE, labels)] = lines / uptime
+        if result_cache is not None:
+            metrics[RESULT_CACHE_SIZE] = float(result_cache["size"])
+            metrics[RESULT_CACHE_HITS] = float(result_cache["hits"])
+            metrics[RESULT_CACHE_MISSES] = float(result_cache["misses"])
+            metrics[RESULT_CACHE_EVICTIONS] = float(result_cache["evictions"])
+        return metrics
+
+    @staticmethod
+    def _summarise(
+        metrics: Dict[str, float], name: str, histogram: Histogram, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Add the quantiles, count and sum of a histogram to a snapshot."""
+
+        labels = labels or {}
+        for quantile in QUANTILES:
+            metrics[metric_key(name, {**labels, "quantile": str(quantile)})] = histogram.quantile(quantile)
+        metrics[metric_key(f"{name}_count", labels)] = float(histogram.count)
+        metrics[metric_key(f"{name}_sum", labels)] = histogram.total
@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Child processes spawned by the Shell Command connection."""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import resource
+import itertools
+import subprocess
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+
+from packages.eightballer.connections.shell_command.limits import sample_usage
+
+
+SPAWN_SERVER_PATH = Path(__file__).parent / "spawn_server.py"
+SPAWN_SERVER_STOP_TIMEOUT = 1.0
+MAX_MESSAGE_SIZE = 1024 * 1024
+MAX_FDS = 2
+DEFAULT_STDIN_BUFFER_SIZE = 1024 * 1024
+# the capacity of a pipe on linux, beyond which writes wait on the process reading
+STDIN_HIGH_WATER_MARK = 64 * 1024
+
+
+class StdinProtocol(asyncio.streams.FlowControlMixin):
+    """The protocol of a stdin pipe, pausing its writer on backpressure and reporting when it is closed."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialise the protocol."""
+
+        super().__init__(loop=loop)
+        self._closed = loop.create_future()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Release the waiters once the pipe is closed."""
+
+        super().connection_lost(exc)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def _get_close_waiter(self, stream: asyncio.StreamWriter) -> asyncio.Future:
+        """Get the future StreamWriter.wait_closed waits on."""
+        return self._closed
+
+
+class StdinWriter:
+    """
+    The stdin of a process, written through a bounded buffer.
+
+    Writes beyond what the pipe holds wait in the buffer of the transport, which is refused more than
+    buffer_size bytes. Draining waits for the buffer to fall below the capacity of the pipe, so that
+    writers acknowledged only once drained are paced by the process reading its input.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, buffer_size: int = DEFAULT_STDIN_BUFFER_SIZE) -> None:
+        """
+        Initialise the writer.
+
+        :param writer: the stream writer of the stdin pipe.
+        :param buffer_size: the number of bytes which may be buffered.
+        """
+
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        self._writer = writer
+        self._writer.transport.set_write_buffer_limits(high=min(STDIN_HIGH_WATER_MARK, buffer_size))
+        self._eof = False
+
+    @property
+    def buffered(self) -> int:
+        """Get the number of bytes written but not yet taken by the pipe."""
+        return self._writer.transport.get_write_buffer_size()
+
+    @property
+    def closed(self) -> bool:
+        """Check whether the end of the input was written, or the process closed its stdin."""
+        return self._eof or self._writer.is_closing()
+
+    def write(self, data: bytes) -> None:
+        """
+        Write data to the stdin of the process without waiting.
+
+        :param data: the data to write.
+        :raises ValueError: if stdin is closed.
+        :raises BufferError: if the data does not fit in the buffer.
+        """
+
+        if self.closed:
+            raise ValueError("The stdin of the process is closed.")
+        if self.buffered + len(data) > self.buffer_size:
+            raise BufferError(
+                f"The stdin buffer of the process is full, {self.buffered} of {self.buffer_size} bytes are pending."
+            )
+        self._writer.write(data)
+        self.bytes_written += len(data)
+
+    async def drain(self) -> None:
+        """Wait for the buffer to fall below the capacity of the pipe."""
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        """Write the end of the input once the buffered data is taken by the pipe."""
+
+        self._eof = True
+        # the transport writes out its buffer before closing the pipe
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    def abort(self) -> None:
+        """Close stdin at once, dropping any buffered data."""
+
+        self._eof = True
+        if not self._writer.is_closing():
+            self._writer.transport.abort()
+
+
+class ChildProcess:
+    """
+    A child process with asyncio pipes, reaped by the connection itself.
+
+    The asyncio child watcher discards the resource usage of the children it reaps, so the connection
+    waits on a pidfd instead and collects the exit status and rusage with os.wait4.
+    """
+
+    def __init__(self, pid: int, loop: asyncio.AbstractEventLoop, popen: Optional[subprocess.Popen] = None) -> None:
+        """
+        Initialise the child process.
+
+        :param pid: the pid of the process.
+        :param loop: the event loop the process is watched on.
+        :param popen: the spawned process, when it was spawned by this process.
+        """
+
+        self.popen = popen
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self.started_at = time.monotonic()
+        self.ended_at: Optional[float] = None
+        self.rusage: Optional[Any] = None
+        self.stdout: Optional[asyncio.StreamReader] = None
+        self.stderr: Optional[asyncio.StreamReader] = None
+        self.stdin: Optional[StdinWriter] = None
+        self.pipes: Dict[str, Any] = {}
+        self._loop = loop
+        self._exited: asyncio.Future = loop.create_future()
+        self._pidfd: Optional[int] = None
+
+    @classmethod
+    async def spawn(
+        cls,
+        argv: List[str],
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        connect: bool = True,
+        stdin_buffer_size: int = DEFAULT_STDIN_BUFFER_SIZE,
+        **popen_kwargs: Any,
+    ) -> "ChildProcess":
+        """
+        Spawn a process in its own process group with stdout and stderr piped.
+
+        :param argv: the executable and its arguments.
+        :param env: the environment of the process, defaults to the parent environment.
+        :param cwd: the working directory of the process.
+        :param connect: whether to read the pipes through stream readers, or leave them raw in `pipes`.
+        :param stdin_buffer_size: the number of bytes buffered for stdin, when it is piped.
+        :param popen_kwargs: further keyword arguments for subprocess.Popen, stdin=subprocess.PIPE opening
+            stdin for writing through `stdin`.
+        :return: the child process.
+        """
+
+        loop = asyncio.get_event_loop()
+        popen_kwargs.setdefault("stdout", subprocess.PIPE)
+        popen_kwargs.setdefault("stderr", subprocess.PIPE)
+        popen = subprocess.Popen(  # pylint: disable=consider-using-with  # nosec
+            argv,
+            env=env,
+            cwd=cwd,
+            start_new_session=True,
+            **popen_kwargs,
+        )
+        process = cls(popen.pid, loop, popen)
+        process._watch()
+        if popen.stdin is not None:
+            process.stdin = StdinWriter(await process._connect_stdin(popen.stdin), stdin_buffer_size)
+        if not connect:
+            process.pipes = {"stdout": popen.stdout, "stderr": popen.stderr}
+            return process
+        if popen.stdout is not None:
+            process.stdout = await process._connect_pipe(popen.stdout)
+        if popen.stderr is not None:
+            process.stderr = await process._connect_pipe(popen.stderr)
+        return process
+
+    async def connect_pipes(self, stdout: Any, stderr: Any) -> None:
+        """
+        Read the output of a process spawned elsewhere from the read ends of its pipes.
+
+        :param stdout: the read end of the stdout pipe.
+        :param stderr: the read end of the stderr pipe.
+        """
+
+        self.stdout = await self._connect_pipe(stdout)
+        self.stderr = await self._connect_pipe(stderr)
+
+    async def _connect_pipe(self, pipe: Any) -> asyncio.StreamReader:
+        """Wrap a pipe in a stream reader."""
+
+        reader = asyncio.StreamReader(loop=self._loop)
+        await self._loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=self._loop), pipe)
+        return reader
+
+    async def _connect_stdin(self, pipe: Any) -> asyncio.StreamWriter:
+        """Wrap the stdin pipe in a stream writer."""
+
+        transport, protocol = await self._loop.connect_write_pipe(lambda: StdinProtocol(self._loop), pipe)
+        return asyncio.StreamWriter(transport, protocol, None, self._loop)
+
+    def _watch(self) -> None:
+        """Reap the process once it exits, on a pidfd where the platform supports it."""
+
+        try:
+            self._pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            reaper = self._loop.run_in_executor(None, os.wait4, self.pid, 0)
+            reaper.add_done_callback(lambda future: self._set_exit(*future.result()[1:]))
+            return
+        self._loop.add_reader(self._pidfd, self._on_pidfd_ready)
+
+    def _on_pidfd_ready(self) -> None:
+        """Collect the exit status once the pidfd becomes readable."""
+
+        pid, status, rusage = os.wait4(self.pid, os.WNOHANG)
+        if pid == 0:
+            return
+        self._loop.remove_reader(self._pidfd)
+        os.close(self._pidfd)
+        self._pidfd = None
+        self._set_exit(status, rusage)
+
+    def _set_exit(self, status: int, rusage: Any) -> None:
+        """Record the exit of the process."""
+
+        self.ended_at = time.monotonic()
+        self.rusage = rusage
+        self.returncode = os.waitstatus_to_exitcode(status)
+        if self.popen is not None:
+            self.popen.returncode = self.returncode
+        if not self._exited.done():
+            self._exited.set_result(self.returncode)
+
+    async def wait(self) -> int:
+        """Wait for the process to exit and return its exit code."""
+        return await asyncio.shield(self._exited)
+
+    def send_signal(self, sig: int) -> None:
+        """Send a signal to the process if it is still running."""
+
+        if self.returncode is None:
+            os.kill(self.pid, sig)
+
+    def kill_group(self, sig: int = signal.SIGKILL) -> None:
+        """
+        Send a signal to the whole process group of the process.
+
+        The group outlives its leader while any member remains, and its id is not reused as a pid until then,
+        so members left behind are still signalled once the process itself has exited.
+        """
+
+        try:
+            os.killpg(self.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    @property
+    def wall_time(self) -> float:
+        """Get the seconds elapsed since the process was spawned, until it exited."""
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+    @property
+    def resource_usage(self) -> Dict[str, float]:
+        """
+        Get the resource usage of the process.
+
+        Once the process has exited this is its rusage, where rss is the peak and io is counted in blocks of
+        512 bytes. While it runs, the usage is sampled from the process itself and rss is the current size.
+        """
+
+        usage = {"wall_time": self.wall_time}
+        if self.rusage is not None:
+            usage["user_time"] = self.rusage.ru_utime
+            usage["system_time"] = self.rusage.ru_stime
+            usage["cpu_time"] = self.rusage.ru_utime + self.rusage.ru_stime
+            usage["max_rss"] = float(self.rusage.ru_maxrss * 1024)
+            usage["voluntary_ctx_switches"] = float(self.rusage.ru_nvcsw)
+            usage["involuntary_ctx_switches"] = float(self.rusage.ru_nivcsw)
+            usage["io_read_bytes"] = float(self.rusage.ru_inblock * 512)
+            usage["io_write_bytes"] = float(self.rusage.ru_oublock * 512)
+        elif self.returncode is None:
+            usage.update(sample_usage(self.pid))
+        return usage
+
+
+async def spawn_pipeline(
+    stages: List[List[str]],
+    env: Optional[Dict[str, str]] = None,
+    cwd: Optional[str] = None,
+) -> List[ChildProcess]:
+    """
+    Spawn the stages of a pipeline, the stdout of each stage piped into the stdin of the next.
+
+    The stages are wired together with plain pipes between the children, so the data flowing through the
+    pipeline never passes through this process. As in a shell, every stage writes its stderr to the same
+    pipe, which is read along with the stdout of the last stage through the streams of the last process.
+
+    :param stages: the executable and arguments of each stage.
+    :param env: the environment of the stages, defaults to the parent environment.
+    :param cwd: the working directory of the stages.
+    :return: the processes of the stages, in order.
+    """
+
+    stderr_read, stderr_write = os.pipe()
+    processes: List[ChildProcess] = []
+    stdin: Optional[int] = None
+    try:
+        for index, argv in enumerate(stages):
+            last = index == len(stages) - 1
+            stdout_read, stdout_write = (None, subprocess.PIPE) if last else os.pipe()
+            try:
+                process = await ChildProcess.spawn(
+                    argv, env=env, cwd=cwd, connect=False, stdin=stdin, stdout=stdout_write, stderr=stderr_write
+                )
+            finally:
+                # the children hold their own copies of the ends they use
+                for fd in (stdin, None if last else stdout_write):
+                    if fd is not None:
+                        os.close(fd)
+                stdin = stdout_read
+            processes.append(process)
+    except OSError:
+        if stdin is not None:
+            os.close(stdin)
+        os.close(stderr_read)
+        os.close(stderr_write)
+        for process in processes:
+            process.kill_group()
+        await asyncio.gather(*(process.wait() for process in processes))
+        raise
+    os.close(stderr_write)
+    last = processes[-1]
+    await last.connect_pipes(last.pipes["stdout"], os.fdopen(stderr_read, "rb", 0))
+    last.pipes = {}
+    return processes
+
+
+def pipeline_resource_usage(processes: List[ChildProcess]) -> Dict[str, float]:
+    """Get the resource usage of the stages of a pipeline, summed over the stages but for the peak rss."""
+
+    usage: Dict[str, float] = {}
+    for process in processes:
+        for key, value in process.resource_usage.items():
+            usage[key] = max(usage.get(key, 0.0), value) if key == "max_rss" else usage.get(key, 0.0) + value
+    usage["wall_time"] = max(process.ended_at or time.monotonic() for process in processes) - min(
+        process.started_at for process in processes
+    )
+    return usage
+
+
+class SpawnServer:
+    """
+    Spawns commands through a helper process started when the connection connects.
+
+    Forking the helper rather than the agent keeps launch latency flat however large the agent's heap grows.
+    The helper owns the commands it spawns, so their exit status and rusage arrive as messages from it
+    rather than from a pidfd. Should the helper die, its remaining commands are killed.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the spawn server."""
+
+        self.helper: Optional[ChildProcess] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sock: Optional[socket.socket] = None
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._processes: Dict[int, ChildProcess] = {}
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the helper can take requests."""
+        return self._sock is not None
+
+    async def start(self) -> None:
+        """Start the helper process."""
+
+        self._loop = asyncio.get_event_loop()
+        sock, helper_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        with helper_sock:
+            self.helper = await ChildProcess.spawn(
+                [sys.executable, "-I", "-S", str(SPAWN_SERVER_PATH), str(helper_sock.fileno())],
+                stdout=None,
+                stderr=None,
+                pass_fds=[helper_sock.fileno()],
+            )
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    async def stop(self) -> None:
+        """Stop the helper, which kills any command still running."""
+
+        if self._sock is not None:
+            self._close()
+        if self.helper is not None:
+            try:
+                await asyncio.wait_for(self.helper.wait(), SPAWN_SERVER_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.helper.kill_group()
+                await self.helper.wait()
+            self.helper = None
+
+    async def spawn(
+        self,
+        argv: List[str],
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        connect: bool = True,
+    ) -> ChildProcess:
+        """
+        Spawn a process in its own process group with stdout and stderr piped.
+
+        :param argv: the executable and its arguments.
+        :param env: the environment of the process, defaults to the environment of the helper.
+        :param cwd: the working directory of the process.
+        :param connect: whether to read the pipes through stream readers, or leave them raw in `pipes`.
+        :return: the child process.
+        """
+
+        if self._sock is None:
+            raise OSError("The spawn server is not running.")
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        request = {"id": request_id, "argv": list(argv), "env": env, "cwd": cwd}
+        await self._loop.sock_sendall(self._sock, json.dumps(request).encode("utf-8"))
+        process, fds = await future
+        stdout, stderr = (os.fdopen(fd, "rb", 0) for fd in fds)
+        if not connect:
+            process.pipes = {"stdout": stdout, "stderr": stderr}
+            return process
+        await process.connect_pipes(stdout, stderr)
+        return process
+
+    def _on_readable(self) -> None:
+        """Handle the replies and exit reports of the helper."""
+
+        while self._sock is not None:
+            try:
+                data, fds, _, _ = socket.recv_fds(self._sock, MAX_MESSAGE_SIZE, MAX_FDS)
+            except BlockingIOError:
+                return
+            except OSError:
+                data, fds = b"", []
+            if not data:
+                self._close()
+                return
+            self._handle_message(json.loads(data), fds)
+
+    def _handle_message(self, message: Dict[str, Any], fds: List[int]) -> None:
+        """Resolve a spawn request, or record the exit of a process."""
+
+        if "exit" in message:
+            process = self._processes.pop(message["exit"], None)
+            if process is not None:
+                process._set_exit(  # pylint: disable=protected-access
+                    message["status"], resource.struct_rusage(message["rusage"])
+                )
+            return
+
+        future = self._pending.pop(message["id"], None)
+        if "errno" in message:
+            if future is not None and not future.done():
+                future.set_exception(OSError(message["errno"], message["error"], message["filename"]))
+            return
+
+        process = ChildProcess(message["pid"], self._loop)
+        self._processes[process.pid] = process
+        if future is None or future.done():
+            for fd in fds:
+                os.close(fd)
+            process.kill_group()
+            return
+        future.set_result((process, fds))
+
+    def _close(self) -> None:
+        """Close the socket to the helper, failing what is still pending on it."""
+
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(OSError("The spawn server exited."))
+        self._pending.clear()
+        for process in self._processes.values():
+            process.kill_group()
+            process._set_exit(signal.SIGKILL, None)  # pylint: disable=protected-access
+        self._processes.clear()
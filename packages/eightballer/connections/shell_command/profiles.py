@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Named command profiles of the Shell Command connection."""
+
+import os
+import shutil
+from typing import Any, Dict, List, Tuple, Optional
+
+
+class CommandProfile:
+    """
+    A command whose executable, environment, working directory and default arguments are resolved once.
+
+    Profiles are declared under `profiles` in the connection configuration, for example:
+
+        profiles:
+          broker:
+            command: ./broker
+            args: [--broker, --port, "8080"]
+            env: {RUST_LOG: DEBUG}
+            cwd: .
+            inherit_env: true
+
+    A message referring to the profile only carries what differs from it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command: str,
+        args: Optional[List[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        inherit_env: bool = True,
+    ) -> None:
+        """
+        Initialise the profile.
+
+        :param name: the name messages refer to the profile by.
+        :param command: the executable, looked up on the PATH of the profile environment.
+        :param args: the arguments passed before those of the message.
+        :param env: the environment of the profile, on top of the agent environment if inherited.
+        :param cwd: the working directory of the commands.
+        :param inherit_env: whether the environment starts from the agent environment.
+        """
+
+        self.name = name
+        self.command = command
+        self.args = [str(arg) for arg in args or []]
+        self.env = {key: str(value) for key, value in (env or {}).items()}
+        self.cwd = cwd
+        self.inherit_env = inherit_env
+        self.executable: Optional[str] = None
+        self.environment: Dict[str, str] = {}
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "CommandProfile":
+        """Build a profile from its entry in the connection configuration."""
+
+        unknown = set(config) - {"command", "args", "env", "cwd", "inherit_env"}
+        if unknown or "command" not in config:
+            raise ValueError(f"Profile {name} must set command and may set args, env, cwd and inherit_env.")
+        return cls(name, **config)
+
+    def resolve(self) -> "CommandProfile":
+        """
+        Resolve the executable, environment and working directory.
+
+        :return: the profile.
+        """
+
+        self.environment = {**os.environ, **self.env} if self.inherit_env else dict(self.env)
+        if self.cwd is not None:
+            self.cwd = os.path.abspath(self.cwd)
+            if not os.path.isdir(self.cwd):
+                raise ValueError(f"Profile {self.name} has no working directory {self.cwd}.")
+        if os.sep in self.command:
+            executable = os.path.join(self.cwd or os.getcwd(), self.command)
+            executable = executable if os.access(executable, os.X_OK) else None
+        else:
+            executable = shutil.which(self.command, path=self.environment.get("PATH", os.defpath))
+        if executable is None:
+            raise ValueError(f"Profile {self.name} has no executable {self.command}.")
+        self.executable = executable
+        return self
+
+    def build(
+        self, args: List[str], env_overrides: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Build the argument list and environment of a command run with the profile.
+
+        :param args: the arguments following the default arguments of the profile.
+        :param env_overrides: the variables to set on top of the profile environment.
+        :return: the argument list and the environment.
+        """
+
+        env = {**self.environment, **env_overrides} if env_overrides else self.environment
+        return [self.executable, *self.args, *args], env
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""The registry of the processes run by the Shell Command connection."""
+
+import time
+import signal
+import asyncio
+from typing import Dict, List, Tuple, Union, Iterator, Optional, Iterable
+from collections import OrderedDict
+
+import psutil
+
+from packages.eightballer.connections.shell_command.sinks import OutputSink, read_tail
+from packages.eightballer.connections.shell_command.buffers import STREAMS, ProcessOutput
+from packages.eightballer.connections.shell_command.process import ChildProcess
+
+
+DEFAULT_HISTORY_SIZE = 64
+DEFAULT_TAIL_SIZE = 4096
+
+
+class ProcessStatus:
+    """
+    The status of a process, built from state the connection already holds.
+
+    Output counts and tails are read from the buffers or log files the output goes to, and cpu time and rss
+    from the last sample taken by the registry, so that reading a status never touches /proc. Once the process
+    has exited its status is frozen, with the cpu time and peak rss of its rusage.
+    """
+
+    __slots__ = ("process", "reference", "output", "cpu_time", "rss", "sampled_at", "_sampler", "_frozen")
+
+    def __init__(self, reference: str, process: ChildProcess) -> None:
+        """
+        Initialise the status.
+
+        :param reference: the starter reference of the dialogue which started the process.
+        :param process: the process.
+        """
+
+        self.process = process
+        self.reference = reference
+        self.output: Optional[Union[ProcessOutput, OutputSink]] = None
+        self.cpu_time = 0.0
+        self.rss = 0
+        self.sampled_at: Optional[float] = None
+        self._sampler: Optional[psutil.Process] = None
+        self._frozen: Optional[Tuple[int, Dict[str, bytes]]] = None
+
+    @property
+    def pid(self) -> int:
+        """Get the pid of the process."""
+        return self.process.pid
+
+    @property
+    def running(self) -> bool:
+        """Check whether the process is still running."""
+        return self.process.returncode is None
+
+    @property
+    def exit_code(self) -> int:
+        """Get the exit code of the process, -1 while it runs."""
+        return self.process.returncode if self.process.returncode is not None else -1
+
+    @property
+    def uptime(self) -> float:
+        """Get the seconds the process has been running for, or ran for."""
+        return self.process.wall_time
+
+    @property
+    def bytes_emitted(self) -> int:
+        """Get the number of bytes the process wrote to stdout and stderr."""
+
+        if self._frozen is not None:
+            return self._frozen[0]
+        if isinstance(self.output, ProcessOutput):
+            return self.output.stdout.bytes_written + self.output.stderr.bytes_written
+        if isinstance(self.output, OutputSink):
+            return self.output.bytes_written
+        return 0
+
+    @property
+    def lines_emitted(self) -> Optional[int]:
+        """Get the number of lines the process wrote to stdout and stderr, unknown while it is sunk or exited."""
+
+        if isinstance(self.output, ProcessOutput):
+            return self.output.stdout.lines_written + self.output.stderr.lines_written
+        if self.output is None and self._frozen is None:
+            return 0
+        return None
+
+    def tail(self, stream: str, size: int) -> bytes:
+        """Get the most recent output of a stream, up to size bytes."""
+
+        if self._frozen is not None:
+            return self._frozen[1][stream][-size:] if size else b""
+        if isinstance(self.output, ProcessOutput):
+            return self.output.streams[stream].tail(size)
+        if isinstance(self.output, OutputSink):
+            try:
+                return read_tail(self.output.files[stream].path, size)
+            except FileNotFoundError:
+                return b""
+        return b""
+
+    def sample(self) -> None:
+        """Sample the cpu time and rss of the running process."""
+
+        try:
+            if self._sampler is None:
+                self._sampler = psutil.Process(self.pid)
+            with self._sampler.oneshot():
+                cpu = self._sampler.cpu_times()
+                self.rss = self._sampler.memory_info().rss
+            self.cpu_time = cpu.user + cpu.system
+            self.sampled_at = time.monotonic()
+        except psutil.Error:
+            pass
+
+    def freeze(self, tail_size: int) -> None:
+        """Keep what the status needs from the output once the process has exited, and its final usage."""
+
+        tails = {stream: self.tail(stream, tail_size) for stream in STREAMS}
+        self._frozen = (self.bytes_emitted, tails)
+        self.output = None
+        self._sampler = None
+        rusage = self.process.rusage
+        if rusage is not None:
+            self.cpu_time = rusage.ru_utime + rusage.ru_stime
+            self.rss = rusage.ru_maxrss * 1024
+            self.sampled_at = self.process.ended_at
+
+
+class ProcessRegistry:
+    """
+    Running processes, indexed by pid and by the reference of the dialogue which started them.
+
+    The reference is the starter reference of the dialogue, which the agent knows as soon as it sends the
+    command, so that it can act on the processes of a command before the connection has replied. The status
+    of the most recently exited processes is kept, so that the exit of a process can still be queried.
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE, tail_size: int = DEFAULT_TAIL_SIZE) -> None:
+        """
+        Initialise the registry.
+
+        :param history_size: the number of exited processes whose status is kept.
+        :param tail_size: the number of bytes of output kept per stream for exited processes.
+        """
+
+        self.history_size = history_size
+        self.tail_size = tail_size
+        self._by_pid: Dict[int, ProcessStatus] = {}
+        self._by_reference: Dict[str, Dict[int, ChildProcess]] = {}
+        self._exited: "OrderedDict[int, ProcessStatus]" = OrderedDict()
+
+    def add(self, reference: str, process: ChildProcess) -> ProcessStatus:
+        """
+        Register a process.
+
+        :param reference: the starter reference of the dialogue which started the process.
+        :param process: the process.
+        :return: the status of the process.
+        """
+
+        status = ProcessStatus(reference, process)
+        self._by_pid[process.pid] = status
+        self._by_reference.setdefault(reference, {})[process.pid] = process
+        self._exited.pop(process.pid, None)
+        return status
+
+    def remove(self, process: ChildProcess) -> None:
+        """Unregister a process, if it is registered, keeping its status."""
+
+        status = self._by_pid.get(process.pid)
+        if status is None or status.process is not process:
+            return
+        del self._by_pid[process.pid]
+        processes = self._by_reference[status.reference]
+        del processes[process.pid]
+        if not processes:
+            del self._by_reference[status.reference]
+        status.freeze(self.tail_size)
+        self._exited[process.pid] = status
+        while len(self._exited) > self.history_size:
+            self._exited.popitem(last=False)
+
+    def get(self, pid: int) -> Optional[ChildProcess]:
+        """Get a process by pid."""
+
+        status = self._by_pid.get(pid)
+        return status.process if status is not None else None
+
+    def find(self, reference: str) -> List[ChildProcess]:
+        """Get the processes started by a dialogue."""
+        return list(self._by_reference.get(reference, {}).values())
+
+    def reference_of(self, process: ChildProcess) -> Optional[str]:
+        """Get the reference of the dialogue which started a process."""
+
+        status = self._by_pid.get(process.pid)
+        return status.reference if status is not None else None
+
+    def status(self, process: ChildProcess) -> Optional[ProcessStatus]:
+        """Get the status of a registered process."""
+        return self._by_pid.get(process.pid)
+
+    def statuses(self, reference: Optional[str] = None, pid: Optional[int] = None) -> List[ProcessStatus]:
+        """
+        Get the status of the processes of a dialogue, or of a pid.
+
+        :param reference: the starter reference of the dialogue, whose last exited process is reported once
+            none is running.
+        :param pid: the pid of the process, running or exited.
+        :return: the statuses.
+        """
+
+        if pid is not None:
+            status = self._by_pid.get(pid) or self._exited.get(pid)
+            return [status] if status is not None else []
+        running = [self._by_pid[pid] for pid in self._by_reference.get(reference, {})]
+        if running:
+            return running
+        for status in reversed(self._exited.values()):
+            if status.reference == reference:
+                return [status]
+        return []
+
+    def running(self) -> List[ProcessStatus]:
+        """Get the statuses of the running processes."""
+        return list(self._by_pid.values())
+
+    def sample(self) -> None:
+        """Sample the cpu time and rss of the running processes."""
+
+        for status in list(self._by_pid.values()):
+            status.sample()
+
+    def __iter__(self) -> Iterator[ChildProcess]:
+        """Iterate over a snapshot of the registered processes."""
+        return iter([status.process for status in self._by_pid.values()])
+
+    def __len__(self) -> int:
+        """Get the number of registered processes."""
+        return len(self._by_pid)
+
+    def __contains__(self, process: object) -> bool:
+        """Check whether a process is registered."""
+
+        if not isinstance(process, ChildProcess):
+            return False
+        status = self._by_pid.get(process.pid)
+        return status is not None and status.process is process
+
+
+async def terminate_processes(processes: Iterable[ChildProcess], grace_period: float) -> List[int]:
+    """
+    Terminate processes and their process groups, escalating to kill.
+
+    Each process group is sent SIGTERM, and the groups still running after the grace period are sent SIGKILL.
+    Exits are awaited on the event loop, which is never blocked. Groups are signalled even once their leader
+    has exited, as a grandchild left behind may still hold a port or a pipe.
+
+    :param processes: the processes to terminate.
+    :param grace_period: the number of seconds processes have to exit after SIGTERM.
+    :return: the exit codes of the processes.
+    """
+
+    processes = list(processes)
+    for process in processes:
+        process.kill_group(signal.SIGTERM)
+    exits = [asyncio.ensure_future(process.wait()) for process in processes]
+    if exits:
+        _, pending = await asyncio.wait(exits, timeout=grace_period)
+        for process in processes:
+            # orphans which ignored SIGTERM are killed along with leaders which did
+            process.kill_group(signal.SIGKILL)
+        if pending:
+            await asyncio.wait(pending)
+    return [exited.result() for exited in exits]
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Concurrency-limited scheduling of commands for the Shell Command connection."""
+
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Dict, List, Tuple, Optional
+
+
+DEFAULT_COMMAND_CLASS = "default"
+
+
+class _Request:
+    """A command waiting for an execution slot."""
+
+    __slots__ = ("command_class", "key", "future", "enqueued_at")
+
+    def __init__(self, command_class: str, key: Any, future: asyncio.Future) -> None:
+        """Initialise the request."""
+        self.command_class = command_class
+        self.key = key
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class CommandScheduler:
+    """
+    Admits commands under a global concurrency limit and per command class limits.
+
+    Waiting commands are ordered by priority, highest first. Within a priority, start-time fair queueing
+    over fairness keys (the requesting skills) interleaves a burst from one requester with the commands of
+    others. The finish tag of a key is only kept while it has commands waiting.
+    Commands whose class is at its limit are passed over, without blocking commands of other classes.
+    """
+
+    def __init__(self, max_concurrency: int, class_limits: Optional[Dict[str, int]] = None) -> None:
+        """
+        Initialise the scheduler.
+
+        :param max_concurrency: the maximum number of commands running at once.
+        :param class_limits: the maximum number of commands running at once per command class.
+        """
+
+        self.max_concurrency = max_concurrency
+        self.class_limits = dict(class_limits or {})
+        self.running = 0
+        self.running_by_class: Dict[str, int] = {}
+        self._queue: List[Tuple[int, int, int, _Request]] = []
+        self._counter = itertools.count()
+        self._virtual_time = 0
+        self._finish_tags: Dict[Any, int] = {}
+        self._waiting: Dict[Any, int] = {}
+        self.admitted = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Get the number of commands waiting for a slot."""
+        return sum(1 for *_, request in self._queue if not request.future.done())
+
+    async def acquire(self, command_class: str = DEFAULT_COMMAND_CLASS, priority: int = 0, key: Any = None) -> float:
+        """
+        Wait for an execution slot.
+
+        :param command_class: the class the command is limited under.
+        :param priority: the priority of the command, higher runs first.
+        :param key: the fairness key of the command, usually its requester.
+        :return: the number of seconds spent waiting.
+        """
+
+        future = asyncio.get_event_loop().create_future()
+        request = _Request(command_class, key, future)
+        start_tag = max(self._virtual_time, self._finish_tags.get(key, 0))
+        self._finish_tags[key] = start_tag + 1
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        heapq.heappush(self._queue, (-priority, start_tag, next(self._counter), request))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(command_class)
+            else:
+                self._dequeued(key)
+            raise
+
+    def release(self, command_class: str = DEFAULT_COMMAND_CLASS) -> None:
+        """Give back the slot of a command which has finished."""
+
+        self.running -= 1
+        self.running_by_class[command_class] -= 1
+        self._dispatch()
+
+    def _dequeued(self, key: Any) -> None:
+        """Account for a command of key leaving the queue, forgetting the key once none of its commands wait."""
+
+        waiting = self._waiting.pop(key) - 1
+        if waiting:
+            self._waiting[key] = waiting
+        else:
+            self._finish_tags.pop(key, None)
+
+    def _has_capacity(self, command_class: str) -> bool:
+        """Check whether a command of the class may start."""
+
+        limit = self.class_limits.get(command_class)
+        return limit is None or self.running_by_class.get(command_class, 0) < limit
+
+    def _dispatch(self) -> None:
+        """Start the best waiting commands for which there is capacity."""
+
+        passed_over = []
+        while self._queue and self.running < self.max_concurrency:
+            entry = heapq.heappop(self._queue)
+            request = entry[-1]
+            if request.future.done():
+                continue
+            if not self._has_capacity(request.command_class):
+                passed_over.append(entry)
+                continue
+            self._virtual_time = entry[1]
+            self._dequeued(request.key)
+            self.running += 1
+            self.running_by_class[request.command_class] = self.running_by_class.get(request.command_class, 0) + 1
+            waited = time.monotonic() - request.enqueued_at
+            self.admitted += 1
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+            request.future.set_result(waited)
+        for entry in passed_over:
+            heapq.heappush(self._queue, entry)
+
+    def stats(self) -> Dict[str, float]:
+        """Get a snapshot of the scheduler for sizing its limits."""
+
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queue_wait_max": self.queue_wait_max,
+            "queue_wait_mean": self.queue_wait_total / self.admitted if self.admitted else 0.0,
+        }
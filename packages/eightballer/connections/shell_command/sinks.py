@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Output sinks moving process output into rotating log files, and readers for their tails."""
+
+import os
+import mmap
+import fcntl
+import asyncio
+from typing import Any, Dict, Union, Optional
+from pathlib import Path
+
+from packages.eightballer.connections.shell_command.buffers import STREAMS
+
+
+SPLICE_SIZE = 1024 * 1024
+SPLICE_FLAGS = getattr(os, "SPLICE_F_MOVE", 0) | getattr(os, "SPLICE_F_NONBLOCK", 0)
+PIPE_SIZE = 1024 * 1024
+
+
+def sink_path(sink: Union[str, Path], stream: str) -> Path:
+    """
+    Get the path of the log file a sink writes a stream to.
+
+    :param sink: the path prefix of the sink, as given in execute_command.
+    :param stream: stdout or stderr.
+    :return: the path of the current log file.
+    """
+
+    return Path(f"{sink}.{stream}.log")
+
+
+def validate_sink(max_bytes: int, backup_count: int) -> None:
+    """
+    Check that the rotation settings of the sinks can be applied.
+
+    :param max_bytes: the size at which a log file is rotated, which must be positive.
+    :param backup_count: the number of rotated files to keep, which must not be negative.
+    """
+
+    if max_bytes <= 0:
+        raise ValueError(f"Sink max_bytes must be positive, got {max_bytes}.")
+    if backup_count < 0:
+        raise ValueError(f"Sink backup_count must be positive or 0, got {backup_count}.")
+
+
+def _move(pipe_fd: int, file_fd: int, count: int) -> int:
+    """Move up to count bytes from a pipe into a file, inside the kernel where the platform allows it."""
+
+    if hasattr(os, "splice"):
+        return os.splice(pipe_fd, file_fd, count, flags=SPLICE_FLAGS)
+    data = os.read(pipe_fd, count)
+    return os.write(file_fd, data) if data else 0
+
+
+class RotatingFileSink:
+    """
+    Moves the output of a pipe into a log file, rotating the file once it reaches a size.
+
+    On Linux the bytes are spliced from the pipe into the file, so they are never copied into Python. Rotated
+    files are kept as `<path>.1` (the newest) to `<path>.<backup_count>`.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int, backup_count: int) -> None:
+        """
+        Initialise the sink.
+
+        :param path: the path of the log file.
+        :param max_bytes: the size at which the log file is rotated.
+        :param backup_count: the number of rotated files to keep.
+        """
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.bytes_written = 0
+        self._fd: Optional[int] = None
+        self._size = 0
+
+    def open(self) -> None:
+        """Open the log file for appending."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # splice refuses files opened with O_APPEND, so the end is sought instead
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o644)
+        self._size = os.lseek(self._fd, 0, os.SEEK_END)
+
+    def close(self) -> None:
+        """Close the log file."""
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def rotate(self) -> None:
+        """Move the log file to the first backup and start a new one."""
+
+        self.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            backup = self.path.with_name(f"{self.path.name}.{index}")
+            if backup.exists():
+                os.replace(backup, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            os.unlink(self.path)
+        self.open()
+
+    def transfer(self, pipe_fd: int) -> bool:
+        """
+        Move what is available on a non-blocking pipe into the log file.
+
+        :param pipe_fd: the read end of the pipe.
+        :return: False once the pipe reached end of file, True otherwise.
+        """
+
+        moved = 0
+        while moved < SPLICE_SIZE:
+            if self._size >= self.max_bytes:
+                self.rotate()
+            try:
+                count = _move(pipe_fd, self._fd, min(self.max_bytes - self._size, SPLICE_SIZE))
+            except BlockingIOError:
+                return True
+            if count == 0:
+                return False
+            moved += count
+            self._size += count
+            self.bytes_written += count
+        return True
+
+    async def drain(self, pipe: Any) -> None:
+        """
+        Move a pipe into the log file until it reaches end of file.
+
+        :param pipe: the read end of the pipe, closed once drained.
+        """
+
+        loop = asyncio.get_event_loop()
+        pipe_fd = pipe.fileno()
+        os.set_blocking(pipe_fd, False)
+        try:
+            # a larger pipe lets a chatty process run longer between wakeups
+            fcntl.fcntl(pipe_fd, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+        except (AttributeError, OSError):
+            pass
+        eof = loop.create_future()
+
+        def on_readable() -> None:
+            try:
+                if not self.transfer(pipe_fd) and not eof.done():
+                    eof.set_result(None)
+            except OSError as error:
+                if not eof.done():
+                    eof.set_exception(error)
+
+        self.open()
+        loop.add_reader(pipe_fd, on_readable)
+        try:
+            await eof
+        finally:
+            loop.remove_reader(pipe_fd)
+            pipe.close()
+            self.close()
+
+
+class OutputSink:
+    """Sinks the stdout and stderr of processes into rotating log files sharing a path prefix."""
+
+    def __init__(self, sink: Union[str, Path], max_bytes: int, backup_count: int) -> None:
+        """
+        Initialise the output sink.
+
+        :param sink: the path prefix of the log files.
+        :param max_bytes: the size at which each log file is rotated.
+        :param backup_count: the number of rotated files to keep per stream.
+        """
+
+        self.files: Dict[str, RotatingFileSink] = {
+            stream: RotatingFileSink(sink_path(sink, stream), max_bytes, backup_count) for stream in STREAMS
+        }
+
+    @property
+    def bytes_written(self) -> int:
+        """Get the number of bytes written to the log files."""
+        return sum(file.bytes_written for file in self.files.values())
+
+    async def drain(self, pipes: Dict[str, Any]) -> None:
+        """Move the pipes of a process into the log files until both reach end of file."""
+
+        await asyncio.gather(*(self.files[stream].drain(pipes[stream]) for stream in STREAMS))
+
+
+def read_range(path: Union[str, Path], start: int, stop: Optional[int] = None) -> bytes:
+    """
+    Read a byte range of a log file through a memory map.
+
+    :param path: the path of the log file.
+    :param start: the offset of the first byte.
+    :param stop: the offset after the last byte, the end of the file if None.
+    :return: the bytes in the range, which may be fewer than requested.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            stop = size if stop is None else min(stop, size)
+            if start >= stop:
+                return b""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:stop]
+    except FileNotFoundError:
+        return b""
+
+
+def read_tail(path: Union[str, Path], size: int) -> bytes:
+    """
+    Read the last bytes written to a log file, reaching into its newest backup after a rotation.
+
+    :param path: the path of the log file, see sink_path.
+    :param size: the number of bytes to read.
+    :return: up to size bytes from the end of the log.
+    """
+
+    path = Path(path)
+    try:
+        current_size = path.stat().st_size
+    except FileNotFoundError:
+        current_size = 0
+    data = read_range(path, max(0, current_size - size))
+    missing = size - len(data)
+    if missing > 0:
+        backup = path.with_name(f"{path.name}.1")
+        try:
+            backup_size = backup.stat().st_size
+        except FileNotFoundError:
+            return data
+        data = read_range(backup, max(0, backup_size - missing)) + data
+    return data
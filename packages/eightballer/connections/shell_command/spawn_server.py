@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+A helper process which spawns commands on behalf of the Shell Command connection.
+
+The connection starts the helper as a fresh interpreter when it connects, so launching a command forks this
+small process instead of the whole agent. Requests and replies are JSON messages on a unix seqpacket socket.
+The read ends of the stdout and stderr pipes of each command are passed back with SCM_RIGHTS, and the exit
+status and rusage of each command are reported once the helper reaps it.
+
+Only the standard library may be imported here, as the helper runs without the agent's import path.
+
+Usage: python spawn_server.py <socket fd>
+"""
+
+import os
+import sys
+import json
+import shutil
+import signal
+import socket
+import selectors
+from typing import Any, Set, Dict, List, Tuple, Optional
+
+
+MAX_MESSAGE_SIZE = 1024 * 1024
+MAX_FDS = 2
+EXEC_FAILED_EXIT_CODE = 127
+
+
+def spawn(request: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    Launch a command in its own session, with stdout and stderr piped.
+
+    :param request: the argv, env and cwd of the command.
+    :return: the pid of the command and the read ends of its stdout and stderr pipes.
+    """
+
+    argv = request["argv"]
+    env = request.get("env")
+    cwd = request.get("cwd")
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    try:
+        if cwd:
+            pid = fork_exec(argv, env, cwd, stdout_w, stderr_w)
+        else:
+            pid = posix_spawn(argv, env, stdout_w, stderr_w)
+    except OSError:
+        os.close(stdout_r)
+        os.close(stderr_r)
+        raise
+    finally:
+        os.close(stdout_w)
+        os.close(stderr_w)
+    return pid, stdout_r, stderr_r
+
+
+def posix_spawn(argv: List[str], env: Optional[Dict[str, str]], stdout_w: int, stderr_w: int) -> int:
+    """Launch a command with posix_spawn, which vforks and reports exec failures itself."""
+
+    env = os.environ if env is None else env
+    executable = argv[0]
+    if os.sep not in executable:
+        executable = shutil.which(executable, path=env.get("PATH", os.defpath)) or executable
+    file_actions = [
+        (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+        (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+        (os.POSIX_SPAWN_DUP2, stderr_w, 2),
+    ]
+    return os.posix_spawn(executable, argv, env, file_actions=file_actions, setsid=True)
+
+
+def fork_exec(argv: List[str], env: Optional[Dict[str, str]], cwd: str, stdout_w: int, stderr_w: int) -> int:
+    """Launch a command by forking, for what posix_spawn cannot do such as changing directory."""
+
+    error_r, error_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: nocover
+        try:
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            os.dup2(stdout_w, 1)
+            os.dup2(stderr_w, 2)
+            os.chdir(cwd)
+            if env is None:
+                os.execvp(argv[0], argv)
+            os.execvpe(argv[0], argv, env)
+        except OSError as error:
+            os.write(error_w, json.dumps([error.errno, error.strerror, argv[0]]).encode("utf-8"))
+        finally:
+            os._exit(EXEC_FAILED_EXIT_CODE)  # pylint: disable=protected-access
+
+    os.close(error_w)
+    with os.fdopen(error_r, "rb") as errors:
+        error = errors.read()
+    if error:
+        os.waitpid(pid, 0)
+        raise OSError(*json.loads(error))
+    return pid
+
+
+def handle_request(sock: socket.socket, request: Dict[str, Any], children: Set[int]) -> None:
+    """Spawn the requested command and send back its pid and pipes, or the error."""
+
+    try:
+        pid, stdout_r, stderr_r = spawn(request)
+    except OSError as error:
+        reply = {"id": request["id"], "errno": error.errno, "error": error.strerror, "filename": error.filename}
+        sock.send(json.dumps(reply).encode("utf-8"))
+        return
+    children.add(pid)
+    try:
+        socket.send_fds(sock, [json.dumps({"id": request["id"], "pid": pid}).encode("utf-8")], [stdout_r, stderr_r])
+    finally:
+        os.close(stdout_r)
+        os.close(stderr_r)
+
+
+def reap(sock: socket.socket, children: Set[int]) -> None:
+    """Report every child which has exited."""
+
+    while children:
+        try:
+            pid, status, rusage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        children.discard(pid)
+        sock.send(json.dumps({"exit": pid, "status": status, "rusage": list(rusage)}).encode("utf-8"))
+
+
+def drain(fd: int) -> None:
+    """Read a non-blocking fd until it is empty."""
+
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def serve(sock: socket.socket) -> None:
+    """Serve spawn requests until the connection closes its end of the socket."""
+
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+
+    children: Set[int] = set()
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    selector.register(wakeup_r, selectors.EVENT_READ)
+    try:
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj is sock:
+                    data = sock.recv(MAX_MESSAGE_SIZE)
+                    if not data:
+                        return
+                    handle_request(sock, json.loads(data), children)
+                else:
+                    drain(wakeup_r)
+                    reap(sock, children)
+    except (BrokenPipeError, ConnectionResetError):
+        return
+    finally:
+        for pid in children:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+if __name__ == "__main__":
+    serve(socket.socket(fileno=int(sys.argv[1])))
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Supervision of long-running processes for the Shell Command connection."""
+
+import time
+import asyncio
+from typing import Any, Deque, Callable, Optional, Awaitable
+from collections import deque
+from urllib.parse import urlsplit
+
+from packages.eightballer.connections.shell_command.process import ChildProcess
+
+
+PROBE_TIMEOUT = 1.0
+PROBE_SCHEMES = ("tcp", "http")
+
+
+class RestartPolicy:
+    """Exponential backoff between restarts, with crash-loop detection."""
+
+    def __init__(
+        self,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        backoff_factor: float = 2.0,
+        crash_loop_restarts: int = 5,
+        crash_loop_window: float = 60.0,
+    ) -> None:
+        """
+        Initialise the policy.
+
+        :param backoff_initial: the delay before the first restart.
+        :param backoff_max: the maximum delay between restarts.
+        :param backoff_factor: the factor the delay grows by after each restart.
+        :param crash_loop_restarts: the number of restarts within the window that counts as a crash loop.
+        :param crash_loop_window: the window, in seconds, over which restarts are counted.
+        """
+
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.backoff_factor = backoff_factor
+        self.crash_loop_restarts = crash_loop_restarts
+        self.crash_loop_window = crash_loop_window
+
+
+async def probe_ready(ready_probe: str, timeout: float = PROBE_TIMEOUT) -> bool:
+    """
+    Check once whether a process is ready to serve.
+
+    A `tcp://host:port` probe succeeds when a connection is accepted. An `http://host:port/path` probe
+    succeeds when a GET on the path answers with a status below 400.
+
+    :param ready_probe: the probe url.
+    :param timeout: the number of seconds to wait for the probe.
+    :return: whether the process is ready.
+    """
+
+    url = urlsplit(ready_probe)
+    host = url.hostname or "127.0.0.1"
+    port = url.port or 80
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        if url.scheme == "tcp":
+            return True
+        request = f"GET {url.path or '/'} HTTP/1.0\r\nHost: {url.netloc}\r\n\r\n"
+        writer.write(request.encode("ascii"))
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        parts = status_line.split()
+        return len(parts) >= 2 and parts[1].isdigit() and int(parts[1]) < 400
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class CrashLoopError(Exception):
+    """Raised when a supervised process restarts too often."""
+
+
+class Supervisor:
+    """
+    Keeps a long-running process alive.
+
+    The process is restarted whenever it exits, after a backoff which grows with each consecutive restart
+    and resets once the process has been up for longer than the crash-loop window. Lifecycle events are
+    emitted as `started`, `ready`, `exited` and `restarted`, and as `unready` when a process is killed for
+    failing to become ready in time.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[], Awaitable[ChildProcess]],
+        watch: Callable[[ChildProcess], Awaitable[Any]],
+        emit: Callable[..., None],
+        policy: RestartPolicy,
+        ready_probe: Optional[str] = None,
+        probe_interval: float = 0.5,
+        ready_timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialise the supervisor.
+
+        :param spawn: starts a new instance of the process.
+        :param watch: returns once the process has exited.
+        :param emit: called with the event name, the process, the number of restarts and event details.
+        :param policy: the restart policy.
+        :param ready_probe: the url probed for readiness, if any.
+        :param probe_interval: the number of seconds between readiness probes.
+        :param ready_timeout: the number of seconds a process may take to become ready before it is killed.
+        """
+
+        if ready_probe is not None and urlsplit(ready_probe).scheme not in PROBE_SCHEMES:
+            raise ValueError(f"Unsupported ready probe: {ready_probe}")
+        self.spawn = spawn
+        self.watch = watch
+        self.emit = emit
+        self.policy = policy
+        self.ready_probe = ready_probe
+        self.probe_interval = probe_interval
+        self.ready_timeout = ready_timeout
+        self.restarts = 0
+        self._restart_times: Deque[float] = deque()
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop restarting the process, run returns once the current process exits."""
+        self._stopped.set()
+
+    @property
+    def stopped(self) -> bool:
+        """Check whether the supervisor was stopped."""
+        return self._stopped.is_set()
+
+    async def run(self) -> Optional[ChildProcess]:
+        """
+        Supervise the process until it crash-loops, is stopped, or the task is cancelled.
+
+        :return: the last process, once stopped, or None if stopped before it was started.
+        """
+
+        delay = self.policy.backoff_initial
+        process = None
+        while not self.stopped:
+            process = await self.spawn()
+            self.emit("restarted" if self.restarts else "started", process, self.restarts)
+            exited = asyncio.ensure_future(self.watch(process))
+            try:
+                if self.ready_probe is not None:
+                    await self._wait_ready(process, exited)
+                await exited
+            finally:
+                exited.cancel()
+            self.emit("exited", process, self.restarts, exit_code=process.returncode)
+            if self.stopped:
+                break
+
+            now = time.monotonic()
+            if now - process.started_at > self.policy.crash_loop_window:
+                delay = self.policy.backoff_initial
+            self._restart_times.append(now)
+            while self._restart_times[0] < now - self.policy.crash_loop_window:
+                self._restart_times.popleft()
+            if len(self._restart_times) > self.policy.crash_loop_restarts:
+                raise CrashLoopError(
+                    f"Process exited {len(self._restart_times)} times within {self.policy.crash_loop_window} seconds."
+                )
+
+            try:
+                await asyncio.wait_for(self._stopped.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * self.policy.backoff_factor, self.policy.backoff_max)
+            self.restarts += 1
+        return process
+
+    async def _wait_ready(self, process: ChildProcess, exited: asyncio.Future) -> None:
+        """Probe the process until it is ready, exits, or runs out of time to become ready."""
+
+        deadline = time.monotonic() + self.ready_timeout
+        while not exited.done():
+            if await probe_ready(self.ready_probe, min(PROBE_TIMEOUT, self.probe_interval * 2)):
+                self.emit("ready", process, self.restarts)
+                return
+            if time.monotonic() >= deadline:
+                self.emit("unready", process, self.restarts, message=f"Not ready after {self.ready_timeout} seconds.")
+                process.kill_group()
+                return
+            await asyncio.wait([exited], timeout=self.probe_interval)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command output buffers."""
+# pylint: skip-file
+
+from packages.eightballer.connections.shell_command.buffers import OutputRingBuffer
+
+
+class TestOutputRingBuffer:
+    """Test the output ring buffer."""
+
+    def test_keeps_output_below_capacity(self):
+        """Test that output which fits is kept whole."""
+        buffer = OutputRingBuffer(16)
+        buffer.write(b"one\n")
+        buffer.write(b"two\n")
+        assert buffer.getvalue() == b"one\ntwo\n"
+        assert buffer.lines() == ["one", "two"]
+        assert buffer.bytes_dropped == 0
+        assert buffer.lines_dropped == 0
+
+    def test_wraps_and_counts_dropped_output(self):
+        """Test that the oldest output is overwritten and accounted for."""
+        buffer = OutputRingBuffer(10)
+        for line in (b"aaa\n", b"bbb\n", b"ccc\n"):
+            buffer.write(line)
+        assert buffer.getvalue() == b"a\nbbb\nccc\n"
+        assert buffer.bytes_written == 12
+        assert buffer.bytes_dropped == 2
+        assert buffer.lines_dropped == 0
+        assert buffer.lines() == ["bbb", "ccc"]
+
+        buffer.write(b"ddd\n")
+        assert buffer.getvalue() == b"b\nccc\nddd\n"
+        assert buffer.lines_dropped == 1
+
+    def test_write_larger_than_capacity(self):
+        """Test that a single oversized write keeps only its tail."""
+        buffer = OutputRingBuffer(4)
+        buffer.write(b"xy\n")
+        buffer.write(b"1\n2\n3\n")
+        assert buffer.getvalue() == b"2\n3\n"
+        assert buffer.bytes_dropped == 5
+        assert buffer.lines_dropped == 2
+        assert buffer.tail(2) == b"3\n"
+
+    def test_zero_capacity_discards_output(self):
+        """Test that a buffer of no capacity discards, and accounts for, all output."""
+        buffer = OutputRingBuffer(0)
+        buffer.write(b"one\n")
+        buffer.write(b"")
+        assert buffer.getvalue() == b""
+        assert buffer.lines() == []
+        assert buffer.bytes_dropped == 4
+        assert buffer.lines_dropped == 1
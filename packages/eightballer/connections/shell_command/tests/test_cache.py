@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the Shell Command connection metrics."""
+"""This module contains the tests of the Shell Command connection result cache."""
+# pylint: skip-file
+
+import os
+
+from packages.eightballer.connections.shell_command.cache import CachedResult, ResultCache, cache_key
+
+
+RESULT = CachedResult("out\n", "", 0, {"wall_time": 0.1})
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the time."""
+        return self.now
+
+
+def test_key_covers_command_env_and_files(tmp_path):
+    """Test that the key changes with the command, the selected environment and the dependency files."""
+    dependency = tmp_path / "dependency"
+    dependency.write_text("a")
+    env = {"SELECTED": "1", "IGNORED": "1"}
+
+    def key(command=("cat", "dependency"), **overrides):
+        return cache_key(list(command), {**env, **overrides}, str(tmp_path), ["SELECTED"], ["dependency"])
+
+    original = key()
+    assert key() == original
+    assert key(("cat", "other")) != original
+    assert key(IGNORED="2") == original
+    assert key(SELECTED="2") != original
+
+    stat = dependency.stat()
+    os.utime(dependency, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    touched = key()
+    assert touched != original
+    dependency.unlink()
+    assert key() not in (original, touched)
+
+
+def test_results_expire_after_their_ttl():
+    """Test that a result is a hit until its ttl has passed."""
+    clock = FakeClock()
+    cache = ResultCache(clock=clock)
+    assert cache.get("key") is None
+    cache.put("key", RESULT, ttl=1.0)
+    clock.now = 0.5
+    assert cache.get("key") == (RESULT, 0.5)
+    clock.now = 1.0
+    assert cache.get("key") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2, "evictions": 0, "expirations": 1}
+
+
+def test_least_recently_used_result_is_evicted():
+    """Test that a full cache evicts the result used least recently."""
+    cache = ResultCache(max_size=2)
+    cache.put("first", RESULT, ttl=10)
+    cache.put("second", RESULT, ttl=10)
+    assert cache.get("first") is not None
+    cache.put("third", RESULT, ttl=10)
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_disabled_cache_stores_nothing():
+    """Test that a cache of size zero, or a ttl of zero, stores nothing."""
+    cache = ResultCache(max_size=0)
+    cache.put("key", RESULT, ttl=10)
+    assert len(cache) == 0
+    cache = ResultCache()
+    cache.put("key", RESULT, ttl=0)
+    assert len(cache) == 0
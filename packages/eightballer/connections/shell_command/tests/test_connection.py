@@ -21,8 +21,13 @@
 """This module contains the tests of the Shell Command connection module."""
 # pylint: skip-file
 
+import os
+import sys
+import json
+import socket
+import signal
 import asyncio
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from aea.common import Address
@@ -31,13 +36,16 @@ from aea.identity.base import Identity
 from aea.configurations.base import ConnectionConfig
 from aea.protocols.dialogue.base import Dialogue as BaseDialogue
 from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.compression import read_output
 from packages.eightballer.protocols.shell_command.dialogues import (
     ShellCommandDialogue,
-    ShellCommandDialogues as BaseShellCommandDialogues,
+    BaseShellCommandDialogues,
 )
+from packages.eightballer.connections.shell_command.sinks import sink_path, read_tail
 from packages.eightballer.connections.shell_command.connection import (
     CONNECTION_ID as CONNECTION_PUBLIC_ID,
     ShellCommandConnection,
+    ShellCommandAsyncChannel,
 )
 
 
@@ -115,6 +123,31 @@ class TestShellCommandConnection:
         self.connection_address = str(ShellCommandConnection.connection_id)
         self._dialogues = ShellCommandDialogues(self.target_skill_id)
 
+    def _configured_connection(self, **config) -> ShellCommandConnection:
+        """Build a connection, without connecting it, from a configuration with the given options."""
+        configuration = ConnectionConfig(
+            target_skill_id=self.target_skill_id,
+            connection_id=ShellCommandConnection.connection_id,
+            restricted_to_protocols={ShellCommandMessage.protocol_id},
+            **config,
+        )
+        return ShellCommandConnection(configuration=configuration, data_dir=MagicMock(), identity=self.identity)
+
+    def test_options_are_taken_from_the_configuration(self):
+        """Test that the options of the connection are taken out of its configuration."""
+        connection = self._configured_connection(receive_batch_size=4, read_size=1024)
+        assert connection.receive_batch_size == 4
+        assert connection.channel.read_size == 1024
+        assert "receive_batch_size" not in connection.configuration.config
+        assert "read_size" not in connection.configuration.config
+
+    def test_unusable_sink_rotation_is_refused(self):
+        """Test that a connection is not set up with sink rotation settings that would drop output."""
+        with pytest.raises(ValueError):
+            self._configured_connection(sink_max_bytes=0)
+        with pytest.raises(ValueError):
+            self._configured_connection(sink_backup_count=-1)
+
     @pytest.mark.asyncio
     async def test_shell_command_connection_connect(self):
         """Test the connect."""
@@ -141,3 +174,579 @@ class TestShellCommandConnection:
         )
 
         await self.shell_command_connection.send(envelope_it(msg))
+
+    @pytest.mark.asyncio
+    async def test_receive_blocks_until_envelope(self):
+        """Test that receive waits for an envelope instead of returning None."""
+        await self.shell_command_connection.connect()
+        receive_task = asyncio.ensure_future(self.shell_command_connection.receive())
+        await asyncio.sleep(0.05)
+        assert not receive_task.done()
+
+        envelope = MagicMock()
+        self.shell_command_connection.channel._in_queue.put_nowait(envelope)
+        assert await asyncio.wait_for(receive_task, timeout=5) is envelope
+
+    @pytest.mark.asyncio
+    async def test_receive_wakes_on_disconnect(self):
+        """Test that a pending receive returns None once the connection disconnects."""
+        await self.shell_command_connection.connect()
+        receive_task = asyncio.ensure_future(self.shell_command_connection.receive())
+        await asyncio.sleep(0.05)
+        await self.shell_command_connection.disconnect()
+        assert await asyncio.wait_for(receive_task, timeout=5) is None
+
+    @pytest.mark.asyncio
+    async def test_receive_drains_in_bulk(self):
+        """Test that several queued envelopes are drained in a single wakeup."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        for _ in range(3):
+            channel._in_queue.put_nowait(MagicMock())
+        first = await self.shell_command_connection.receive()
+        assert first is not None
+        assert channel._in_queue.empty()
+        assert len(self.shell_command_connection._receive_buffer) == 2
+
+    @pytest.mark.asyncio
+    async def test_streams_output_chunks(self):
+        """Test that streamed output arrives as output chunks before the final result."""
+        await self.shell_command_connection.connect()
+
+        msg, _ = self._dialogues.create(
+            counterparty=str(CONNECTION_PUBLIC_ID),
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command="sh",
+            args=("-c", "echo out; echo err >&2; exit 3"),
+            options={},
+            stream_output=True,
+        )
+        await self.shell_command_connection.send(envelope_it(msg))
+
+        chunks = []
+        while True:
+            envelope = await asyncio.wait_for(self.shell_command_connection.receive(), timeout=5)
+            if envelope.message.performative != ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                break
+            chunks.append(envelope.message)
+
+        assert envelope.message.performative == ShellCommandMessage.Performative.COMMAND_RESULT
+        assert envelope.message.exit_code == 3
+        assert [chunk.sequence for chunk in chunks] == list(range(1, len(chunks) + 1))
+        assert "".join(chunk.stdout for chunk in chunks) == "out\n"
+        assert "".join(chunk.stderr for chunk in chunks) == "err\n"
+
+    async def _execute(self, command, *args, **kwargs):
+        """Send an execute_command message to the connection."""
+        msg, _ = self._dialogues.create(
+            counterparty=str(CONNECTION_PUBLIC_ID),
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command=command,
+            args=args,
+            options={},
+            **kwargs,
+        )
+        await self.shell_command_connection.send(envelope_it(msg))
+        return msg.dialogue_reference
+
+    async def _receive_final(self):
+        """Receive envelopes until a terminal reply arrives."""
+        while True:
+            envelope = await asyncio.wait_for(self.shell_command_connection.receive(), timeout=10)
+            if envelope.message.performative != ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                return envelope.message
+
+    @pytest.mark.asyncio
+    async def test_await_completion_reports_exit_and_usage(self):
+        """Test that completion mode replies with the real exit code, output and resource usage."""
+        await self.shell_command_connection.connect()
+        await self._execute("sh", "-c", "echo done; exit 2", await_completion=True)
+        result = await self._receive_final()
+        assert result.performative == ShellCommandMessage.Performative.COMMAND_RESULT
+        assert result.exit_code == 2
+        assert result.stdout == "done\n"
+        assert {"wall_time", "cpu_time"} <= set(result.resource_usage)
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process_group(self):
+        """Test that a command exceeding its timeout is killed and replied to with a timeout error."""
+        await self.shell_command_connection.connect()
+        await self._execute("sh", "-c", "sleep 30 & sleep 30", timeout=1)
+        result = await self._receive_final()
+        assert result.performative == ShellCommandMessage.Performative.EXECUTION_ERROR
+        assert result.error == ShellCommandMessage.ErrorCode.TIMEOUT_ERROR
+        assert not self.shell_command_connection.channel.processes
+
+    @pytest.mark.asyncio
+    async def test_completions_run_concurrently(self):
+        """Test that tracked commands do not block the connection for other dialogues."""
+        await self.shell_command_connection.connect()
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        for _ in range(5):
+            await self._execute("sleep", "1", await_completion=True)
+        assert loop.time() - start < 0.5
+        results = [await self._receive_final() for _ in range(5)]
+        assert all(result.exit_code == 0 for result in results)
+        assert loop.time() - start < 3
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_queues_commands(self):
+        """Test that commands beyond max_concurrency wait for a slot and report the wait."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        channel.scheduler.max_concurrency = 1
+        for _ in range(2):
+            await self._execute("sleep", "0.5", await_completion=True)
+        results = [await self._receive_final() for _ in range(2)]
+        waits = sorted(result.resource_usage["queue_wait"] for result in results)
+        assert waits[0] < 0.1
+        assert waits[1] >= 0.4
+        assert channel.scheduler.stats()["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_detached_command_gives_back_its_slot(self):
+        """Test that a detached command frees its slot once replied to, so the next command runs promptly."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        channel.scheduler.max_concurrency = 1
+        await self._execute("sleep", "5")
+        detached = await self._receive_final()
+        assert detached.exit_code == -1
+        await self._execute("true", await_completion=True)
+        result = await self._receive_final()
+        assert result.exit_code == 0
+        assert result.resource_usage["queue_wait"] < 1
+
+    async def _receive_event(self):
+        """Receive the next process event."""
+        while True:
+            envelope = await asyncio.wait_for(self.shell_command_connection.receive(), timeout=10)
+            if envelope.message.performative != ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                return envelope.message
+
+    @pytest.mark.asyncio
+    async def test_supervised_process_is_probed_and_restarted(self):
+        """Test that a supervised server reports readiness and is restarted after it dies."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        channel.restart_policy.backoff_initial = 0.01
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        await self._execute(
+            sys.executable,
+            "-m",
+            "http.server",
+            str(port),
+            "--bind",
+            "127.0.0.1",
+            supervise=True,
+            ready_probe=f"http://127.0.0.1:{port}/",
+        )
+
+        started = await self._receive_event()
+        assert (started.performative, started.event) == (ShellCommandMessage.Performative.PROCESS_EVENT, "started")
+        assert (await self._receive_event()).event == "ready"
+
+        os.kill(started.pid, signal.SIGKILL)
+        exited = await self._receive_event()
+        assert (exited.event, exited.exit_code) == ("exited", -signal.SIGKILL)
+        restarted = await self._receive_event()
+        assert (restarted.event, restarted.restarts) == ("restarted", 1)
+        assert (await self._receive_event()).event == "ready"
+
+        await self.shell_command_connection.disconnect()
+        assert not channel.processes
+
+    @pytest.mark.asyncio
+    async def test_supervised_crash_loop_ends_dialogue(self):
+        """Test that a process which keeps dying is given up on with an execution error."""
+        await self.shell_command_connection.connect()
+        policy = self.shell_command_connection.channel.restart_policy
+        policy.backoff_initial, policy.crash_loop_restarts = 0.01, 1
+        await self._execute("sh", "-c", "exit 1", supervise=True)
+        events = []
+        while True:
+            message = await self._receive_event()
+            if message.performative != ShellCommandMessage.Performative.PROCESS_EVENT:
+                break
+            events.append(message.event)
+        assert events == ["started", "exited", "restarted", "exited"]
+        assert message.error == ShellCommandMessage.ErrorCode.COMMAND_EXECUTION_FAILURE
+
+    @pytest.mark.asyncio
+    async def test_spawn_server_runs_commands(self):
+        """Test that commands run through the spawn server when it is enabled."""
+        channel = self.shell_command_connection.channel
+        await self.shell_command_connection.disconnect()
+        channel.use_spawn_server = True
+        await self.shell_command_connection.connect()
+        assert channel.spawn_server.is_running
+
+        await self._execute("sh", "-c", "echo $$; exit 5", await_completion=True)
+        result = await self._receive_final()
+        assert result.exit_code == 5
+        assert int(result.stdout) != channel.spawn_server.helper.pid
+
+        await self.shell_command_connection.disconnect()
+        assert channel.spawn_server is None
+
+    @pytest.mark.asyncio
+    async def test_sink_writes_output_to_logs(self, tmp_path):
+        """Test that sunk output goes to the log files rather than into the result."""
+        await self.shell_command_connection.connect()
+        sink = tmp_path / "logs" / "command"
+        await self._execute("sh", "-c", "echo out; echo err >&2", await_completion=True, sink=str(sink))
+        result = await self._receive_final()
+        assert (result.exit_code, result.stdout, result.stderr) == (0, "", "")
+        assert read_tail(sink_path(sink, "stdout"), 1024) == b"out\n"
+        assert read_tail(sink_path(sink, "stderr"), 1024) == b"err\n"
+
+    @pytest.mark.asyncio
+    async def test_limits_apply_to_command(self):
+        """Test that the limits of a command are in force, and that unknown limits are refused."""
+        await self.shell_command_connection.connect()
+        await self._execute("sh", "-c", "ulimit -n", await_completion=True, limits={"open_files": 32})
+        result = await self._receive_final()
+        assert result.exit_code == 0
+        assert result.stdout.strip() == "32"
+        assert {"max_rss", "voluntary_ctx_switches", "io_read_bytes"} <= set(result.resource_usage)
+
+        await self._execute("sh", "-c", "while :; do :; done", await_completion=True, limits={"cpu_time": 1})
+        result = await self._receive_final()
+        assert result.exit_code in (-signal.SIGXCPU, -signal.SIGKILL)
+        assert result.resource_usage["cpu_time"] >= 0.9
+
+        await self._execute("true", await_completion=True, limits={"open_file": 32})
+        result = await self._receive_final()
+        assert result.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+        # a hard limit above the system maximum cannot be set, even by root
+        await self._execute("true", await_completion=True, limits={"open_files": 1 << 40})
+        result = await self._receive_final()
+        assert result.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    @pytest.mark.asyncio
+    async def test_limits_of_fast_commands(self):
+        """Test that commands exiting at once run normally under limits, which are applied before they exec."""
+        await self.shell_command_connection.connect()
+        for _ in range(20):
+            await self._execute("true", await_completion=True, limits={"cpu_time": 5, "nice": 5})
+            result = await self._receive_final()
+            assert result.exit_code == 0
+
+    @pytest.mark.asyncio
+    async def test_env_vars_extend_agent_environment(self):
+        """Test that the env_vars of a message are added to the agent environment rather than replacing it."""
+        await self.shell_command_connection.connect()
+        env_vars = json.dumps({"FOO": "bar"}).encode("utf-8")
+        await self._execute("sh", "-c", 'echo "$FOO:$PATH"', await_completion=True, env_vars=env_vars)
+        result = await self._receive_final()
+        assert result.stdout == f"bar:{os.environ['PATH']}\n"
+
+    @pytest.mark.asyncio
+    async def test_profile_runs_with_overrides(self, tmp_path):
+        """Test that a message using a profile runs its executable, arguments and directory with overrides."""
+        channel = self.shell_command_connection.channel
+        await self.shell_command_connection.disconnect()
+        channel.profiles_config = {
+            "echo": {"command": "sh", "args": ["-c", 'echo "$(pwd) $GREETING $0"'], "env": {"GREETING": "hello"}},
+            "here": {"command": "pwd", "cwd": str(tmp_path)},
+        }
+        await self.shell_command_connection.connect()
+
+        env_vars = json.dumps({"GREETING": "hi"}).encode("utf-8")
+        await self._execute("", "world", profile="echo", env_vars=env_vars, await_completion=True)
+        result = await self._receive_final()
+        assert result.stdout == f"{os.getcwd()} hi world\n"
+
+        await self._execute("", profile="here", await_completion=True)
+        assert (await self._receive_final()).stdout == f"{tmp_path}\n"
+
+        await self._execute("", profile="missing", await_completion=True)
+        assert (await self._receive_final()).error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    @pytest.mark.asyncio
+    async def test_trusted_messages_skip_reply_checks(self):
+        """Test that with trusted messages the replies are built without their consistency checks."""
+        connection = self.shell_command_connection
+        await connection.disconnect()
+        connection.channel = ShellCommandAsyncChannel(
+            self.agent_address, connection_id=connection.connection_id, trusted_messages=True
+        )
+        await connection.connect()
+        with patch.object(ShellCommandMessage, "_is_consistent", return_value=True) as is_consistent:
+            await self._execute("sh", "-c", "echo out", stream_output=True, await_completion=True)
+            result = await self._receive_final()
+        assert (result.exit_code, type(result)) == (0, ShellCommandMessage)
+        # only the request, built by the test dialogues, was checked
+        assert is_consistent.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_large_results_are_compressed_on_request(self):
+        """Test that results above the threshold are compressed when the command asks for it."""
+        await self.shell_command_connection.connect()
+        self.shell_command_connection.channel.compression_threshold = 1024
+        script = "yes broker debug line | head -n 10000; echo err >&2"
+        await self._execute("sh", "-c", script, await_completion=True, compress_output=True)
+        result = await self._receive_final()
+        assert (result.stdout, result.stderr) == ("", "")
+        assert len(result.compressed_output) < 1024
+        assert read_output(result) == ("broker debug line\n" * 10000, "err\n")
+
+        await self._execute("echo", "small", await_completion=True, compress_output=True)
+        result = await self._receive_final()
+        assert not result.is_set("compressed_output")
+        assert read_output(result) == ("small\n", "")
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_each_command(self):
+        """Test that a batch runs its commands in parallel and replies once with the result of each, in order."""
+        await self.shell_command_connection.connect()
+        commands = (
+            "sh -c 'sleep 0.3; echo first'",
+            "sh -c 'sleep 0.3; echo second >&2; exit 3'",
+            "sh -c 'sleep 0.3; echo \"$GREETING\"'",
+            "missing-command-for-batch",
+            "sleep 5",
+        )
+        msg, _ = self._dialogues.create(
+            counterparty=str(CONNECTION_PUBLIC_ID),
+            performative=ShellCommandMessage.Performative.EXECUTE_BATCH,
+            commands=commands,
+            parallelism=5,
+            timeout=1,
+            env_vars=json.dumps({"GREETING": "hello"}).encode("utf-8"),
+        )
+        await self.shell_command_connection.send(envelope_it(msg))
+        result = await self._receive_final()
+        assert result.performative == ShellCommandMessage.Performative.BATCH_RESULT
+        assert result.exit_codes[:4] == (0, 3, 0, 127)
+        assert result.exit_codes[4] < 0
+        assert result.stdouts[:3] == ("first\n", "", "hello\n")
+        assert result.stderrs[1] == "second\n"
+        assert "missing-command-for-batch" in result.stderrs[3]
+        assert "timed out" in result.stderrs[4]
+        # the sleeps overlap: the batch takes the longest command, not the sum
+        assert result.resource_usage["wall_time"] < 2
+
+    @pytest.mark.asyncio
+    async def test_batch_parallelism_limits_concurrent_commands(self):
+        """Test that at most parallelism commands of a batch run at once, and that it must be positive."""
+        await self.shell_command_connection.connect()
+        for parallelism in (1, 0):
+            msg, _ = self._dialogues.create(
+                counterparty=str(CONNECTION_PUBLIC_ID),
+                performative=ShellCommandMessage.Performative.EXECUTE_BATCH,
+                commands=("sleep 0.2",) * 3,
+                parallelism=parallelism,
+            )
+            await self.shell_command_connection.send(envelope_it(msg))
+            result = await self._receive_final()
+            if parallelism:
+                assert result.exit_codes == (0, 0, 0)
+                assert result.resource_usage["wall_time"] >= 0.6
+            else:
+                assert result.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    async def _pipeline(self, *stages, **kwargs):
+        """Run a pipeline through the connection and receive its reply."""
+        msg, _ = self._dialogues.create(
+            counterparty=str(CONNECTION_PUBLIC_ID),
+            performative=ShellCommandMessage.Performative.EXECUTE_PIPELINE,
+            stages=stages,
+            **kwargs,
+        )
+        await self.shell_command_connection.send(envelope_it(msg))
+        return await self._receive_final()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_reports_last_stage(self):
+        """Test that a pipeline replies with the output of its last stage and the exit code of each stage."""
+        await self.shell_command_connection.connect()
+        result = await self._pipeline(
+            "sh -c 'printf \"b\\na\\n$GREETING\\n\"; echo warning >&2; exit 2'",
+            "sort",
+            env_vars=json.dumps({"GREETING": "hello"}).encode("utf-8"),
+        )
+        assert result.performative == ShellCommandMessage.Performative.COMMAND_RESULT
+        assert (result.stdout, result.stderr) == ("a\nb\nhello\n", "warning\n")
+        assert (result.exit_code, result.stage_exit_codes) == (0, (2, 0))
+        assert {"wall_time", "cpu_time", "queue_wait"} <= set(result.resource_usage)
+
+        result = await self._pipeline("sh -c 'exit 2'", "sh -c 'exit 3'", "cat", pipefail=True)
+        assert (result.exit_code, result.stage_exit_codes) == (3, (2, 3, 0))
+        assert not self.shell_command_connection.channel.processes
+
+    @pytest.mark.asyncio
+    async def test_pipeline_errors(self):
+        """Test that invalid pipelines are refused, and that a timeout kills every stage."""
+        await self.shell_command_connection.connect()
+        for stages in ((), ("echo", ""), ("echo", "missing-command-for-pipeline")):
+            result = await self._pipeline(*stages)
+            assert result.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+        result = await self._pipeline("sleep 30", "cat", timeout=1)
+        assert result.error == ShellCommandMessage.ErrorCode.TIMEOUT_ERROR
+        assert not self.shell_command_connection.channel.processes
+
+    async def _control(self, performative, **kwargs):
+        """Send a control message to the connection and receive its reply."""
+        msg, _ = self._dialogues.create(
+            counterparty=str(CONNECTION_PUBLIC_ID), performative=performative, **kwargs
+        )
+        await self.shell_command_connection.send(envelope_it(msg))
+        return await self._receive_final()
+
+    @pytest.mark.asyncio
+    async def test_send_signal_by_reference_and_pid(self):
+        """Test that signals reach the processes of a dialogue, and that unknown targets are refused."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        reference, _ = await self._execute("sh", "-c", "trap 'exit 5' USR1; sleep 30 & wait", await_completion=True)
+        while not channel.processes.find(reference):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        (process,) = channel.processes.find(reference)
+
+        reply = await self._control(
+            ShellCommandMessage.Performative.SEND_SIGNAL, process_reference=reference, signal_number=signal.SIGUSR1
+        )
+        assert reply.pids == (process.pid,)
+        assert (await self._receive_final()).exit_code == 5
+
+        for kwargs in ({"process_id": process.pid}, {}, {"process_id": 1, "signal_number": 12345}):
+            kwargs.setdefault("signal_number", signal.SIGTERM)
+            reply = await self._control(ShellCommandMessage.Performative.SEND_SIGNAL, **kwargs)
+            assert reply.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    @pytest.mark.asyncio
+    async def test_terminate_stops_supervised_process(self):
+        """Test that terminating a supervised command stops its restarts and ends its dialogue."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        reference, _ = await self._execute("sh", "-c", "sleep 30 & wait", supervise=True)
+        started = await self._receive_event()
+        assert started.event == "started"
+
+        reply = await self._control(
+            ShellCommandMessage.Performative.TERMINATE, process_reference=reference, grace_period=1.0
+        )
+        assert (reply.pids, reply.exit_codes) == ((started.pid,), (-signal.SIGTERM,))
+        assert (await self._receive_event()).event == "exited"
+        result = await self._receive_final()
+        assert (result.performative, result.exit_code) == (
+            ShellCommandMessage.Performative.COMMAND_RESULT,
+            -signal.SIGTERM,
+        )
+        assert not channel.processes and not channel._supervisors
+
+    @pytest.mark.asyncio
+    async def test_disconnect_terminates_processes(self):
+        """Test that disconnecting terminates the running processes rather than leaving them behind."""
+        await self.shell_command_connection.connect()
+        channel = self.shell_command_connection.channel
+        channel.terminate_grace_period = 0.5
+        await self._execute("sh", "-c", "trap '' TERM; sleep 30", await_completion=True)
+        await self._execute("sleep", "30", supervise=True)
+        while len(channel.processes) < 2:
+            await asyncio.sleep(0.01)
+        processes = list(channel.processes)
+
+        await self.shell_command_connection.disconnect()
+        assert {process.returncode for process in processes} == {-signal.SIGKILL, -signal.SIGTERM}
+        assert not channel.processes
+
+    @pytest.mark.asyncio
+    async def test_query_status_of_running_and_exited_command(self):
+        """Test that the status of a command reports its output and usage while it runs, and its exit after."""
+        await self.shell_command_connection.disconnect()
+        self.shell_command_connection.channel.status_sample_interval = 0.05
+        await self.shell_command_connection.connect()
+        script = "echo starting; echo warming >&2; sleep 0.5; exit 3"
+        reference, _ = await self._execute("sh", "-c", script, await_completion=True)
+        await asyncio.sleep(0.3)
+
+        status = await self._control(ShellCommandMessage.Performative.QUERY_STATUS, process_reference=reference)
+        assert status.performative == ShellCommandMessage.Performative.STATUS_RESULT
+        assert (status.running, status.exit_codes, status.bytes_emitted) == ((True,), (-1,), (17,))
+        assert (status.stdout_tails, status.stderr_tails) == (("starting\n",), ("warming\n",))
+        assert status.rss[0] > 0 and 0.2 < status.uptimes[0] < 1
+
+        assert (await self._receive_final()).exit_code == 3
+        status = await self._control(
+            ShellCommandMessage.Performative.QUERY_STATUS, process_id=status.pids[0], tail_size=4
+        )
+        assert (status.running, status.exit_codes, status.stdout_tails) == ((False,), (3,), ("ing\n",))
+
+        error = await self._control(ShellCommandMessage.Performative.QUERY_STATUS, process_reference="unknown")
+        assert error.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    @pytest.mark.asyncio
+    async def test_write_stdin_streams_input(self):
+        """Test that writes to the stdin of a command are acknowledged once drained, and that eof ends it."""
+        await self.shell_command_connection.connect()
+        reference, _ = await self._execute("wc", "-c", await_completion=True, open_stdin=True)
+        while not self.shell_command_connection.channel.processes.find(reference):
+            await asyncio.sleep(0.01)
+        for _ in range(4):
+            ack = await self._control(
+                ShellCommandMessage.Performative.WRITE_STDIN, process_reference=reference, data=b"x" * 100_000
+            )
+            assert ack.performative == ShellCommandMessage.Performative.CONTROL_RESULT
+        ack = await self._control(
+            ShellCommandMessage.Performative.WRITE_STDIN, process_reference=reference, data=b"", eof=True
+        )
+        assert ack.performative == ShellCommandMessage.Performative.CONTROL_RESULT
+        result = await self._receive_final()
+        assert (result.exit_code, result.stdout.strip()) == (0, "400000")
+
+        reference, _ = await self._execute("sleep", "1", await_completion=True)
+        while not self.shell_command_connection.channel.processes.find(reference):
+            await asyncio.sleep(0.01)
+        error = await self._control(
+            ShellCommandMessage.Performative.WRITE_STDIN, process_reference=reference, data=b"x"
+        )
+        assert error.error == ShellCommandMessage.ErrorCode.INVALID_COMMAND
+
+    @pytest.mark.asyncio
+    async def test_query_metrics(self):
+        """Test that the metrics of the connection record spawns, output, handlers and the in-queue."""
+        await self.shell_command_connection.connect()
+        await self._execute("echo", "hello", await_completion=True)
+        assert (await self._receive_final()).stdout == "hello\n"
+        result = await self._control(ShellCommandMessage.Performative.QUERY_METRICS)
+        assert result.performative == ShellCommandMessage.Performative.METRICS_RESULT
+        metrics = result.metrics
+        assert metrics["shell_command_spawn_latency_seconds_count"] == 1
+        assert metrics["shell_command_first_byte_seconds_count"] == 1
+        assert metrics['shell_command_handler_duration_seconds_count{performative="execute_command"}'] == 1
+        assert metrics["shell_command_envelope_wait_seconds_count"] >= 1
+        assert 0 < metrics['shell_command_spawn_latency_seconds{quantile="0.5"}'] < 1
+
+    @pytest.mark.asyncio
+    async def test_cached_results_skip_the_fork(self, tmp_path):
+        """Test that a repeated cacheable command is answered from the cache until a dependency file changes."""
+        await self.shell_command_connection.connect()
+        dependency = tmp_path / "dependency"
+        dependency.write_text("first\n")
+        spawns = self.shell_command_connection.channel.metrics.spawn_latency
+        kwargs = {"cache_ttl": 60.0, "cache_files": (str(dependency),)}
+
+        await self._execute("cat", str(dependency), **kwargs)
+        assert (await self._receive_final()).stdout == "first\n"
+        await self._execute("cat", str(dependency), **kwargs)
+        result = await self._receive_final()
+        assert result.stdout == "first\n"
+        assert "cache_age" in result.resource_usage
+        assert spawns.count == 1
+
+        dependency.write_text("second\n")
+        stat = dependency.stat()
+        os.utime(dependency, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        await self._execute("cat", str(dependency), **kwargs)
+        assert (await self._receive_final()).stdout == "second\n"
+        assert spawns.count == 2
+        stats = self.shell_command_connection.channel.result_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
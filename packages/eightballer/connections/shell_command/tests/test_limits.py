@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command resource limits."""
+# pylint: skip-file
+
+import os
+import resource
+
+import pytest
+
+from packages.eightballer.connections.shell_command.limits import (
+    CgroupManager,
+    sample_usage,
+    child_limiter,
+    validate_limits,
+)
+from packages.eightballer.connections.shell_command.process import ChildProcess
+
+
+def test_validate_limits_rejects_unknown_keys():
+    """Test that a misspelt limit is refused rather than ignored."""
+    validate_limits({"open_files": 64, "nice": 5})
+    with pytest.raises(ValueError):
+        validate_limits({"open_file": 64})
+
+
+@pytest.mark.asyncio
+async def test_child_limiter_and_sample_usage():
+    """Test that rlimits and niceness are in force from the start of a process, and its usage sampled."""
+    limiter = child_limiter({"open_files": 64, "cpu_time": 10, "nice": 19})
+    process = await ChildProcess.spawn(["sleep", "30"], preexec_fn=limiter)
+    try:
+        assert resource.prlimit(process.pid, resource.RLIMIT_NOFILE) == (64, 64)
+        assert resource.prlimit(process.pid, resource.RLIMIT_CPU) == (10, 10)
+        assert os.getpriority(os.PRIO_PROCESS, process.pid) == 19
+
+        usage = sample_usage(process.pid)
+        assert usage["rss"] > 0
+        assert "voluntary_ctx_switches" in usage
+        assert "rss" in process.resource_usage
+    finally:
+        process.kill_group()
+        await process.wait()
+    assert sample_usage(process.pid) == {}
+    assert "max_rss" in process.resource_usage
+
+
+class TestCgroupManager:
+    """Test cgroup placement."""
+
+    def test_unavailable_without_cgroup_root(self, tmp_path):
+        """Test that placement is skipped without a cgroup v2 root."""
+        assert not CgroupManager(None).available
+        cgroups = CgroupManager(str(tmp_path))
+        assert not cgroups.available
+        assert cgroups.create({"memory_max": 1024}) is None
+
+    @pytest.mark.asyncio
+    async def test_process_joins_group_before_exec(self, tmp_path):
+        """Test that a group is created with the cgroup limits of a command, which its process joins."""
+        (tmp_path / "cgroup.controllers").write_text("cpu memory pids")
+        cgroups = CgroupManager(str(tmp_path))
+        assert cgroups.available
+        assert cgroups.create({"open_files": 64}) is None
+
+        group = cgroups.create({"cpu_weight": 50, "memory_max": 1 << 20})
+        assert (group / "cpu.weight").read_text() == "50"
+        assert (group / "memory.max").read_text() == str(1 << 20)
+        (group / "cgroup.procs").touch()
+        process = await ChildProcess.spawn(["true"], preexec_fn=child_limiter({"cpu_weight": 50}, group))
+        await process.wait()
+        assert (group / "cgroup.procs").read_text() == str(process.pid)
+        assert not cgroups.remove(group)
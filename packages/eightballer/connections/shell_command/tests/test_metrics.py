@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the Shell Command connection metrics."""
+# pylint: skip-file
+
+import asyncio
+
+import pytest
+
+from packages.eightballer.connections.shell_command.buffers import ProcessOutput
+from packages.eightballer.connections.shell_command.metrics import (
+    HANDLER_DURATION,
+    OUTPUT_BYTES_RATE,
+    OUTPUT_LINES_RATE,
+    Histogram,
+    ConnectionMetrics,
+    metric_key,
+    parse_metric_key,
+    prometheus_values,
+    prometheus_metrics,
+)
+from packages.eightballer.connections.shell_command.process import ChildProcess
+from packages.eightballer.connections.shell_command.registry import ProcessRegistry, terminate_processes
+
+
+class TestHistogram:
+    """Test the histogram of observations."""
+
+    def test_quantiles_are_bucket_bounds(self):
+        """Test that quantiles are estimated by the bucket they fall in, capped at the largest observation."""
+        histogram = Histogram(bounds=(0.001, 0.01, 0.1))
+        for value in [0.0005] * 50 + [0.005] * 40 + [0.05] * 9 + [0.07]:
+            histogram.observe(value)
+        assert (histogram.count, histogram.max) == (100, 0.07)
+        assert histogram.total == pytest.approx(0.0005 * 50 + 0.005 * 40 + 0.05 * 9 + 0.07)
+        assert [histogram.quantile(q) for q in (0.5, 0.9, 0.99, 1.0)] == [0.001, 0.01, 0.07, 0.07]
+        histogram.observe(5.0)
+        assert histogram.quantile(1.0) == 5.0
+        assert Histogram().quantile(0.5) == 0.0
+
+
+def test_metric_keys_round_trip():
+    """Test that the labels of a metric are formatted in its key, and parsed back."""
+    key = metric_key(HANDLER_DURATION, {"quantile": "0.5", "performative": "execute_command"})
+    assert key == 'shell_command_handler_duration_seconds{performative="execute_command",quantile="0.5"}'
+    assert parse_metric_key(key) == (HANDLER_DURATION, {"performative": "execute_command", "quantile": "0.5"})
+    assert parse_metric_key(HANDLER_DURATION) == (HANDLER_DURATION, {})
+    names = {name for name, _, _ in prometheus_metrics()}
+    assert {HANDLER_DURATION, f"{HANDLER_DURATION}_count", f"{HANDLER_DURATION}_sum", OUTPUT_BYTES_RATE} <= names
+
+
+def test_prometheus_values_sum_the_series_of_processes():
+    """Test that the series of each process are pushed as totals, which fall back to 0 once processes exit."""
+    snapshot = {
+        metric_key(OUTPUT_BYTES_RATE, {"pid": "1"}): 10.0,
+        metric_key(OUTPUT_BYTES_RATE, {"pid": "2"}): 5.0,
+        metric_key(OUTPUT_LINES_RATE, {"pid": "1"}): 1.0,
+        metric_key(HANDLER_DURATION, {"quantile": "0.5"}): 0.1,
+    }
+    assert prometheus_values(snapshot) == {
+        OUTPUT_BYTES_RATE: 15.0,
+        OUTPUT_LINES_RATE: 1.0,
+        metric_key(HANDLER_DURATION, {"quantile": "0.5"}): 0.1,
+    }
+    assert prometheus_values({}) == {OUTPUT_BYTES_RATE: 0.0, OUTPUT_LINES_RATE: 0.0}
+    assert all(labels == () for name, _, labels in prometheus_metrics() if name == OUTPUT_BYTES_RATE)
+
+
+class TestConnectionMetrics:
+    """Test the metrics of the connection."""
+
+    def test_in_queue_wait_and_depth(self):
+        """Test that replies are timed from being put on the in-queue to being taken off it."""
+        metrics = ConnectionMetrics()
+        for depth in (1, 2, 3):
+            metrics.enqueued(depth)
+        metrics.dequeued()
+        metrics.dequeued()
+        snapshot = metrics.snapshot(in_queue_depth=1)
+        assert snapshot["shell_command_envelope_wait_seconds_count"] == 2
+        assert (snapshot["shell_command_in_queue_depth"], snapshot["shell_command_in_queue_max_depth"]) == (1, 3)
+        metrics.clear_queue()
+        metrics.dequeued()
+        assert metrics.envelope_wait.count == 2
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reports_output_rates(self):
+        """Test that a snapshot reports the output rates of the running processes."""
+        registry = ProcessRegistry()
+        process = await ChildProcess.spawn(["sleep", "5"])
+        status = registry.add("sleep", process)
+        status.output = ProcessOutput(1024, 1024)
+        status.output.write("stdout", b"line\n" * 10)
+        await asyncio.sleep(0.1)
+        metrics = ConnectionMetrics()
+        metrics.handler_duration("execute_command").observe(0.002)
+        try:
+            snapshot = metrics.snapshot(0, registry.running())
+        finally:
+            await terminate_processes([process], grace_period=1)
+        labels = {"pid": str(process.pid)}
+        assert 0 < snapshot[metric_key(OUTPUT_BYTES_RATE, labels)] <= 500
+        assert snapshot[metric_key(OUTPUT_LINES_RATE, labels)] == pytest.approx(
+            snapshot[metric_key(OUTPUT_BYTES_RATE, labels)] / 5
+        )
+        assert snapshot[metric_key(f"{HANDLER_DURATION}_count", {"performative": "execute_command"})] == 1
+        assert snapshot[metric_key(HANDLER_DURATION, {"performative": "execute_command", "quantile": "0.99"})] == 0.002
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command child processes."""
+# pylint: skip-file
+
+import os
+import time
+import signal
+import asyncio
+import subprocess
+
+import pytest
+
+from packages.eightballer.connections.shell_command.process import (
+    ChildProcess,
+    SpawnServer,
+    spawn_pipeline,
+    pipeline_resource_usage,
+)
+
+
+class TestSpawnServer:
+    """Test spawning through the spawn server."""
+
+    @pytest.mark.asyncio
+    async def test_spawns_with_output_and_exit_status(self):
+        """Test that a command spawned by the helper is read and reaped like a direct child."""
+        spawn_server = SpawnServer()
+        await spawn_server.start()
+        try:
+            process = await spawn_server.spawn(["sh", "-c", "echo out; echo err >&2; exit 4"])
+            assert process.pid != spawn_server.helper.pid
+            stdout, stderr = await asyncio.gather(process.stdout.read(), process.stderr.read())
+            assert await asyncio.wait_for(process.wait(), timeout=5) == 4
+            assert (stdout, stderr) == (b"out\n", b"err\n")
+            assert "cpu_time" in process.resource_usage
+        finally:
+            await spawn_server.stop()
+
+    @pytest.mark.asyncio
+    async def test_reports_exec_failure(self):
+        """Test that a command which cannot be executed raises like a direct spawn."""
+        spawn_server = SpawnServer()
+        await spawn_server.start()
+        try:
+            with pytest.raises(FileNotFoundError):
+                await spawn_server.spawn(["does-not-exist"])
+            with pytest.raises(FileNotFoundError):
+                await ChildProcess.spawn(["does-not-exist"])
+        finally:
+            await spawn_server.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_kills_running_commands(self):
+        """Test that stopping the helper ends the commands it spawned."""
+        spawn_server = SpawnServer()
+        await spawn_server.start()
+        process = await spawn_server.spawn(["sleep", "30"])
+        await spawn_server.stop()
+        assert not spawn_server.is_running
+        assert await asyncio.wait_for(process.wait(), timeout=5) < 0
+
+
+class TestSpawnPipeline:
+    """Test spawning the stages of a pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_stages_are_piped_together(self):
+        """Test that each stage reads the stdout of the previous one, and that all share one stderr."""
+        fds = len(os.listdir("/proc/self/fd"))
+        processes = await spawn_pipeline(
+            [
+                ["sh", "-c", "printf 'b\\na\\nc\\n'; echo first >&2"],
+                ["sort"],
+                ["sh", "-c", "sleep 0.1; cat; echo last >&2; exit 4"],
+            ]
+        )
+        last = processes[-1]
+        stdout, stderr = await asyncio.gather(last.stdout.read(), last.stderr.read())
+        assert [await process.wait() for process in processes] == [0, 0, 4]
+        assert stdout == b"a\nb\nc\n"
+        assert stderr == b"first\nlast\n"
+        usage = pipeline_resource_usage(processes)
+        assert usage["wall_time"] >= 0.1
+        assert usage["cpu_time"] == pytest.approx(sum(process.resource_usage["cpu_time"] for process in processes))
+        del last
+        # only the read ends of the last stage were kept, by its stream readers
+        assert len(os.listdir("/proc/self/fd")) <= fds + 2
+
+    @pytest.mark.asyncio
+    async def test_upstream_stage_ends_with_the_pipe(self):
+        """Test that a stage writing into a pipe nobody reads any more is ended by SIGPIPE."""
+        processes = await spawn_pipeline([["yes"], ["head", "-n", "2"]])
+        assert await processes[1].stdout.read() == b"y\ny\n"
+        assert [await process.wait() for process in processes] == [-signal.SIGPIPE, 0]
+
+    @pytest.mark.asyncio
+    async def test_failed_stage_ends_started_stages(self):
+        """Test that a stage which cannot be executed raises, and kills the stages started before it."""
+        fds = len(os.listdir("/proc/self/fd"))
+        with pytest.raises(FileNotFoundError):
+            await spawn_pipeline([["sleep", "30"], ["does-not-exist"], ["cat"]])
+        assert len(os.listdir("/proc/self/fd")) == fds
+
+
+class TestStdinWriter:
+    """Test writing to the stdin of a process."""
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_the_process(self):
+        """Test that draining waits for the process to read its input, and that closing ends the input."""
+        process = await ChildProcess.spawn(["sh", "-c", "sleep 0.2; wc -c"], stdin=subprocess.PIPE)
+        start = time.monotonic()
+        process.stdin.write(b"x" * 256 * 1024)
+        await process.stdin.drain()
+        assert time.monotonic() - start >= 0.2
+        await process.stdin.close()
+        assert process.stdin.closed
+        with pytest.raises(ValueError):
+            process.stdin.write(b"more")
+        assert (await process.stdout.read()).strip() == b"262144"
+        assert await process.wait() == 0
+
+    @pytest.mark.asyncio
+    async def test_buffer_is_bounded(self):
+        """Test that data beyond what the pipe and the buffer hold is refused."""
+        process = await ChildProcess.spawn(["sleep", "30"], stdin=subprocess.PIPE, stdin_buffer_size=1024)
+        try:
+            # the pipe itself takes what it can hold before anything is buffered
+            while not process.stdin.buffered:
+                process.stdin.write(b"x" * 1000)
+            with pytest.raises(BufferError):
+                process.stdin.write(b"x" * 1000)
+            with pytest.raises(BufferError):
+                process.stdin.write(b"x" * 1025)
+            assert 0 < process.stdin.buffered <= 1024
+        finally:
+            process.stdin.abort()
+            process.kill_group()
+            await process.wait()
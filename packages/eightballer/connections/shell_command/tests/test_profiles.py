@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command command profiles."""
+# pylint: skip-file
+
+import os
+import shutil
+
+import pytest
+
+from packages.eightballer.connections.shell_command.profiles import CommandProfile
+
+
+class TestCommandProfile:
+    """Test the command profiles."""
+
+    def test_resolves_once(self, tmp_path):
+        """Test that the executable, environment and working directory are resolved up front."""
+        profile = CommandProfile.from_config(
+            "shell", {"command": "sh", "args": ["-c"], "env": {"FOO": 1}, "cwd": str(tmp_path)}
+        ).resolve()
+        assert profile.executable == shutil.which("sh")
+        assert profile.cwd == str(tmp_path)
+        assert profile.environment["FOO"] == "1"
+        assert profile.environment["PATH"] == os.environ["PATH"]
+
+        argv, env = profile.build(["echo hi"])
+        assert argv == [profile.executable, "-c", "echo hi"]
+        assert env is profile.environment
+
+        _, env = profile.build([], {"FOO": "2", "BAR": "3"})
+        assert (env["FOO"], env["BAR"], env["PATH"]) == ("2", "3", os.environ["PATH"])
+        assert profile.environment["FOO"] == "1"
+
+    def test_without_inherited_environment(self):
+        """Test that a profile may start from an empty environment."""
+        profile = CommandProfile("clean", "/bin/sh", env={"ONLY": "this"}, inherit_env=False).resolve()
+        assert profile.environment == {"ONLY": "this"}
+
+    def test_rejects_invalid_profiles(self, tmp_path):
+        """Test that profiles which cannot run are refused when they are resolved."""
+        with pytest.raises(ValueError):
+            CommandProfile.from_config("typo", {"command": "sh", "argv": []})
+        with pytest.raises(ValueError):
+            CommandProfile("missing", "does-not-exist").resolve()
+        with pytest.raises(ValueError):
+            CommandProfile("nowhere", "sh", cwd=str(tmp_path / "missing")).resolve()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command process registry."""
+# pylint: skip-file
+
+import time
+import signal
+import asyncio
+
+import pytest
+
+from packages.eightballer.connections.shell_command.buffers import ProcessOutput
+from packages.eightballer.connections.shell_command.process import ChildProcess
+from packages.eightballer.connections.shell_command.registry import ProcessRegistry, terminate_processes
+
+
+def alive(pid: int) -> bool:
+    """Check whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+class TestProcessRegistry:
+    """Test indexing processes by dialogue reference and pid."""
+
+    @pytest.mark.asyncio
+    async def test_indexes_by_reference_and_pid(self):
+        """Test that processes are found by the dialogue which started them and by pid until removed."""
+        registry = ProcessRegistry()
+        first, second, other = [await ChildProcess.spawn(["sleep", "5"]) for _ in range(3)]
+        registry.add("batch", first)
+        registry.add("batch", second)
+        registry.add("other", other)
+
+        assert sorted(process.pid for process in registry.find("batch")) == sorted([first.pid, second.pid])
+        assert registry.get(other.pid) is other
+        assert registry.reference_of(other) == "other"
+        assert len(registry) == 3 and first in registry
+
+        registry.remove(first)
+        registry.remove(first)
+        registry.remove(other)
+        assert registry.find("batch") == [second]
+        assert registry.find("other") == []
+        assert registry.get(first.pid) is None
+        assert list(registry) == [second]
+        await terminate_processes([first, second, other], grace_period=1)
+
+    @pytest.mark.asyncio
+    async def test_status_of_running_and_exited_process(self):
+        """Test that a status reports output and usage while running, and is kept once the process exits."""
+        registry = ProcessRegistry(history_size=1, tail_size=4)
+        process = await ChildProcess.spawn(["sleep", "5"])
+        status = registry.add("sleep", process)
+        output = status.output = ProcessOutput(1024, 1024)
+        output.write("stdout", b"first\nsecond\n")
+        output.write("stderr", b"err\n")
+        registry.sample()
+
+        assert registry.statuses("sleep") == [status]
+        assert (status.running, status.exit_code, status.bytes_emitted) == (True, -1, 17)
+        assert status.tail("stdout", 7) == b"second\n"
+        assert status.cpu_time >= 0 and status.rss > 0 and status.uptime > 0
+
+        await terminate_processes([process], grace_period=1)
+        registry.remove(process)
+        assert not registry and registry.find("sleep") == []
+        assert registry.statuses("sleep") == registry.statuses(pid=process.pid) == [status]
+        assert (status.running, status.exit_code, status.bytes_emitted) == (False, -signal.SIGTERM, 17)
+        assert (status.tail("stdout", 100), status.tail("stderr", 100)) == (b"ond\n", b"err\n")
+        assert status.output is None
+
+        other = await ChildProcess.spawn(["true"])
+        registry.add("true", other)
+        await other.wait()
+        registry.remove(other)
+        # the history only keeps the most recent exits
+        assert registry.statuses("sleep") == []
+        assert registry.statuses("true")[0].exit_code == 0
+
+
+class TestTerminate:
+    """Test graceful termination of processes."""
+
+    @pytest.mark.asyncio
+    async def test_terminates_gracefully(self):
+        """Test that processes which handle SIGTERM exit with it, without waiting for the grace period."""
+        process = await ChildProcess.spawn(["sh", "-c", "trap 'exit 7' TERM; sleep 30 & wait"])
+        await asyncio.sleep(0.2)
+        start = time.monotonic()
+        assert await terminate_processes([process], grace_period=5) == [7]
+        assert time.monotonic() - start < 1
+
+    @pytest.mark.asyncio
+    async def test_escalates_to_kill_and_reaps_orphans(self):
+        """Test that processes ignoring SIGTERM are killed after the grace period, along with their orphans."""
+        stubborn = await ChildProcess.spawn(["sh", "-c", "trap '' TERM; sleep 30"])
+        # the leader exits on SIGTERM, leaving a grandchild which ignores it in the process group
+        leader = await ChildProcess.spawn(["sh", "-c", "(trap '' TERM; sleep 30) & echo $!; wait"])
+        orphan = int(await leader.stdout.readline())
+        await asyncio.sleep(0.2)
+
+        start = time.monotonic()
+        exit_codes = await terminate_processes([stubborn, leader], grace_period=0.5)
+        assert exit_codes == [-signal.SIGKILL, -signal.SIGTERM]
+        assert 0.5 <= time.monotonic() - start < 2
+        for _ in range(50):
+            if not alive(orphan):
+                break
+            await asyncio.sleep(0.02)
+        assert not alive(orphan)
+
+    @pytest.mark.asyncio
+    async def test_does_not_block_the_loop(self):
+        """Test that the event loop keeps running while processes are given time to exit."""
+        process = await ChildProcess.spawn(["sh", "-c", "trap '' TERM; sleep 30"])
+        await asyncio.sleep(0.1)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        await terminate_processes([process], grace_period=0.3)
+        ticker.cancel()
+        assert ticks >= 10
+        assert process.returncode == -signal.SIGKILL
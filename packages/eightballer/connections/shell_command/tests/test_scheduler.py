@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command scheduler."""
+# pylint: skip-file
+
+import asyncio
+
+import pytest
+
+from packages.eightballer.connections.shell_command.scheduler import CommandScheduler
+
+
+async def _settle():
+    """Let the waiting acquisitions observe their results."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestCommandScheduler:
+    """Test the command scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        """Test that no more than max_concurrency commands are admitted at once."""
+        scheduler = CommandScheduler(2)
+        waiters = [asyncio.ensure_future(scheduler.acquire()) for _ in range(4)]
+        await _settle()
+        assert sum(waiter.done() for waiter in waiters) == 2
+        assert scheduler.queue_depth == 2
+
+        scheduler.release()
+        await _settle()
+        assert sum(waiter.done() for waiter in waiters) == 3
+        assert scheduler.stats()["running"] == 2
+        for waiter in waiters:
+            waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_admits_by_priority(self):
+        """Test that the highest priority waiting command is admitted first."""
+        scheduler = CommandScheduler(1)
+        await scheduler.acquire()
+        low = asyncio.ensure_future(scheduler.acquire(priority=0, key="a"))
+        high = asyncio.ensure_future(scheduler.acquire(priority=5, key="b"))
+        await _settle()
+        scheduler.release()
+        await _settle()
+        assert high.done()
+        assert not low.done()
+        low.cancel()
+
+    @pytest.mark.asyncio
+    async def test_interleaves_requesters(self):
+        """Test that a burst from one requester does not starve another."""
+        scheduler = CommandScheduler(1)
+        await scheduler.acquire(key="burst")
+        order = []
+
+        async def run(key):
+            await scheduler.acquire(key=key)
+            order.append(key)
+
+        tasks = [asyncio.ensure_future(run("burst")) for _ in range(3)]
+        tasks.append(asyncio.ensure_future(run("other")))
+        await _settle()
+        for _ in range(4):
+            scheduler.release()
+            await _settle()
+        assert order.index("other") <= 1
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_forgets_keys_without_waiting_commands(self):
+        """Test that the finish tags of keys are dropped once none of their commands wait, under a backlog."""
+        scheduler = CommandScheduler(1)
+        await scheduler.acquire()
+        backlog = asyncio.ensure_future(scheduler.acquire(priority=-1, key="backlog"))
+        for key in range(10):
+            waiter = asyncio.ensure_future(scheduler.acquire(priority=1, key=key))
+            await _settle()
+            scheduler.release()
+            await _settle()
+            assert waiter.done()
+            assert set(scheduler._finish_tags) == {"backlog"}
+        backlog.cancel()
+        await _settle()
+        assert not scheduler._finish_tags
+
+    @pytest.mark.asyncio
+    async def test_class_limit_does_not_block_other_classes(self):
+        """Test that a class at its limit is passed over for other classes."""
+        scheduler = CommandScheduler(4, {"heavy": 1})
+        await scheduler.acquire("heavy")
+        heavy = asyncio.ensure_future(scheduler.acquire("heavy", priority=10))
+        light = asyncio.ensure_future(scheduler.acquire("light"))
+        await _settle()
+        assert not heavy.done()
+        assert light.done()
+
+        scheduler.release("heavy")
+        await _settle()
+        assert heavy.done()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        """Test that cancelling a waiting command leaves the slots balanced."""
+        scheduler = CommandScheduler(1)
+        await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        scheduler.release()
+        assert scheduler.running == 0
+        assert scheduler.queue_depth == 0
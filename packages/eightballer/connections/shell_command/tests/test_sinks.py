@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command output sinks."""
+# pylint: skip-file
+
+import os
+import asyncio
+
+import pytest
+
+from packages.eightballer.connections.shell_command.sinks import (
+    OutputSink,
+    RotatingFileSink,
+    sink_path,
+    read_tail,
+    read_range,
+    validate_sink,
+)
+
+
+def test_validate_sink_rejects_unusable_rotation():
+    """Test that a rotation size which is not positive, or a negative backup count, is refused."""
+    validate_sink(1024, 0)
+    with pytest.raises(ValueError):
+        validate_sink(0, 3)
+    with pytest.raises(ValueError):
+        validate_sink(1024, -1)
+
+
+class TestRotatingFileSink:
+    """Test the rotating file sink."""
+
+    @pytest.mark.asyncio
+    async def test_drains_pipe_with_rotation(self, tmp_path):
+        """Test that a pipe is moved into size-rotated files until end of file."""
+        path = tmp_path / "out.log"
+        sink = RotatingFileSink(path, max_bytes=10, backup_count=2)
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"0123456789abcdefghijKLMNO")
+        os.close(write_fd)
+        await asyncio.wait_for(sink.drain(os.fdopen(read_fd, "rb", 0)), timeout=5)
+
+        assert sink.bytes_written == 25
+        assert path.read_bytes() == b"KLMNO"
+        assert (tmp_path / "out.log.1").read_bytes() == b"abcdefghij"
+        assert (tmp_path / "out.log.2").read_bytes() == b"0123456789"
+        assert not (tmp_path / "out.log.3").exists()
+
+    @pytest.mark.asyncio
+    async def test_appends_to_existing_log(self, tmp_path):
+        """Test that a new process appends to the log of the previous one."""
+        path = tmp_path / "out.log"
+        path.write_bytes(b"old\n")
+        sink = RotatingFileSink(path, max_bytes=1024, backup_count=1)
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"new\n")
+        os.close(write_fd)
+        await sink.drain(os.fdopen(read_fd, "rb", 0))
+        assert path.read_bytes() == b"old\nnew\n"
+
+
+class TestTailReader:
+    """Test reading the tail of rotated logs."""
+
+    def test_read_range(self, tmp_path):
+        """Test that byte ranges are clipped to the file."""
+        path = tmp_path / "out.log"
+        path.write_bytes(b"0123456789")
+        assert read_range(path, 2, 5) == b"234"
+        assert read_range(path, 8) == b"89"
+        assert read_range(path, 20) == b""
+        assert read_range(tmp_path / "missing.log", 0) == b""
+
+    def test_read_tail_reaches_into_backup(self, tmp_path):
+        """Test that a tail longer than the current file continues in the newest backup."""
+        path = tmp_path / "out.log"
+        (tmp_path / "out.log.1").write_bytes(b"abcdefghij")
+        path.write_bytes(b"KLM")
+        assert read_tail(path, 2) == b"LM"
+        assert read_tail(path, 6) == b"hijKLM"
+        assert read_tail(path, 100) == b"abcdefghijKLM"
+        assert read_tail(tmp_path / "missing.log", 10) == b""
+
+
+@pytest.mark.asyncio
+async def test_output_sink_paths(tmp_path):
+    """Test that an output sink writes each stream to its own log."""
+    sink = OutputSink(tmp_path / "broker", 1024, 1)
+    assert sink.files["stdout"].path == sink_path(tmp_path / "broker", "stdout") == tmp_path / "broker.stdout.log"
+    assert sink.files["stderr"].path == tmp_path / "broker.stderr.log"
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+
+"""This module contains the tests of the Shell Command process supervisor."""
+# pylint: skip-file
+
+import asyncio
+
+import pytest
+
+from packages.eightballer.connections.shell_command.process import ChildProcess
+from packages.eightballer.connections.shell_command.supervisor import (
+    Supervisor,
+    RestartPolicy,
+    CrashLoopError,
+    probe_ready,
+)
+
+
+async def _serve(response: bytes):
+    """Start a server which answers every connection with the response."""
+
+    async def handle(reader, writer):
+        await reader.readline()
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+class TestProbeReady:
+    """Test the readiness probes."""
+
+    @pytest.mark.asyncio
+    async def test_tcp_probe(self):
+        """Test that a tcp probe succeeds only while a port is listening."""
+        server, port = await _serve(b"")
+        assert await probe_ready(f"tcp://127.0.0.1:{port}")
+        server.close()
+        await server.wait_closed()
+        assert not await probe_ready(f"tcp://127.0.0.1:{port}")
+
+    @pytest.mark.asyncio
+    async def test_http_probe_checks_status(self):
+        """Test that an http probe requires a successful status."""
+        server, port = await _serve(b"HTTP/1.0 200 OK\r\n\r\n")
+        assert await probe_ready(f"http://127.0.0.1:{port}/scores")
+        server.close()
+
+        server, port = await _serve(b"HTTP/1.0 503 Service Unavailable\r\n\r\n")
+        assert not await probe_ready(f"http://127.0.0.1:{port}/")
+        server.close()
+
+
+class TestSupervisor:
+    """Test the supervisor."""
+
+    @pytest.mark.asyncio
+    async def test_restarts_until_crash_loop(self):
+        """Test that a failing process is restarted with backoff until it crash-loops."""
+        events = []
+
+        async def spawn():
+            return await ChildProcess.spawn(["sh", "-c", "exit 1"])
+
+        def emit(event, process, restarts, **kwargs):
+            events.append((event, restarts, kwargs.get("exit_code")))
+
+        policy = RestartPolicy(backoff_initial=0.01, backoff_max=0.02, crash_loop_restarts=2, crash_loop_window=10)
+        supervisor = Supervisor(spawn, lambda process: process.wait(), emit, policy)
+        with pytest.raises(CrashLoopError):
+            await asyncio.wait_for(supervisor.run(), timeout=10)
+
+        assert events == [
+            ("started", 0, None),
+            ("exited", 0, 1),
+            ("restarted", 1, None),
+            ("exited", 1, 1),
+            ("restarted", 2, None),
+            ("exited", 2, 1),
+        ]
+
+    def test_rejects_unknown_probe(self):
+        """Test that only tcp and http probes are accepted."""
+        with pytest.raises(ValueError):
+            Supervisor(None, None, None, RestartPolicy(), ready_probe="udp://127.0.0.1:1")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2025 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+Compression of large command results for the shell_command protocol.
+
+A compressed result carries its stdout and stderr in the compressed_output field, leaving the string fields empty.
+The payload is the stdout length as a big-endian uint32, then stdout and stderr encoded as utf-8, compressed with
+zstd when the zstandard package is installed and with zlib otherwise. The codec is told apart by its magic number,
+so a receiver without zstandard still reads zlib payloads. Payloads are only decompressed when read_output is called.
+"""
+
+import zlib
+import struct
+from typing import Tuple, Optional
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage  # type: ignore
+
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: nocover
+    zstandard = None
+
+ZSTD, ZLIB = "zstd", "zlib"
+CODECS = (ZSTD, ZLIB) if zstandard is not None else (ZLIB,)
+DEFAULT_CODEC = CODECS[0]
+DEFAULT_LEVEL = {ZSTD: 3, ZLIB: 1}
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+LENGTH = struct.Struct(">I")
+
+
+def compress_output(stdout: str, stderr: str, codec: str = DEFAULT_CODEC, level: Optional[int] = None) -> bytes:
+    """
+    Compress the output of a command.
+
+    :param stdout: the standard output.
+    :param stderr: the standard error.
+    :param codec: the codec, one of CODECS.
+    :param level: the compression level, the default of the codec when not given.
+    :return: the compressed payload.
+    """
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown or unavailable codec {codec!r}, expected one of {CODECS}.")
+    stdout_bytes = stdout.encode("utf-8")
+    payload = b"".join((LENGTH.pack(len(stdout_bytes)), stdout_bytes, stderr.encode("utf-8")))
+    level = DEFAULT_LEVEL[codec] if level is None else level
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(payload)
+    return zlib.compress(payload, level)
+
+
+def decompress_output(data: bytes) -> Tuple[str, str]:
+    """
+    Decompress the output of a command.
+
+    :param data: the compressed payload.
+    :return: the standard output and the standard error.
+    """
+
+    if data[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("The output is zstd compressed and the zstandard package is not installed.")
+        payload = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        payload = zlib.decompress(data)
+    (stdout_length,) = LENGTH.unpack_from(payload)
+    end = LENGTH.size + stdout_length
+    return payload[LENGTH.size : end].decode("utf-8"), payload[end:].decode("utf-8")
+
+
+def read_output(message: ShellCommandMessage) -> Tuple[str, str]:
+    """
+    Read the output of a command result, compressed or not.
+
+    :param message: the command_result message.
+    :return: the standard output and the standard error.
+    """
+
+    if message.is_set("compressed_output"):
+        return decompress_output(message.compressed_output)
+    return message.stdout, message.stderr
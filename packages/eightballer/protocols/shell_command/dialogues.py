@@ -25,17 +25,101 @@ class ShellCommandDialogue(Dialogue):
     """The shell_command dialogue class maintains state of a dialogue and manages it."""
 
     INITIAL_PERFORMATIVES: FrozenSet[Message.Performative] = frozenset(
-        {ShellCommandMessage.Performative.EXECUTE_COMMAND}
+        {
+            ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            ShellCommandMessage.Performative.EXECUTE_BATCH,
+            ShellCommandMessage.Performative.EXECUTE_PIPELINE,
+            ShellCommandMessage.Performative.SEND_SIGNAL,
+            ShellCommandMessage.Performative.TERMINATE,
+            ShellCommandMessage.Performative.QUERY_STATUS,
+            ShellCommandMessage.Performative.WRITE_STDIN,
+            ShellCommandMessage.Performative.QUERY_METRICS,
+        }
     )
     TERMINAL_PERFORMATIVES: FrozenSet[Message.Performative] = frozenset(
-        {ShellCommandMessage.Performative.COMMAND_RESULT, ShellCommandMessage.Performative.EXECUTION_ERROR}
+        {
+            ShellCommandMessage.Performative.COMMAND_RESULT,
+            ShellCommandMessage.Performative.BATCH_RESULT,
+            ShellCommandMessage.Performative.CONTROL_RESULT,
+            ShellCommandMessage.Performative.STATUS_RESULT,
+            ShellCommandMessage.Performative.METRICS_RESULT,
+            ShellCommandMessage.Performative.EXECUTION_ERROR,
+        }
     )
     VALID_REPLIES: Dict[Message.Performative, FrozenSet[Message.Performative]] = {
+        ShellCommandMessage.Performative.BATCH_RESULT: frozenset(),
         ShellCommandMessage.Performative.COMMAND_RESULT: frozenset(),
+        ShellCommandMessage.Performative.CONTROL_RESULT: frozenset(),
+        ShellCommandMessage.Performative.EXECUTE_BATCH: frozenset(
+            {
+                ShellCommandMessage.Performative.BATCH_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
         ShellCommandMessage.Performative.EXECUTE_COMMAND: frozenset(
-            {ShellCommandMessage.Performative.COMMAND_RESULT, ShellCommandMessage.Performative.EXECUTION_ERROR}
+            {
+                ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                ShellCommandMessage.Performative.PROCESS_EVENT,
+                ShellCommandMessage.Performative.COMMAND_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.EXECUTE_PIPELINE: frozenset(
+            {
+                ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                ShellCommandMessage.Performative.COMMAND_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
         ),
         ShellCommandMessage.Performative.EXECUTION_ERROR: frozenset(),
+        ShellCommandMessage.Performative.METRICS_RESULT: frozenset(),
+        ShellCommandMessage.Performative.OUTPUT_CHUNK: frozenset(
+            {
+                ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                ShellCommandMessage.Performative.PROCESS_EVENT,
+                ShellCommandMessage.Performative.COMMAND_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.PROCESS_EVENT: frozenset(
+            {
+                ShellCommandMessage.Performative.PROCESS_EVENT,
+                ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                ShellCommandMessage.Performative.COMMAND_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.QUERY_METRICS: frozenset(
+            {
+                ShellCommandMessage.Performative.METRICS_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.QUERY_STATUS: frozenset(
+            {
+                ShellCommandMessage.Performative.STATUS_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.SEND_SIGNAL: frozenset(
+            {
+                ShellCommandMessage.Performative.CONTROL_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.STATUS_RESULT: frozenset(),
+        ShellCommandMessage.Performative.TERMINATE: frozenset(
+            {
+                ShellCommandMessage.Performative.CONTROL_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
+        ShellCommandMessage.Performative.WRITE_STDIN: frozenset(
+            {
+                ShellCommandMessage.Performative.CONTROL_RESULT,
+                ShellCommandMessage.Performative.EXECUTION_ERROR,
+            }
+        ),
     }
 
     class Role(Dialogue.Role):
@@ -48,7 +132,11 @@ class ShellCommandDialogue(Dialogue):
         """This class defines the end states of a shell_command dialogue."""
 
         COMMAND_RESULT = 0
-        EXECUTION_ERROR = 1
+        BATCH_RESULT = 1
+        CONTROL_RESULT = 2
+        STATUS_RESULT = 3
+        METRICS_RESULT = 4
+        EXECUTION_ERROR = 5
 
     def __init__(
         self,
@@ -78,7 +166,14 @@ class BaseShellCommandDialogues(Dialogues, ABC):
     """This class keeps track of all shell_command dialogues."""
 
     END_STATES = frozenset(
-        {ShellCommandDialogue.EndState.COMMAND_RESULT, ShellCommandDialogue.EndState.EXECUTION_ERROR}
+        {
+            ShellCommandDialogue.EndState.COMMAND_RESULT,
+            ShellCommandDialogue.EndState.BATCH_RESULT,
+            ShellCommandDialogue.EndState.CONTROL_RESULT,
+            ShellCommandDialogue.EndState.STATUS_RESULT,
+            ShellCommandDialogue.EndState.METRICS_RESULT,
+            ShellCommandDialogue.EndState.EXECUTION_ERROR,
+        }
     )
     _keep_terminal_state_dialogues = False
 
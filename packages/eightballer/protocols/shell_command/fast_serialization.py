@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2025 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""
+A fast-path codec for the shell_command protocol.
+
+ShellCommandSerializer builds each performative separately, copies it into the protocol message, serializes
+that into the dialogue message and copies and serializes again into the envelope message. The codec here sets
+the performative fields in place, serializes the protocol message once and writes the two wrapper messages by
+hand, producing the same bytes. The field plan of every performative is compiled from the protobuf descriptors
+at import, so the codec follows the protocol specification without edits.
+
+Decoding can be trusted, building the message without re-running its consistency checks. This is only safe
+for bytes produced by a trusted encoder, such as the connection's own messages.
+"""
+
+# pylint: disable=no-member
+from typing import Any, Dict, List, Tuple, Callable
+
+from aea.protocols.base import Message, Serializer  # type: ignore
+from google.protobuf.descriptor import FieldDescriptor
+
+from packages.eightballer.protocols.shell_command import custom_types, shell_command_pb2  # type: ignore
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage  # type: ignore
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer  # type: ignore
+
+
+SCALAR, REPEATED, MAP, CUSTOM = range(4)
+IS_SET_SUFFIX = "_is_set"
+
+# wire tags of aea.mail.base_pb2.Message and DialogueMessage
+MESSAGE_DIALOGUE_MESSAGE_TAG = 0x12
+DIALOGUE_MESSAGE_ID_TAG = 0x08
+DIALOGUE_STARTER_REFERENCE_TAG = 0x12
+DIALOGUE_RESPONDER_REFERENCE_TAG = 0x1A
+DIALOGUE_TARGET_TAG = 0x20
+DIALOGUE_CONTENT_TAG = 0x2A
+MESSAGE_DIALOGUE_MESSAGE_TAG_BYTES = bytes((MESSAGE_DIALOGUE_MESSAGE_TAG,))
+DIALOGUE_MESSAGE_ID_TAG_BYTES = bytes((DIALOGUE_MESSAGE_ID_TAG,))
+DIALOGUE_STARTER_REFERENCE_TAG_BYTES = bytes((DIALOGUE_STARTER_REFERENCE_TAG,))
+DIALOGUE_RESPONDER_REFERENCE_TAG_BYTES = bytes((DIALOGUE_RESPONDER_REFERENCE_TAG,))
+DIALOGUE_TARGET_TAG_BYTES = bytes((DIALOGUE_TARGET_TAG,))
+DIALOGUE_CONTENT_TAG_BYTES = bytes((DIALOGUE_CONTENT_TAG,))
+
+FieldPlan = Tuple[str, int, bool, Any]
+
+
+def _compile_plans() -> Dict[str, List[FieldPlan]]:
+    """Compile, per performative, the fields to copy with their kind, optionality and custom type."""
+
+    plans: Dict[str, List[FieldPlan]] = {}
+    for oneof_field in shell_command_pb2.ShellCommandMessage.DESCRIPTOR.oneofs_by_name["performative"].fields:
+        descriptor = oneof_field.message_type
+        names = set(descriptor.fields_by_name)
+        plan = []
+        for field in descriptor.fields:
+            if field.name.endswith(IS_SET_SUFFIX):
+                continue
+            optional = field.name + IS_SET_SUFFIX in names
+            custom_type = None
+            if field.message_type is not None and field.message_type.GetOptions().map_entry:
+                kind = MAP
+            elif field.label == FieldDescriptor.LABEL_REPEATED:
+                kind = REPEATED
+            elif field.message_type is not None:
+                kind, custom_type = CUSTOM, getattr(custom_types, field.message_type.name)
+            else:
+                kind = SCALAR
+            plan.append((field.name, kind, optional, custom_type))
+        plans[oneof_field.name] = plan
+    return plans
+
+
+PLANS = _compile_plans()
+
+
+SMALL_VARINTS = tuple(bytes((value,)) for value in range(0x80))
+
+
+def _varint(value: int) -> bytes:
+    """Encode an int as a protobuf varint, negative values taking ten bytes as for int32."""
+
+    if 0 <= value < 0x80:
+        return SMALL_VARINTS[value]
+    if value < 0:
+        value += 1 << 64
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Decode a protobuf varint, returning the value and the position after it."""
+
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _int32(value: int) -> int:
+    """Interpret a decoded varint as an int32."""
+
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def build_trusted_message(
+    performative: ShellCommandMessage.Performative,
+    dialogue_reference: Tuple[str, str] = ("", ""),
+    message_id: int = 1,
+    target: int = 0,
+    **kwargs: Any,
+) -> ShellCommandMessage:
+    """
+    Build a message without checking its consistency.
+
+    :param performative: the message performative.
+    :param dialogue_reference: the dialogue reference.
+    :param message_id: the message id.
+    :param target: the message target.
+    :param kwargs: the contents of the message, which the caller guarantees are consistent.
+    :return: the message.
+    """
+
+    message = ShellCommandMessage.__new__(ShellCommandMessage)
+    message._to = None  # pylint: disable=protected-access
+    message._sender = None  # pylint: disable=protected-access
+    slots = message._slots = ShellCommandMessage._SlotsCls()  # pylint: disable=protected-access
+    slots.dialogue_reference = dialogue_reference
+    slots.message_id = message_id
+    slots.target = target
+    slots.performative = ShellCommandMessage.Performative(performative)
+    for key, value in kwargs.items():
+        setattr(slots, key, value)
+    return message
+
+
+class TrustedShellCommandMessage(ShellCommandMessage):
+    """
+    A message class building messages without checking their consistency.
+
+    Dialogues given this class build their replies through it, which suits a connection replying at a high
+    rate with contents it controls. The messages built are plain ShellCommandMessage instances.
+    """
+
+    __slots__: Tuple[str, ...] = tuple()
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> ShellCommandMessage:  # type: ignore
+        """Build a ShellCommandMessage without checking its consistency."""
+        return build_trusted_message(*args, **kwargs)
+
+
+class FastShellCommandSerializer(Serializer):
+    """Single-pass serialization for the 'shell_command' protocol, byte-for-byte compatible with the generated one."""
+
+    @staticmethod
+    def encode(msg: Message) -> bytes:
+        """
+        Encode a 'ShellCommand' message into bytes.
+
+        :param msg: the message object.
+        :return: the bytes.
+        """
+
+        # the slots are read directly, the message accessors costing more than the encoding of small messages
+        slots = msg._slots  # pylint: disable=protected-access
+        performative_id = slots.performative
+        plan = PLANS.get(performative_id.value)
+        if plan is None:
+            raise ValueError("Performative not valid: {}".format(performative_id))
+        shell_command_msg = shell_command_pb2.ShellCommandMessage()  # type: ignore
+        performative = getattr(shell_command_msg, performative_id.value)
+        performative.SetInParent()
+        for name, kind, optional, custom_type in plan:
+            value = getattr(slots, name, None)
+            if value is None:
+                continue
+            if optional:
+                setattr(performative, name + IS_SET_SUFFIX, True)
+            if kind == SCALAR:
+                setattr(performative, name, value)
+            elif kind == REPEATED:
+                getattr(performative, name).extend(value)
+            elif kind == MAP:
+                getattr(performative, name).update(value)
+            else:
+                custom_type.encode(getattr(performative, name), value)
+        content = shell_command_msg.SerializeToString()
+
+        starter_reference, responder_reference = slots.dialogue_reference
+        message_id, target = slots.message_id, slots.target
+        parts = []
+        if message_id:
+            parts += (DIALOGUE_MESSAGE_ID_TAG_BYTES, _varint(message_id))
+        if starter_reference:
+            starter_reference = starter_reference.encode("utf-8")
+            parts += (DIALOGUE_STARTER_REFERENCE_TAG_BYTES, _varint(len(starter_reference)), starter_reference)
+        if responder_reference:
+            responder_reference = responder_reference.encode("utf-8")
+            parts += (DIALOGUE_RESPONDER_REFERENCE_TAG_BYTES, _varint(len(responder_reference)), responder_reference)
+        if target:
+            parts += (DIALOGUE_TARGET_TAG_BYTES, _varint(target))
+        parts += (DIALOGUE_CONTENT_TAG_BYTES, _varint(len(content)))
+        length = sum(map(len, parts)) + len(content)
+        return b"".join((MESSAGE_DIALOGUE_MESSAGE_TAG_BYTES, _varint(length), *parts, content))
+
+    @staticmethod
+    def decode(obj: bytes, trusted: bool = False) -> Message:
+        """
+        Decode bytes into a 'ShellCommand' message.
+
+        :param obj: the bytes object.
+        :param trusted: whether to skip the consistency checks of the message.
+        :return: the 'ShellCommand' message.
+        """
+
+        try:
+            header, content = FastShellCommandSerializer._decode_envelope(obj)
+        except (IndexError, ValueError):
+            # anything but a plain dialogue message, such as unknown fields, takes the generated path
+            return ShellCommandSerializer.decode(obj)
+
+        shell_command_pb = shell_command_pb2.ShellCommandMessage()  # type: ignore
+        shell_command_pb.ParseFromString(content)
+        performative = shell_command_pb.WhichOneof("performative")
+        if performative is None:
+            raise ValueError("Performative not valid: {}.".format(performative))
+        performative_pb = getattr(shell_command_pb, performative)
+        performative_content: Dict[str, Any] = {}
+        for name, kind, optional, custom_type in PLANS[performative]:
+            if optional and not getattr(performative_pb, name + IS_SET_SUFFIX):
+                continue
+            value = getattr(performative_pb, name)
+            if kind == REPEATED:
+                value = tuple(value)
+            elif kind == MAP:
+                value = dict(value)
+            elif kind == CUSTOM:
+                value = custom_type.decode(value)
+            performative_content[name] = value
+
+        build: Callable[..., Message] = build_trusted_message if trusted else ShellCommandMessage
+        return build(performative=performative, **header, **performative_content)
+
+    @staticmethod
+    def _decode_envelope(obj: bytes) -> Tuple[Dict[str, Any], bytes]:
+        """Read the dialogue header and the protocol message out of the two wrapper messages."""
+
+        position = 0
+        tag = obj[position]
+        if tag != MESSAGE_DIALOGUE_MESSAGE_TAG:
+            raise ValueError("Not a dialogue message.")
+        length, position = _read_varint(obj, position + 1)
+        end = position + length
+        if end != len(obj):
+            raise ValueError("Trailing fields after the dialogue message.")
+
+        message_id = target = 0
+        references = ["", ""]
+        content = b""
+        while position < end:
+            tag = obj[position]
+            position += 1
+            if tag in (DIALOGUE_MESSAGE_ID_TAG, DIALOGUE_TARGET_TAG):
+                value, position = _read_varint(obj, position)
+                if tag == DIALOGUE_MESSAGE_ID_TAG:
+                    message_id = _int32(value)
+                else:
+                    target = _int32(value)
+            elif tag in (DIALOGUE_STARTER_REFERENCE_TAG, DIALOGUE_RESPONDER_REFERENCE_TAG, DIALOGUE_CONTENT_TAG):
+                length, position = _read_varint(obj, position)
+                value = obj[position : position + length]
+                position += length
+                if tag == DIALOGUE_CONTENT_TAG:
+                    content = value
+                else:
+                    references[tag == DIALOGUE_RESPONDER_REFERENCE_TAG] = value.decode("utf-8")
+            else:
+                raise ValueError("Unknown dialogue message field.")
+        header = {"message_id": message_id, "dialogue_reference": tuple(references), "target": target}
+        return header, content
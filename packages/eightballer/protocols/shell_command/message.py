@@ -50,33 +50,107 @@ class ShellCommandMessage(Message):
     class Performative(Message.Performative):
         """Performatives for the shell_command protocol."""
 
+        BATCH_RESULT = "batch_result"
         COMMAND_RESULT = "command_result"
+        CONTROL_RESULT = "control_result"
+        EXECUTE_BATCH = "execute_batch"
         EXECUTE_COMMAND = "execute_command"
+        EXECUTE_PIPELINE = "execute_pipeline"
         EXECUTION_ERROR = "execution_error"
+        METRICS_RESULT = "metrics_result"
+        OUTPUT_CHUNK = "output_chunk"
+        PROCESS_EVENT = "process_event"
+        QUERY_METRICS = "query_metrics"
+        QUERY_STATUS = "query_status"
+        SEND_SIGNAL = "send_signal"
+        STATUS_RESULT = "status_result"
+        TERMINATE = "terminate"
+        WRITE_STDIN = "write_stdin"
 
         def __str__(self) -> str:
             """Get the string representation."""
             return str(self.value)
 
-    _performatives = {"command_result", "execute_command", "execution_error"}
+    _performatives = {
+        "batch_result",
+        "command_result",
+        "control_result",
+        "execute_batch",
+        "execute_command",
+        "execute_pipeline",
+        "execution_error",
+        "metrics_result",
+        "output_chunk",
+        "process_event",
+        "query_metrics",
+        "query_status",
+        "send_signal",
+        "status_result",
+        "terminate",
+        "write_stdin",
+    }
     __slots__: Tuple[str, ...] = tuple()
 
     class _SlotsCls:
         __slots__ = (
             "args",
+            "await_completion",
+            "bytes_emitted",
+            "cache_env",
+            "cache_files",
+            "cache_ttl",
             "command",
+            "command_class",
+            "commands",
+            "compress_output",
+            "compressed_output",
+            "cpu_times",
+            "data",
             "dialogue_reference",
             "env_vars",
+            "eof",
             "error",
+            "event",
             "exit_code",
+            "exit_codes",
+            "grace_period",
+            "limits",
             "message",
             "message_id",
+            "metrics",
+            "open_stdin",
             "options",
+            "parallelism",
             "performative",
+            "pid",
+            "pids",
+            "pipefail",
+            "priority",
+            "process_id",
+            "process_reference",
+            "profile",
+            "ready_probe",
+            "resource_usage",
+            "restarts",
+            "rss",
+            "running",
+            "sequence",
+            "signal_number",
+            "sink",
+            "stage_exit_codes",
+            "stages",
             "stderr",
+            "stderr_tails",
+            "stderrs",
             "stdout",
+            "stdout_tails",
+            "stdouts",
+            "stream_output",
+            "supervise",
+            "tail_size",
             "target",
             "timeout",
+            "uptimes",
         )
 
     def __init__(
@@ -139,57 +213,297 @@ class ShellCommandMessage(Message):
         enforce(self.is_set("args"), "'args' content is not set.")
         return cast(Tuple[str, ...], self.get("args"))
 
+    @property
+    def await_completion(self) -> Optional[bool]:
+        """Get the 'await_completion' content from the message."""
+        return cast(Optional[bool], self.get("await_completion"))
+
+    @property
+    def bytes_emitted(self) -> Tuple[int, ...]:
+        """Get the 'bytes_emitted' content from the message."""
+        enforce(self.is_set("bytes_emitted"), "'bytes_emitted' content is not set.")
+        return cast(Tuple[int, ...], self.get("bytes_emitted"))
+
+    @property
+    def cache_env(self) -> Optional[Tuple[str, ...]]:
+        """Get the 'cache_env' content from the message."""
+        return cast(Optional[Tuple[str, ...]], self.get("cache_env"))
+
+    @property
+    def cache_files(self) -> Optional[Tuple[str, ...]]:
+        """Get the 'cache_files' content from the message."""
+        return cast(Optional[Tuple[str, ...]], self.get("cache_files"))
+
+    @property
+    def cache_ttl(self) -> Optional[float]:
+        """Get the 'cache_ttl' content from the message."""
+        return cast(Optional[float], self.get("cache_ttl"))
+
     @property
     def command(self) -> str:
         """Get the 'command' content from the message."""
         enforce(self.is_set("command"), "'command' content is not set.")
         return cast(str, self.get("command"))
 
+    @property
+    def command_class(self) -> Optional[str]:
+        """Get the 'command_class' content from the message."""
+        return cast(Optional[str], self.get("command_class"))
+
+    @property
+    def commands(self) -> Tuple[str, ...]:
+        """Get the 'commands' content from the message."""
+        enforce(self.is_set("commands"), "'commands' content is not set.")
+        return cast(Tuple[str, ...], self.get("commands"))
+
+    @property
+    def compress_output(self) -> Optional[bool]:
+        """Get the 'compress_output' content from the message."""
+        return cast(Optional[bool], self.get("compress_output"))
+
+    @property
+    def compressed_output(self) -> Optional[bytes]:
+        """Get the 'compressed_output' content from the message."""
+        return cast(Optional[bytes], self.get("compressed_output"))
+
+    @property
+    def cpu_times(self) -> Tuple[float, ...]:
+        """Get the 'cpu_times' content from the message."""
+        enforce(self.is_set("cpu_times"), "'cpu_times' content is not set.")
+        return cast(Tuple[float, ...], self.get("cpu_times"))
+
+    @property
+    def data(self) -> bytes:
+        """Get the 'data' content from the message."""
+        enforce(self.is_set("data"), "'data' content is not set.")
+        return cast(bytes, self.get("data"))
+
     @property
     def env_vars(self) -> Optional[bytes]:
         """Get the 'env_vars' content from the message."""
         return cast(Optional[bytes], self.get("env_vars"))
 
+    @property
+    def eof(self) -> Optional[bool]:
+        """Get the 'eof' content from the message."""
+        return cast(Optional[bool], self.get("eof"))
+
     @property
     def error(self) -> CustomErrorCode:
         """Get the 'error' content from the message."""
         enforce(self.is_set("error"), "'error' content is not set.")
         return cast(CustomErrorCode, self.get("error"))
 
+    @property
+    def event(self) -> str:
+        """Get the 'event' content from the message."""
+        enforce(self.is_set("event"), "'event' content is not set.")
+        return cast(str, self.get("event"))
+
     @property
     def exit_code(self) -> int:
         """Get the 'exit_code' content from the message."""
         enforce(self.is_set("exit_code"), "'exit_code' content is not set.")
         return cast(int, self.get("exit_code"))
 
+    @property
+    def exit_codes(self) -> Tuple[int, ...]:
+        """Get the 'exit_codes' content from the message."""
+        enforce(self.is_set("exit_codes"), "'exit_codes' content is not set.")
+        return cast(Tuple[int, ...], self.get("exit_codes"))
+
+    @property
+    def grace_period(self) -> Optional[float]:
+        """Get the 'grace_period' content from the message."""
+        return cast(Optional[float], self.get("grace_period"))
+
+    @property
+    def limits(self) -> Optional[Dict[str, int]]:
+        """Get the 'limits' content from the message."""
+        return cast(Optional[Dict[str, int]], self.get("limits"))
+
     @property
     def message(self) -> Optional[str]:
         """Get the 'message' content from the message."""
         return cast(Optional[str], self.get("message"))
 
+    @property
+    def metrics(self) -> Dict[str, float]:
+        """Get the 'metrics' content from the message."""
+        enforce(self.is_set("metrics"), "'metrics' content is not set.")
+        return cast(Dict[str, float], self.get("metrics"))
+
+    @property
+    def open_stdin(self) -> Optional[bool]:
+        """Get the 'open_stdin' content from the message."""
+        return cast(Optional[bool], self.get("open_stdin"))
+
     @property
     def options(self) -> Dict[str, str]:
         """Get the 'options' content from the message."""
         enforce(self.is_set("options"), "'options' content is not set.")
         return cast(Dict[str, str], self.get("options"))
 
+    @property
+    def parallelism(self) -> Optional[int]:
+        """Get the 'parallelism' content from the message."""
+        return cast(Optional[int], self.get("parallelism"))
+
+    @property
+    def pid(self) -> int:
+        """Get the 'pid' content from the message."""
+        enforce(self.is_set("pid"), "'pid' content is not set.")
+        return cast(int, self.get("pid"))
+
+    @property
+    def pids(self) -> Tuple[int, ...]:
+        """Get the 'pids' content from the message."""
+        enforce(self.is_set("pids"), "'pids' content is not set.")
+        return cast(Tuple[int, ...], self.get("pids"))
+
+    @property
+    def pipefail(self) -> Optional[bool]:
+        """Get the 'pipefail' content from the message."""
+        return cast(Optional[bool], self.get("pipefail"))
+
+    @property
+    def priority(self) -> Optional[int]:
+        """Get the 'priority' content from the message."""
+        return cast(Optional[int], self.get("priority"))
+
+    @property
+    def process_id(self) -> Optional[int]:
+        """Get the 'process_id' content from the message."""
+        return cast(Optional[int], self.get("process_id"))
+
+    @property
+    def process_reference(self) -> Optional[str]:
+        """Get the 'process_reference' content from the message."""
+        return cast(Optional[str], self.get("process_reference"))
+
+    @property
+    def profile(self) -> Optional[str]:
+        """Get the 'profile' content from the message."""
+        return cast(Optional[str], self.get("profile"))
+
+    @property
+    def ready_probe(self) -> Optional[str]:
+        """Get the 'ready_probe' content from the message."""
+        return cast(Optional[str], self.get("ready_probe"))
+
+    @property
+    def resource_usage(self) -> Optional[Dict[str, float]]:
+        """Get the 'resource_usage' content from the message."""
+        return cast(Optional[Dict[str, float]], self.get("resource_usage"))
+
+    @property
+    def restarts(self) -> int:
+        """Get the 'restarts' content from the message."""
+        enforce(self.is_set("restarts"), "'restarts' content is not set.")
+        return cast(int, self.get("restarts"))
+
+    @property
+    def rss(self) -> Tuple[int, ...]:
+        """Get the 'rss' content from the message."""
+        enforce(self.is_set("rss"), "'rss' content is not set.")
+        return cast(Tuple[int, ...], self.get("rss"))
+
+    @property
+    def running(self) -> Tuple[bool, ...]:
+        """Get the 'running' content from the message."""
+        enforce(self.is_set("running"), "'running' content is not set.")
+        return cast(Tuple[bool, ...], self.get("running"))
+
+    @property
+    def sequence(self) -> int:
+        """Get the 'sequence' content from the message."""
+        enforce(self.is_set("sequence"), "'sequence' content is not set.")
+        return cast(int, self.get("sequence"))
+
+    @property
+    def signal_number(self) -> int:
+        """Get the 'signal_number' content from the message."""
+        enforce(self.is_set("signal_number"), "'signal_number' content is not set.")
+        return cast(int, self.get("signal_number"))
+
+    @property
+    def sink(self) -> Optional[str]:
+        """Get the 'sink' content from the message."""
+        return cast(Optional[str], self.get("sink"))
+
+    @property
+    def stage_exit_codes(self) -> Optional[Tuple[int, ...]]:
+        """Get the 'stage_exit_codes' content from the message."""
+        return cast(Optional[Tuple[int, ...]], self.get("stage_exit_codes"))
+
+    @property
+    def stages(self) -> Tuple[str, ...]:
+        """Get the 'stages' content from the message."""
+        enforce(self.is_set("stages"), "'stages' content is not set.")
+        return cast(Tuple[str, ...], self.get("stages"))
+
     @property
     def stderr(self) -> str:
         """Get the 'stderr' content from the message."""
         enforce(self.is_set("stderr"), "'stderr' content is not set.")
         return cast(str, self.get("stderr"))
 
+    @property
+    def stderr_tails(self) -> Tuple[str, ...]:
+        """Get the 'stderr_tails' content from the message."""
+        enforce(self.is_set("stderr_tails"), "'stderr_tails' content is not set.")
+        return cast(Tuple[str, ...], self.get("stderr_tails"))
+
+    @property
+    def stderrs(self) -> Tuple[str, ...]:
+        """Get the 'stderrs' content from the message."""
+        enforce(self.is_set("stderrs"), "'stderrs' content is not set.")
+        return cast(Tuple[str, ...], self.get("stderrs"))
+
     @property
     def stdout(self) -> str:
         """Get the 'stdout' content from the message."""
         enforce(self.is_set("stdout"), "'stdout' content is not set.")
         return cast(str, self.get("stdout"))
 
+    @property
+    def stdout_tails(self) -> Tuple[str, ...]:
+        """Get the 'stdout_tails' content from the message."""
+        enforce(self.is_set("stdout_tails"), "'stdout_tails' content is not set.")
+        return cast(Tuple[str, ...], self.get("stdout_tails"))
+
+    @property
+    def stdouts(self) -> Tuple[str, ...]:
+        """Get the 'stdouts' content from the message."""
+        enforce(self.is_set("stdouts"), "'stdouts' content is not set.")
+        return cast(Tuple[str, ...], self.get("stdouts"))
+
+    @property
+    def stream_output(self) -> Optional[bool]:
+        """Get the 'stream_output' content from the message."""
+        return cast(Optional[bool], self.get("stream_output"))
+
+    @property
+    def supervise(self) -> Optional[bool]:
+        """Get the 'supervise' content from the message."""
+        return cast(Optional[bool], self.get("supervise"))
+
+    @property
+    def tail_size(self) -> Optional[int]:
+        """Get the 'tail_size' content from the message."""
+        return cast(Optional[int], self.get("tail_size"))
+
     @property
     def timeout(self) -> Optional[int]:
         """Get the 'timeout' content from the message."""
         return cast(Optional[int], self.get("timeout"))
 
+    @property
+    def uptimes(self) -> Tuple[float, ...]:
+        """Get the 'uptimes' content from the message."""
+        enforce(self.is_set("uptimes"), "'uptimes' content is not set.")
+        return cast(Tuple[float, ...], self.get("uptimes"))
+
     def _is_consistent(self) -> bool:
         """Check that the message follows the shell_command protocol."""
         try:
@@ -291,6 +605,452 @@ class ShellCommandMessage(Message):
                             type(env_vars)
                         ),
                     )
+                if self.is_set("stream_output"):
+                    expected_nb_of_contents += 1
+                    stream_output = cast(bool, self.stream_output)
+                    enforce(
+                        isinstance(stream_output, bool),
+                        "Invalid type for content 'stream_output'. Expected 'bool'. Found '{}'.".format(
+                            type(stream_output)
+                        ),
+                    )
+                if self.is_set("await_completion"):
+                    expected_nb_of_contents += 1
+                    await_completion = cast(bool, self.await_completion)
+                    enforce(
+                        isinstance(await_completion, bool),
+                        "Invalid type for content 'await_completion'. Expected 'bool'. Found '{}'.".format(
+                            type(await_completion)
+                        ),
+                    )
+                if self.is_set("priority"):
+                    expected_nb_of_contents += 1
+                    priority = cast(int, self.priority)
+                    enforce(
+                        type(priority) is int,
+                        "Invalid type for content 'priority'. Expected 'int'. Found '{}'.".format(
+                            type(priority)
+                        ),
+                    )
+                if self.is_set("command_class"):
+                    expected_nb_of_contents += 1
+                    command_class = cast(str, self.command_class)
+                    enforce(
+                        isinstance(command_class, str),
+                        "Invalid type for content 'command_class'. Expected 'str'. Found '{}'.".format(
+                            type(command_class)
+                        ),
+                    )
+                if self.is_set("supervise"):
+                    expected_nb_of_contents += 1
+                    supervise = cast(bool, self.supervise)
+                    enforce(
+                        isinstance(supervise, bool),
+                        "Invalid type for content 'supervise'. Expected 'bool'. Found '{}'.".format(
+                            type(supervise)
+                        ),
+                    )
+                if self.is_set("ready_probe"):
+                    expected_nb_of_contents += 1
+                    ready_probe = cast(str, self.ready_probe)
+                    enforce(
+                        isinstance(ready_probe, str),
+                        "Invalid type for content 'ready_probe'. Expected 'str'. Found '{}'.".format(
+                            type(ready_probe)
+                        ),
+                    )
+                if self.is_set("sink"):
+                    expected_nb_of_contents += 1
+                    sink = cast(str, self.sink)
+                    enforce(
+                        isinstance(sink, str),
+                        "Invalid type for content 'sink'. Expected 'str'. Found '{}'.".format(
+                            type(sink)
+                        ),
+                    )
+                if self.is_set("limits"):
+                    expected_nb_of_contents += 1
+                    limits = cast(Dict[str, int], self.limits)
+                    enforce(
+                        isinstance(limits, dict),
+                        "Invalid type for content 'limits'. Expected 'dict'. Found '{}'.".format(
+                            type(limits)
+                        ),
+                    )
+                    for key_of_limits, value_of_limits in limits.items():
+                        enforce(
+                            isinstance(key_of_limits, str),
+                            "Invalid type for dictionary keys in content 'limits'. Expected 'str'. Found '{}'.".format(
+                                type(key_of_limits)
+                            ),
+                        )
+                        enforce(
+                            type(value_of_limits) is int,
+                            "Invalid type for dictionary values in content 'limits'. Expected 'int'. Found '{}'.".format(
+                                type(value_of_limits)
+                            ),
+                        )
+                if self.is_set("profile"):
+                    expected_nb_of_contents += 1
+                    profile = cast(str, self.profile)
+                    enforce(
+                        isinstance(profile, str),
+                        "Invalid type for content 'profile'. Expected 'str'. Found '{}'.".format(
+                            type(profile)
+                        ),
+                    )
+                if self.is_set("compress_output"):
+                    expected_nb_of_contents += 1
+                    compress_output = cast(bool, self.compress_output)
+                    enforce(
+                        isinstance(compress_output, bool),
+                        "Invalid type for content 'compress_output'. Expected 'bool'. Found '{}'.".format(
+                            type(compress_output)
+                        ),
+                    )
+                if self.is_set("open_stdin"):
+                    expected_nb_of_contents += 1
+                    open_stdin = cast(bool, self.open_stdin)
+                    enforce(
+                        isinstance(open_stdin, bool),
+                        "Invalid type for content 'open_stdin'. Expected 'bool'. Found '{}'.".format(
+                            type(open_stdin)
+                        ),
+                    )
+                if self.is_set("cache_ttl"):
+                    expected_nb_of_contents += 1
+                    cache_ttl = cast(float, self.cache_ttl)
+                    enforce(
+                        isinstance(cache_ttl, float),
+                        "Invalid type for content 'cache_ttl'. Expected 'float'. Found '{}'.".format(
+                            type(cache_ttl)
+                        ),
+                    )
+                if self.is_set("cache_env"):
+                    expected_nb_of_contents += 1
+                    cache_env = cast(Tuple[str, ...], self.cache_env)
+                    enforce(
+                        isinstance(cache_env, tuple),
+                        "Invalid type for content 'cache_env'. Expected 'tuple'. Found '{}'.".format(
+                            type(cache_env)
+                        ),
+                    )
+                    enforce(
+                        all(isinstance(element, str) for element in cache_env),
+                        "Invalid type for tuple elements in content 'cache_env'. Expected 'str'.",
+                    )
+                if self.is_set("cache_files"):
+                    expected_nb_of_contents += 1
+                    cache_files = cast(Tuple[str, ...], self.cache_files)
+                    enforce(
+                        isinstance(cache_files, tuple),
+                        "Invalid type for content 'cache_files'. Expected 'tuple'. Found '{}'.".format(
+                            type(cache_files)
+                        ),
+                    )
+                    enforce(
+                        all(isinstance(element, str) for element in cache_files),
+                        "Invalid type for tuple elements in content 'cache_files'. Expected 'str'.",
+                    )
+            elif self.performative == ShellCommandMessage.Performative.EXECUTE_BATCH:
+                expected_nb_of_contents = 1
+                enforce(
+                    isinstance(self.commands, tuple),
+                    "Invalid type for content 'commands'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.commands)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.commands),
+                    "Invalid type for tuple elements in content 'commands'. Expected 'str'.",
+                )
+                if self.is_set("parallelism"):
+                    expected_nb_of_contents += 1
+                    parallelism = cast(int, self.parallelism)
+                    enforce(
+                        type(parallelism) is int,
+                        "Invalid type for content 'parallelism'. Expected 'int'. Found '{}'.".format(
+                            type(parallelism)
+                        ),
+                    )
+                if self.is_set("timeout"):
+                    expected_nb_of_contents += 1
+                    timeout = cast(int, self.timeout)
+                    enforce(
+                        type(timeout) is int,
+                        "Invalid type for content 'timeout'. Expected 'int'. Found '{}'.".format(
+                            type(timeout)
+                        ),
+                    )
+                if self.is_set("env_vars"):
+                    expected_nb_of_contents += 1
+                    env_vars = cast(bytes, self.env_vars)
+                    enforce(
+                        isinstance(env_vars, bytes),
+                        "Invalid type for content 'env_vars'. Expected 'bytes'. Found '{}'.".format(
+                            type(env_vars)
+                        ),
+                    )
+                if self.is_set("priority"):
+                    expected_nb_of_contents += 1
+                    priority = cast(int, self.priority)
+                    enforce(
+                        type(priority) is int,
+                        "Invalid type for content 'priority'. Expected 'int'. Found '{}'.".format(
+                            type(priority)
+                        ),
+                    )
+                if self.is_set("command_class"):
+                    expected_nb_of_contents += 1
+                    command_class = cast(str, self.command_class)
+                    enforce(
+                        isinstance(command_class, str),
+                        "Invalid type for content 'command_class'. Expected 'str'. Found '{}'.".format(
+                            type(command_class)
+                        ),
+                    )
+            elif self.performative == ShellCommandMessage.Performative.EXECUTE_PIPELINE:
+                expected_nb_of_contents = 1
+                enforce(
+                    isinstance(self.stages, tuple),
+                    "Invalid type for content 'stages'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.stages)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.stages),
+                    "Invalid type for tuple elements in content 'stages'. Expected 'str'.",
+                )
+                if self.is_set("timeout"):
+                    expected_nb_of_contents += 1
+                    timeout = cast(int, self.timeout)
+                    enforce(
+                        type(timeout) is int,
+                        "Invalid type for content 'timeout'. Expected 'int'. Found '{}'.".format(
+                            type(timeout)
+                        ),
+                    )
+                if self.is_set("env_vars"):
+                    expected_nb_of_contents += 1
+                    env_vars = cast(bytes, self.env_vars)
+                    enforce(
+                        isinstance(env_vars, bytes),
+                        "Invalid type for content 'env_vars'. Expected 'bytes'. Found '{}'.".format(
+                            type(env_vars)
+                        ),
+                    )
+                if self.is_set("stream_output"):
+                    expected_nb_of_contents += 1
+                    stream_output = cast(bool, self.stream_output)
+                    enforce(
+                        isinstance(stream_output, bool),
+                        "Invalid type for content 'stream_output'. Expected 'bool'. Found '{}'.".format(
+                            type(stream_output)
+                        ),
+                    )
+                if self.is_set("pipefail"):
+                    expected_nb_of_contents += 1
+                    pipefail = cast(bool, self.pipefail)
+                    enforce(
+                        isinstance(pipefail, bool),
+                        "Invalid type for content 'pipefail'. Expected 'bool'. Found '{}'.".format(
+                            type(pipefail)
+                        ),
+                    )
+                if self.is_set("priority"):
+                    expected_nb_of_contents += 1
+                    priority = cast(int, self.priority)
+                    enforce(
+                        type(priority) is int,
+                        "Invalid type for content 'priority'. Expected 'int'. Found '{}'.".format(
+                            type(priority)
+                        ),
+                    )
+                if self.is_set("command_class"):
+                    expected_nb_of_contents += 1
+                    command_class = cast(str, self.command_class)
+                    enforce(
+                        isinstance(command_class, str),
+                        "Invalid type for content 'command_class'. Expected 'str'. Found '{}'.".format(
+                            type(command_class)
+                        ),
+                    )
+            elif self.performative == ShellCommandMessage.Performative.SEND_SIGNAL:
+                expected_nb_of_contents = 1
+                if self.is_set("process_reference"):
+                    expected_nb_of_contents += 1
+                    process_reference = cast(str, self.process_reference)
+                    enforce(
+                        isinstance(process_reference, str),
+                        "Invalid type for content 'process_reference'. Expected 'str'. Found '{}'.".format(
+                            type(process_reference)
+                        ),
+                    )
+                if self.is_set("process_id"):
+                    expected_nb_of_contents += 1
+                    process_id = cast(int, self.process_id)
+                    enforce(
+                        type(process_id) is int,
+                        "Invalid type for content 'process_id'. Expected 'int'. Found '{}'.".format(
+                            type(process_id)
+                        ),
+                    )
+                enforce(
+                    type(self.signal_number) is int,
+                    "Invalid type for content 'signal_number'. Expected 'int'. Found '{}'.".format(
+                        type(self.signal_number)
+                    ),
+                )
+            elif self.performative == ShellCommandMessage.Performative.TERMINATE:
+                expected_nb_of_contents = 0
+                if self.is_set("process_reference"):
+                    expected_nb_of_contents += 1
+                    process_reference = cast(str, self.process_reference)
+                    enforce(
+                        isinstance(process_reference, str),
+                        "Invalid type for content 'process_reference'. Expected 'str'. Found '{}'.".format(
+                            type(process_reference)
+                        ),
+                    )
+                if self.is_set("process_id"):
+                    expected_nb_of_contents += 1
+                    process_id = cast(int, self.process_id)
+                    enforce(
+                        type(process_id) is int,
+                        "Invalid type for content 'process_id'. Expected 'int'. Found '{}'.".format(
+                            type(process_id)
+                        ),
+                    )
+                if self.is_set("grace_period"):
+                    expected_nb_of_contents += 1
+                    grace_period = cast(float, self.grace_period)
+                    enforce(
+                        isinstance(grace_period, float),
+                        "Invalid type for content 'grace_period'. Expected 'float'. Found '{}'.".format(
+                            type(grace_period)
+                        ),
+                    )
+            elif self.performative == ShellCommandMessage.Performative.QUERY_STATUS:
+                expected_nb_of_contents = 0
+                if self.is_set("process_reference"):
+                    expected_nb_of_contents += 1
+                    process_reference = cast(str, self.process_reference)
+                    enforce(
+                        isinstance(process_reference, str),
+                        "Invalid type for content 'process_reference'. Expected 'str'. Found '{}'.".format(
+                            type(process_reference)
+                        ),
+                    )
+                if self.is_set("process_id"):
+                    expected_nb_of_contents += 1
+                    process_id = cast(int, self.process_id)
+                    enforce(
+                        type(process_id) is int,
+                        "Invalid type for content 'process_id'. Expected 'int'. Found '{}'.".format(
+                            type(process_id)
+                        ),
+                    )
+                if self.is_set("tail_size"):
+                    expected_nb_of_contents += 1
+                    tail_size = cast(int, self.tail_size)
+                    enforce(
+                        type(tail_size) is int,
+                        "Invalid type for content 'tail_size'. Expected 'int'. Found '{}'.".format(
+                            type(tail_size)
+                        ),
+                    )
+            elif self.performative == ShellCommandMessage.Performative.WRITE_STDIN:
+                expected_nb_of_contents = 1
+                if self.is_set("process_reference"):
+                    expected_nb_of_contents += 1
+                    process_reference = cast(str, self.process_reference)
+                    enforce(
+                        isinstance(process_reference, str),
+                        "Invalid type for content 'process_reference'. Expected 'str'. Found '{}'.".format(
+                            type(process_reference)
+                        ),
+                    )
+                if self.is_set("process_id"):
+                    expected_nb_of_contents += 1
+                    process_id = cast(int, self.process_id)
+                    enforce(
+                        type(process_id) is int,
+                        "Invalid type for content 'process_id'. Expected 'int'. Found '{}'.".format(
+                            type(process_id)
+                        ),
+                    )
+                enforce(
+                    isinstance(self.data, bytes),
+                    "Invalid type for content 'data'. Expected 'bytes'. Found '{}'.".format(
+                        type(self.data)
+                    ),
+                )
+                if self.is_set("eof"):
+                    expected_nb_of_contents += 1
+                    eof = cast(bool, self.eof)
+                    enforce(
+                        isinstance(eof, bool),
+                        "Invalid type for content 'eof'. Expected 'bool'. Found '{}'.".format(
+                            type(eof)
+                        ),
+                    )
+            elif self.performative == ShellCommandMessage.Performative.QUERY_METRICS:
+                expected_nb_of_contents = 0
+            elif self.performative == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+                expected_nb_of_contents = 3
+                enforce(
+                    isinstance(self.stdout, str),
+                    "Invalid type for content 'stdout'. Expected 'str'. Found '{}'.".format(
+                        type(self.stdout)
+                    ),
+                )
+                enforce(
+                    isinstance(self.stderr, str),
+                    "Invalid type for content 'stderr'. Expected 'str'. Found '{}'.".format(
+                        type(self.stderr)
+                    ),
+                )
+                enforce(
+                    type(self.sequence) is int,
+                    "Invalid type for content 'sequence'. Expected 'int'. Found '{}'.".format(
+                        type(self.sequence)
+                    ),
+                )
+            elif self.performative == ShellCommandMessage.Performative.PROCESS_EVENT:
+                expected_nb_of_contents = 4
+                enforce(
+                    isinstance(self.event, str),
+                    "Invalid type for content 'event'. Expected 'str'. Found '{}'.".format(
+                        type(self.event)
+                    ),
+                )
+                enforce(
+                    type(self.pid) is int,
+                    "Invalid type for content 'pid'. Expected 'int'. Found '{}'.".format(
+                        type(self.pid)
+                    ),
+                )
+                enforce(
+                    type(self.restarts) is int,
+                    "Invalid type for content 'restarts'. Expected 'int'. Found '{}'.".format(
+                        type(self.restarts)
+                    ),
+                )
+                enforce(
+                    type(self.exit_code) is int,
+                    "Invalid type for content 'exit_code'. Expected 'int'. Found '{}'.".format(
+                        type(self.exit_code)
+                    ),
+                )
+                if self.is_set("message"):
+                    expected_nb_of_contents += 1
+                    message = cast(str, self.message)
+                    enforce(
+                        isinstance(message, str),
+                        "Invalid type for content 'message'. Expected 'str'. Found '{}'.".format(
+                            type(message)
+                        ),
+                    )
             elif self.performative == ShellCommandMessage.Performative.COMMAND_RESULT:
                 expected_nb_of_contents = 3
                 enforce(
@@ -311,6 +1071,245 @@ class ShellCommandMessage(Message):
                         type(self.exit_code)
                     ),
                 )
+                if self.is_set("resource_usage"):
+                    expected_nb_of_contents += 1
+                    resource_usage = cast(Dict[str, float], self.resource_usage)
+                    enforce(
+                        isinstance(resource_usage, dict),
+                        "Invalid type for content 'resource_usage'. Expected 'dict'. Found '{}'.".format(
+                            type(resource_usage)
+                        ),
+                    )
+                    for (
+                        key_of_resource_usage,
+                        value_of_resource_usage,
+                    ) in resource_usage.items():
+                        enforce(
+                            isinstance(key_of_resource_usage, str),
+                            "Invalid type for dictionary keys in content 'resource_usage'. Expected 'str'. Found '{}'.".format(
+                                type(key_of_resource_usage)
+                            ),
+                        )
+                        enforce(
+                            isinstance(value_of_resource_usage, float),
+                            "Invalid type for dictionary values in content 'resource_usage'. Expected 'float'. Found '{}'.".format(
+                                type(value_of_resource_usage)
+                            ),
+                        )
+                if self.is_set("compressed_output"):
+                    expected_nb_of_contents += 1
+                    compressed_output = cast(bytes, self.compressed_output)
+                    enforce(
+                        isinstance(compressed_output, bytes),
+                        "Invalid type for content 'compressed_output'. Expected 'bytes'. Found '{}'.".format(
+                            type(compressed_output)
+                        ),
+                    )
+                if self.is_set("stage_exit_codes"):
+                    expected_nb_of_contents += 1
+                    stage_exit_codes = cast(Tuple[int, ...], self.stage_exit_codes)
+                    enforce(
+                        isinstance(stage_exit_codes, tuple),
+                        "Invalid type for content 'stage_exit_codes'. Expected 'tuple'. Found '{}'.".format(
+                            type(stage_exit_codes)
+                        ),
+                    )
+                    enforce(
+                        all(type(element) is int for element in stage_exit_codes),
+                        "Invalid type for tuple elements in content 'stage_exit_codes'. Expected 'int'.",
+                    )
+            elif self.performative == ShellCommandMessage.Performative.BATCH_RESULT:
+                expected_nb_of_contents = 3
+                enforce(
+                    isinstance(self.exit_codes, tuple),
+                    "Invalid type for content 'exit_codes'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.exit_codes)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.exit_codes),
+                    "Invalid type for tuple elements in content 'exit_codes'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.stdouts, tuple),
+                    "Invalid type for content 'stdouts'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.stdouts)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.stdouts),
+                    "Invalid type for tuple elements in content 'stdouts'. Expected 'str'.",
+                )
+                enforce(
+                    isinstance(self.stderrs, tuple),
+                    "Invalid type for content 'stderrs'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.stderrs)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.stderrs),
+                    "Invalid type for tuple elements in content 'stderrs'. Expected 'str'.",
+                )
+                if self.is_set("resource_usage"):
+                    expected_nb_of_contents += 1
+                    resource_usage = cast(Dict[str, float], self.resource_usage)
+                    enforce(
+                        isinstance(resource_usage, dict),
+                        "Invalid type for content 'resource_usage'. Expected 'dict'. Found '{}'.".format(
+                            type(resource_usage)
+                        ),
+                    )
+                    for (
+                        key_of_resource_usage,
+                        value_of_resource_usage,
+                    ) in resource_usage.items():
+                        enforce(
+                            isinstance(key_of_resource_usage, str),
+                            "Invalid type for dictionary keys in content 'resource_usage'. Expected 'str'. Found '{}'.".format(
+                                type(key_of_resource_usage)
+                            ),
+                        )
+                        enforce(
+                            isinstance(value_of_resource_usage, float),
+                            "Invalid type for dictionary values in content 'resource_usage'. Expected 'float'. Found '{}'.".format(
+                                type(value_of_resource_usage)
+                            ),
+                        )
+            elif self.performative == ShellCommandMessage.Performative.CONTROL_RESULT:
+                expected_nb_of_contents = 2
+                enforce(
+                    isinstance(self.pids, tuple),
+                    "Invalid type for content 'pids'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.pids)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.pids),
+                    "Invalid type for tuple elements in content 'pids'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.exit_codes, tuple),
+                    "Invalid type for content 'exit_codes'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.exit_codes)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.exit_codes),
+                    "Invalid type for tuple elements in content 'exit_codes'. Expected 'int'.",
+                )
+            elif self.performative == ShellCommandMessage.Performative.STATUS_RESULT:
+                expected_nb_of_contents = 9
+                enforce(
+                    isinstance(self.pids, tuple),
+                    "Invalid type for content 'pids'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.pids)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.pids),
+                    "Invalid type for tuple elements in content 'pids'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.running, tuple),
+                    "Invalid type for content 'running'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.running)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, bool) for element in self.running),
+                    "Invalid type for tuple elements in content 'running'. Expected 'bool'.",
+                )
+                enforce(
+                    isinstance(self.exit_codes, tuple),
+                    "Invalid type for content 'exit_codes'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.exit_codes)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.exit_codes),
+                    "Invalid type for tuple elements in content 'exit_codes'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.uptimes, tuple),
+                    "Invalid type for content 'uptimes'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.uptimes)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, float) for element in self.uptimes),
+                    "Invalid type for tuple elements in content 'uptimes'. Expected 'float'.",
+                )
+                enforce(
+                    isinstance(self.bytes_emitted, tuple),
+                    "Invalid type for content 'bytes_emitted'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.bytes_emitted)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.bytes_emitted),
+                    "Invalid type for tuple elements in content 'bytes_emitted'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.cpu_times, tuple),
+                    "Invalid type for content 'cpu_times'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.cpu_times)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, float) for element in self.cpu_times),
+                    "Invalid type for tuple elements in content 'cpu_times'. Expected 'float'.",
+                )
+                enforce(
+                    isinstance(self.rss, tuple),
+                    "Invalid type for content 'rss'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.rss)
+                    ),
+                )
+                enforce(
+                    all(type(element) is int for element in self.rss),
+                    "Invalid type for tuple elements in content 'rss'. Expected 'int'.",
+                )
+                enforce(
+                    isinstance(self.stdout_tails, tuple),
+                    "Invalid type for content 'stdout_tails'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.stdout_tails)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.stdout_tails),
+                    "Invalid type for tuple elements in content 'stdout_tails'. Expected 'str'.",
+                )
+                enforce(
+                    isinstance(self.stderr_tails, tuple),
+                    "Invalid type for content 'stderr_tails'. Expected 'tuple'. Found '{}'.".format(
+                        type(self.stderr_tails)
+                    ),
+                )
+                enforce(
+                    all(isinstance(element, str) for element in self.stderr_tails),
+                    "Invalid type for tuple elements in content 'stderr_tails'. Expected 'str'.",
+                )
+            elif self.performative == ShellCommandMessage.Performative.METRICS_RESULT:
+                expected_nb_of_contents = 1
+                enforce(
+                    isinstance(self.metrics, dict),
+                    "Invalid type for content 'metrics'. Expected 'dict'. Found '{}'.".format(
+                        type(self.metrics)
+                    ),
+                )
+                for key_of_metrics, value_of_metrics in self.metrics.items():
+                    enforce(
+                        isinstance(key_of_metrics, str),
+                        "Invalid type for dictionary keys in content 'metrics'. Expected 'str'. Found '{}'.".format(
+                            type(key_of_metrics)
+                        ),
+                    )
+                    enforce(
+                        isinstance(value_of_metrics, float),
+                        "Invalid type for dictionary values in content 'metrics'. Expected 'float'. Found '{}'.".format(
+                            type(value_of_metrics)
+                        ),
+                    )
             elif self.performative == ShellCommandMessage.Performative.EXECUTION_ERROR:
                 expected_nb_of_contents = 1
                 enforce(
@@ -77,7 +77,204 @@ class ShellCommandSerializer(Serializer):
                 performative.env_vars_is_set = True
                 env_vars = msg.env_vars
                 performative.env_vars = env_vars
+            if msg.is_set("stream_output"):
+                performative.stream_output_is_set = True
+                stream_output = msg.stream_output
+                performative.stream_output = stream_output
+            if msg.is_set("await_completion"):
+                performative.await_completion_is_set = True
+                await_completion = msg.await_completion
+                performative.await_completion = await_completion
+            if msg.is_set("priority"):
+                performative.priority_is_set = True
+                priority = msg.priority
+                performative.priority = priority
+            if msg.is_set("command_class"):
+                performative.command_class_is_set = True
+                command_class = msg.command_class
+                performative.command_class = command_class
+            if msg.is_set("supervise"):
+                performative.supervise_is_set = True
+                supervise = msg.supervise
+                performative.supervise = supervise
+            if msg.is_set("ready_probe"):
+                performative.ready_probe_is_set = True
+                ready_probe = msg.ready_probe
+                performative.ready_probe = ready_probe
+            if msg.is_set("sink"):
+                performative.sink_is_set = True
+                sink = msg.sink
+                performative.sink = sink
+            if msg.is_set("limits"):
+                performative.limits_is_set = True
+                limits = msg.limits
+                performative.limits.update(limits)
+            if msg.is_set("profile"):
+                performative.profile_is_set = True
+                profile = msg.profile
+                performative.profile = profile
+            if msg.is_set("compress_output"):
+                performative.compress_output_is_set = True
+                compress_output = msg.compress_output
+                performative.compress_output = compress_output
+            if msg.is_set("open_stdin"):
+                performative.open_stdin_is_set = True
+                open_stdin = msg.open_stdin
+                performative.open_stdin = open_stdin
+            if msg.is_set("cache_ttl"):
+                performative.cache_ttl_is_set = True
+                cache_ttl = msg.cache_ttl
+                performative.cache_ttl = cache_ttl
+            if msg.is_set("cache_env"):
+                performative.cache_env_is_set = True
+                cache_env = msg.cache_env
+                performative.cache_env.extend(cache_env)
+            if msg.is_set("cache_files"):
+                performative.cache_files_is_set = True
+                cache_files = msg.cache_files
+                performative.cache_files.extend(cache_files)
             shell_command_msg.execute_command.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.EXECUTE_BATCH:
+            performative = shell_command_pb2.ShellCommandMessage.Execute_Batch_Performative()  # type: ignore
+            commands = msg.commands
+            performative.commands.extend(commands)
+            if msg.is_set("parallelism"):
+                performative.parallelism_is_set = True
+                parallelism = msg.parallelism
+                performative.parallelism = parallelism
+            if msg.is_set("timeout"):
+                performative.timeout_is_set = True
+                timeout = msg.timeout
+                performative.timeout = timeout
+            if msg.is_set("env_vars"):
+                performative.env_vars_is_set = True
+                env_vars = msg.env_vars
+                performative.env_vars = env_vars
+            if msg.is_set("priority"):
+                performative.priority_is_set = True
+                priority = msg.priority
+                performative.priority = priority
+            if msg.is_set("command_class"):
+                performative.command_class_is_set = True
+                command_class = msg.command_class
+                performative.command_class = command_class
+            shell_command_msg.execute_batch.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.EXECUTE_PIPELINE:
+            performative = shell_command_pb2.ShellCommandMessage.Execute_Pipeline_Performative()  # type: ignore
+            stages = msg.stages
+            performative.stages.extend(stages)
+            if msg.is_set("timeout"):
+                performative.timeout_is_set = True
+                timeout = msg.timeout
+                performative.timeout = timeout
+            if msg.is_set("env_vars"):
+                performative.env_vars_is_set = True
+                env_vars = msg.env_vars
+                performative.env_vars = env_vars
+            if msg.is_set("stream_output"):
+                performative.stream_output_is_set = True
+                stream_output = msg.stream_output
+                performative.stream_output = stream_output
+            if msg.is_set("pipefail"):
+                performative.pipefail_is_set = True
+                pipefail = msg.pipefail
+                performative.pipefail = pipefail
+            if msg.is_set("priority"):
+                performative.priority_is_set = True
+                priority = msg.priority
+                performative.priority = priority
+            if msg.is_set("command_class"):
+                performative.command_class_is_set = True
+                command_class = msg.command_class
+                performative.command_class = command_class
+            shell_command_msg.execute_pipeline.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.SEND_SIGNAL:
+            performative = shell_command_pb2.ShellCommandMessage.Send_Signal_Performative()  # type: ignore
+            if msg.is_set("process_reference"):
+                performative.process_reference_is_set = True
+                process_reference = msg.process_reference
+                performative.process_reference = process_reference
+            if msg.is_set("process_id"):
+                performative.process_id_is_set = True
+                process_id = msg.process_id
+                performative.process_id = process_id
+            signal_number = msg.signal_number
+            performative.signal_number = signal_number
+            shell_command_msg.send_signal.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.TERMINATE:
+            performative = shell_command_pb2.ShellCommandMessage.Terminate_Performative()  # type: ignore
+            if msg.is_set("process_reference"):
+                performative.process_reference_is_set = True
+                process_reference = msg.process_reference
+                performative.process_reference = process_reference
+            if msg.is_set("process_id"):
+                performative.process_id_is_set = True
+                process_id = msg.process_id
+                performative.process_id = process_id
+            if msg.is_set("grace_period"):
+                performative.grace_period_is_set = True
+                grace_period = msg.grace_period
+                performative.grace_period = grace_period
+            shell_command_msg.terminate.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.QUERY_STATUS:
+            performative = shell_command_pb2.ShellCommandMessage.Query_Status_Performative()  # type: ignore
+            if msg.is_set("process_reference"):
+                performative.process_reference_is_set = True
+                process_reference = msg.process_reference
+                performative.process_reference = process_reference
+            if msg.is_set("process_id"):
+                performative.process_id_is_set = True
+                process_id = msg.process_id
+                performative.process_id = process_id
+            if msg.is_set("tail_size"):
+                performative.tail_size_is_set = True
+                tail_size = msg.tail_size
+                performative.tail_size = tail_size
+            shell_command_msg.query_status.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.WRITE_STDIN:
+            performative = shell_command_pb2.ShellCommandMessage.Write_Stdin_Performative()  # type: ignore
+            if msg.is_set("process_reference"):
+                performative.process_reference_is_set = True
+                process_reference = msg.process_reference
+                performative.process_reference = process_reference
+            if msg.is_set("process_id"):
+                performative.process_id_is_set = True
+                process_id = msg.process_id
+                performative.process_id = process_id
+            data = msg.data
+            performative.data = data
+            if msg.is_set("eof"):
+                performative.eof_is_set = True
+                eof = msg.eof
+                performative.eof = eof
+            shell_command_msg.write_stdin.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.QUERY_METRICS:
+            performative = shell_command_pb2.ShellCommandMessage.Query_Metrics_Performative()  # type: ignore
+            shell_command_msg.query_metrics.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+            performative = shell_command_pb2.ShellCommandMessage.Output_Chunk_Performative()  # type: ignore
+            stdout = msg.stdout
+            performative.stdout = stdout
+            stderr = msg.stderr
+            performative.stderr = stderr
+            sequence = msg.sequence
+            performative.sequence = sequence
+            shell_command_msg.output_chunk.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.PROCESS_EVENT:
+            performative = shell_command_pb2.ShellCommandMessage.Process_Event_Performative()  # type: ignore
+            event = msg.event
+            performative.event = event
+            pid = msg.pid
+            performative.pid = pid
+            restarts = msg.restarts
+            performative.restarts = restarts
+            exit_code = msg.exit_code
+            performative.exit_code = exit_code
+            if msg.is_set("message"):
+                performative.message_is_set = True
+                message = msg.message
+                performative.message = message
+            shell_command_msg.process_event.CopyFrom(performative)
         elif performative_id == ShellCommandMessage.Performative.COMMAND_RESULT:
             performative = shell_command_pb2.ShellCommandMessage.Command_Result_Performative()  # type: ignore
             stdout = msg.stdout
@@ -86,7 +283,65 @@ class ShellCommandSerializer(Serializer):
             performative.stderr = stderr
             exit_code = msg.exit_code
             performative.exit_code = exit_code
+            if msg.is_set("resource_usage"):
+                performative.resource_usage_is_set = True
+                resource_usage = msg.resource_usage
+                performative.resource_usage.update(resource_usage)
+            if msg.is_set("compressed_output"):
+                performative.compressed_output_is_set = True
+                compressed_output = msg.compressed_output
+                performative.compressed_output = compressed_output
+            if msg.is_set("stage_exit_codes"):
+                performative.stage_exit_codes_is_set = True
+                stage_exit_codes = msg.stage_exit_codes
+                performative.stage_exit_codes.extend(stage_exit_codes)
             shell_command_msg.command_result.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.BATCH_RESULT:
+            performative = shell_command_pb2.ShellCommandMessage.Batch_Result_Performative()  # type: ignore
+            exit_codes = msg.exit_codes
+            performative.exit_codes.extend(exit_codes)
+            stdouts = msg.stdouts
+            performative.stdouts.extend(stdouts)
+            stderrs = msg.stderrs
+            performative.stderrs.extend(stderrs)
+            if msg.is_set("resource_usage"):
+                performative.resource_usage_is_set = True
+                resource_usage = msg.resource_usage
+                performative.resource_usage.update(resource_usage)
+            shell_command_msg.batch_result.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.CONTROL_RESULT:
+            performative = shell_command_pb2.ShellCommandMessage.Control_Result_Performative()  # type: ignore
+            pids = msg.pids
+            performative.pids.extend(pids)
+            exit_codes = msg.exit_codes
+            performative.exit_codes.extend(exit_codes)
+            shell_command_msg.control_result.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.STATUS_RESULT:
+            performative = shell_command_pb2.ShellCommandMessage.Status_Result_Performative()  # type: ignore
+            pids = msg.pids
+            performative.pids.extend(pids)
+            running = msg.running
+            performative.running.extend(running)
+            exit_codes = msg.exit_codes
+            performative.exit_codes.extend(exit_codes)
+            uptimes = msg.uptimes
+            performative.uptimes.extend(uptimes)
+            bytes_emitted = msg.bytes_emitted
+            performative.bytes_emitted.extend(bytes_emitted)
+            cpu_times = msg.cpu_times
+            performative.cpu_times.extend(cpu_times)
+            rss = msg.rss
+            performative.rss.extend(rss)
+            stdout_tails = msg.stdout_tails
+            performative.stdout_tails.extend(stdout_tails)
+            stderr_tails = msg.stderr_tails
+            performative.stderr_tails.extend(stderr_tails)
+            shell_command_msg.status_result.CopyFrom(performative)
+        elif performative_id == ShellCommandMessage.Performative.METRICS_RESULT:
+            performative = shell_command_pb2.ShellCommandMessage.Metrics_Result_Performative()  # type: ignore
+            metrics = msg.metrics
+            performative.metrics.update(metrics)
+            shell_command_msg.metrics_result.CopyFrom(performative)
         elif performative_id == ShellCommandMessage.Performative.EXECUTION_ERROR:
             performative = shell_command_pb2.ShellCommandMessage.Execution_Error_Performative()  # type: ignore
             error = msg.error
@@ -142,6 +397,154 @@ class ShellCommandSerializer(Serializer):
             if shell_command_pb.execute_command.env_vars_is_set:
                 env_vars = shell_command_pb.execute_command.env_vars
                 performative_content["env_vars"] = env_vars
+            if shell_command_pb.execute_command.stream_output_is_set:
+                stream_output = shell_command_pb.execute_command.stream_output
+                performative_content["stream_output"] = stream_output
+            if shell_command_pb.execute_command.await_completion_is_set:
+                await_completion = shell_command_pb.execute_command.await_completion
+                performative_content["await_completion"] = await_completion
+            if shell_command_pb.execute_command.priority_is_set:
+                priority = shell_command_pb.execute_command.priority
+                performative_content["priority"] = priority
+            if shell_command_pb.execute_command.command_class_is_set:
+                command_class = shell_command_pb.execute_command.command_class
+                performative_content["command_class"] = command_class
+            if shell_command_pb.execute_command.supervise_is_set:
+                supervise = shell_command_pb.execute_command.supervise
+                performative_content["supervise"] = supervise
+            if shell_command_pb.execute_command.ready_probe_is_set:
+                ready_probe = shell_command_pb.execute_command.ready_probe
+                performative_content["ready_probe"] = ready_probe
+            if shell_command_pb.execute_command.sink_is_set:
+                sink = shell_command_pb.execute_command.sink
+                performative_content["sink"] = sink
+            if shell_command_pb.execute_command.limits_is_set:
+                limits = shell_command_pb.execute_command.limits
+                limits_dict = dict(limits)
+                performative_content["limits"] = limits_dict
+            if shell_command_pb.execute_command.profile_is_set:
+                profile = shell_command_pb.execute_command.profile
+                performative_content["profile"] = profile
+            if shell_command_pb.execute_command.compress_output_is_set:
+                compress_output = shell_command_pb.execute_command.compress_output
+                performative_content["compress_output"] = compress_output
+            if shell_command_pb.execute_command.open_stdin_is_set:
+                open_stdin = shell_command_pb.execute_command.open_stdin
+                performative_content["open_stdin"] = open_stdin
+            if shell_command_pb.execute_command.cache_ttl_is_set:
+                cache_ttl = shell_command_pb.execute_command.cache_ttl
+                performative_content["cache_ttl"] = cache_ttl
+            if shell_command_pb.execute_command.cache_env_is_set:
+                cache_env = shell_command_pb.execute_command.cache_env
+                cache_env_tuple = tuple(cache_env)
+                performative_content["cache_env"] = cache_env_tuple
+            if shell_command_pb.execute_command.cache_files_is_set:
+                cache_files = shell_command_pb.execute_command.cache_files
+                cache_files_tuple = tuple(cache_files)
+                performative_content["cache_files"] = cache_files_tuple
+        elif performative_id == ShellCommandMessage.Performative.EXECUTE_BATCH:
+            commands = shell_command_pb.execute_batch.commands
+            commands_tuple = tuple(commands)
+            performative_content["commands"] = commands_tuple
+            if shell_command_pb.execute_batch.parallelism_is_set:
+                parallelism = shell_command_pb.execute_batch.parallelism
+                performative_content["parallelism"] = parallelism
+            if shell_command_pb.execute_batch.timeout_is_set:
+                timeout = shell_command_pb.execute_batch.timeout
+                performative_content["timeout"] = timeout
+            if shell_command_pb.execute_batch.env_vars_is_set:
+                env_vars = shell_command_pb.execute_batch.env_vars
+                performative_content["env_vars"] = env_vars
+            if shell_command_pb.execute_batch.priority_is_set:
+                priority = shell_command_pb.execute_batch.priority
+                performative_content["priority"] = priority
+            if shell_command_pb.execute_batch.command_class_is_set:
+                command_class = shell_command_pb.execute_batch.command_class
+                performative_content["command_class"] = command_class
+        elif performative_id == ShellCommandMessage.Performative.EXECUTE_PIPELINE:
+            stages = shell_command_pb.execute_pipeline.stages
+            stages_tuple = tuple(stages)
+            performative_content["stages"] = stages_tuple
+            if shell_command_pb.execute_pipeline.timeout_is_set:
+                timeout = shell_command_pb.execute_pipeline.timeout
+                performative_content["timeout"] = timeout
+            if shell_command_pb.execute_pipeline.env_vars_is_set:
+                env_vars = shell_command_pb.execute_pipeline.env_vars
+                performative_content["env_vars"] = env_vars
+            if shell_command_pb.execute_pipeline.stream_output_is_set:
+                stream_output = shell_command_pb.execute_pipeline.stream_output
+                performative_content["stream_output"] = stream_output
+            if shell_command_pb.execute_pipeline.pipefail_is_set:
+                pipefail = shell_command_pb.execute_pipeline.pipefail
+                performative_content["pipefail"] = pipefail
+            if shell_command_pb.execute_pipeline.priority_is_set:
+                priority = shell_command_pb.execute_pipeline.priority
+                performative_content["priority"] = priority
+            if shell_command_pb.execute_pipeline.command_class_is_set:
+                command_class = shell_command_pb.execute_pipeline.command_class
+                performative_content["command_class"] = command_class
+        elif performative_id == ShellCommandMessage.Performative.SEND_SIGNAL:
+            if shell_command_pb.send_signal.process_reference_is_set:
+                process_reference = shell_command_pb.send_signal.process_reference
+                performative_content["process_reference"] = process_reference
+            if shell_command_pb.send_signal.process_id_is_set:
+                process_id = shell_command_pb.send_signal.process_id
+                performative_content["process_id"] = process_id
+            signal_number = shell_command_pb.send_signal.signal_number
+            performative_content["signal_number"] = signal_number
+        elif performative_id == ShellCommandMessage.Performative.TERMINATE:
+            if shell_command_pb.terminate.process_reference_is_set:
+                process_reference = shell_command_pb.terminate.process_reference
+                performative_content["process_reference"] = process_reference
+            if shell_command_pb.terminate.process_id_is_set:
+                process_id = shell_command_pb.terminate.process_id
+                performative_content["process_id"] = process_id
+            if shell_command_pb.terminate.grace_period_is_set:
+                grace_period = shell_command_pb.terminate.grace_period
+                performative_content["grace_period"] = grace_period
+        elif performative_id == ShellCommandMessage.Performative.QUERY_STATUS:
+            if shell_command_pb.query_status.process_reference_is_set:
+                process_reference = shell_command_pb.query_status.process_reference
+                performative_content["process_reference"] = process_reference
+            if shell_command_pb.query_status.process_id_is_set:
+                process_id = shell_command_pb.query_status.process_id
+                performative_content["process_id"] = process_id
+            if shell_command_pb.query_status.tail_size_is_set:
+                tail_size = shell_command_pb.query_status.tail_size
+                performative_content["tail_size"] = tail_size
+        elif performative_id == ShellCommandMessage.Performative.WRITE_STDIN:
+            if shell_command_pb.write_stdin.process_reference_is_set:
+                process_reference = shell_command_pb.write_stdin.process_reference
+                performative_content["process_reference"] = process_reference
+            if shell_command_pb.write_stdin.process_id_is_set:
+                process_id = shell_command_pb.write_stdin.process_id
+                performative_content["process_id"] = process_id
+            data = shell_command_pb.write_stdin.data
+            performative_content["data"] = data
+            if shell_command_pb.write_stdin.eof_is_set:
+                eof = shell_command_pb.write_stdin.eof
+                performative_content["eof"] = eof
+        elif performative_id == ShellCommandMessage.Performative.QUERY_METRICS:
+            pass
+        elif performative_id == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+            stdout = shell_command_pb.output_chunk.stdout
+            performative_content["stdout"] = stdout
+            stderr = shell_command_pb.output_chunk.stderr
+            performative_content["stderr"] = stderr
+            sequence = shell_command_pb.output_chunk.sequence
+            performative_content["sequence"] = sequence
+        elif performative_id == ShellCommandMessage.Performative.PROCESS_EVENT:
+            event = shell_command_pb.process_event.event
+            performative_content["event"] = event
+            pid = shell_command_pb.process_event.pid
+            performative_content["pid"] = pid
+            restarts = shell_command_pb.process_event.restarts
+            performative_content["restarts"] = restarts
+            exit_code = shell_command_pb.process_event.exit_code
+            performative_content["exit_code"] = exit_code
+            if shell_command_pb.process_event.message_is_set:
+                message = shell_command_pb.process_event.message
+                performative_content["message"] = message
         elif performative_id == ShellCommandMessage.Performative.COMMAND_RESULT:
             stdout = shell_command_pb.command_result.stdout
             performative_content["stdout"] = stdout
@@ -149,6 +552,70 @@ class ShellCommandSerializer(Serializer):
             performative_content["stderr"] = stderr
             exit_code = shell_command_pb.command_result.exit_code
             performative_content["exit_code"] = exit_code
+            if shell_command_pb.command_result.resource_usage_is_set:
+                resource_usage = shell_command_pb.command_result.resource_usage
+                resource_usage_dict = dict(resource_usage)
+                performative_content["resource_usage"] = resource_usage_dict
+            if shell_command_pb.command_result.compressed_output_is_set:
+                compressed_output = shell_command_pb.command_result.compressed_output
+                performative_content["compressed_output"] = compressed_output
+            if shell_command_pb.command_result.stage_exit_codes_is_set:
+                stage_exit_codes = shell_command_pb.command_result.stage_exit_codes
+                stage_exit_codes_tuple = tuple(stage_exit_codes)
+                performative_content["stage_exit_codes"] = stage_exit_codes_tuple
+        elif performative_id == ShellCommandMessage.Performative.BATCH_RESULT:
+            exit_codes = shell_command_pb.batch_result.exit_codes
+            exit_codes_tuple = tuple(exit_codes)
+            performative_content["exit_codes"] = exit_codes_tuple
+            stdouts = shell_command_pb.batch_result.stdouts
+            stdouts_tuple = tuple(stdouts)
+            performative_content["stdouts"] = stdouts_tuple
+            stderrs = shell_command_pb.batch_result.stderrs
+            stderrs_tuple = tuple(stderrs)
+            performative_content["stderrs"] = stderrs_tuple
+            if shell_command_pb.batch_result.resource_usage_is_set:
+                resource_usage = shell_command_pb.batch_result.resource_usage
+                resource_usage_dict = dict(resource_usage)
+                performative_content["resource_usage"] = resource_usage_dict
+        elif performative_id == ShellCommandMessage.Performative.CONTROL_RESULT:
+            pids = shell_command_pb.control_result.pids
+            pids_tuple = tuple(pids)
+            performative_content["pids"] = pids_tuple
+            exit_codes = shell_command_pb.control_result.exit_codes
+            exit_codes_tuple = tuple(exit_codes)
+            performative_content["exit_codes"] = exit_codes_tuple
+        elif performative_id == ShellCommandMessage.Performative.STATUS_RESULT:
+            pids = shell_command_pb.status_result.pids
+            pids_tuple = tuple(pids)
+            performative_content["pids"] = pids_tuple
+            running = shell_command_pb.status_result.running
+            running_tuple = tuple(running)
+            performative_content["running"] = running_tuple
+            exit_codes = shell_command_pb.status_result.exit_codes
+            exit_codes_tuple = tuple(exit_codes)
+            performative_content["exit_codes"] = exit_codes_tuple
+            uptimes = shell_command_pb.status_result.uptimes
+            uptimes_tuple = tuple(uptimes)
+            performative_content["uptimes"] = uptimes_tuple
+            bytes_emitted = shell_command_pb.status_result.bytes_emitted
+            bytes_emitted_tuple = tuple(bytes_emitted)
+            performative_content["bytes_emitted"] = bytes_emitted_tuple
+            cpu_times = shell_command_pb.status_result.cpu_times
+            cpu_times_tuple = tuple(cpu_times)
+            performative_content["cpu_times"] = cpu_times_tuple
+            rss = shell_command_pb.status_result.rss
+            rss_tuple = tuple(rss)
+            performative_content["rss"] = rss_tuple
+            stdout_tails = shell_command_pb.status_result.stdout_tails
+            stdout_tails_tuple = tuple(stdout_tails)
+            performative_content["stdout_tails"] = stdout_tails_tuple
+            stderr_tails = shell_command_pb.status_result.stderr_tails
+            stderr_tails_tuple = tuple(stderr_tails)
+            performative_content["stderr_tails"] = stderr_tails_tuple
+        elif performative_id == ShellCommandMessage.Performative.METRICS_RESULT:
+            metrics = shell_command_pb.metrics_result.metrics
+            metrics_dict = dict(metrics)
+            performative_content["metrics"] = metrics_dict
         elif performative_id == ShellCommandMessage.Performative.EXECUTION_ERROR:
             pb2_error = shell_command_pb.execution_error.error
             error = ErrorCode.decode(pb2_error)
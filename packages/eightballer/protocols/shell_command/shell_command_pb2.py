@@ -4,7 +4,7 @@ from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
 from google.protobuf.internal import builder as _builder
 _sym_db = _symbol_database.Default()
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13shell_command.proto\x12$aea.eightballer.shell_command.v0_1_0"\xf3\x08\n\x13ShellCommandMessage\x12o\n\x0ecommand_result\x18\x05 \x01(\x0b2U.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Command_Result_PerformativeH\x00\x12q\n\x0fexecute_command\x18\x06 \x01(\x0b2V.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Command_PerformativeH\x00\x12q\n\x0fexecution_error\x18\x07 \x01(\x0b2V.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execution_Error_PerformativeH\x00\x1a\xca\x01\n\tErrorCode\x12e\n\nerror_code\x18\x01 \x01(\x0e2Q.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.ErrorCode.ErrorCodeEnum"V\n\rErrorCodeEnum\x12\x1d\n\x19COMMAND_EXECUTION_FAILURE\x10\x00\x12\x11\n\rTIMEOUT_ERROR\x10\x01\x12\x13\n\x0fINVALID_COMMAND\x10\x02\x1a\xb7\x02\n\x1cExecute_Command_Performative\x12\x0f\n\x07command\x18\x01 \x01(\t\x12\x0c\n\x04args\x18\x02 \x03(\t\x12t\n\x07options\x18\x03 \x03(\x0b2c.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Command_Performative.OptionsEntry\x12\x0f\n\x07timeout\x18\x04 \x01(\x05\x12\x16\n\x0etimeout_is_set\x18\x05 \x01(\x08\x12\x10\n\x08env_vars\x18\x06 \x01(\x0c\x12\x17\n\x0fenv_vars_is_set\x18\x07 \x01(\x08\x1a.\n\x0cOptionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x028\x01\x1aP\n\x1bCommand_Result_Performative\x12\x0e\n\x06stdout\x18\x01 \x01(\t\x12\x0e\n\x06stderr\x18\x02 \x01(\t\x12\x11\n\texit_code\x18\x03 \x01(\x05\x1a\x9b\x01\n\x1cExecution_Error_Performative\x12R\n\x05error\x18\x01 \x01(\x0b2C.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.ErrorCode\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x16\n\x0emessage_is_set\x18\x03 \x01(\x08B\x0e\n\x0cperformativeb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13shell_command.proto\x12$aea.eightballer.shell_command.v0_1_0"\x92/\n\x13ShellCommandMessage\x12k\n\x0cbatch_result\x18\x05 \x01(\x0b2S.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Batch_Result_PerformativeH\x00\x12o\n\x0ecommand_result\x18\x06 \x01(\x0b2U.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Command_Result_PerformativeH\x00\x12o\n\x0econtrol_result\x18\x07 \x01(\x0b2U.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Control_Result_PerformativeH\x00\x12m\n\rexecute_batch\x18\x08 \x01(\x0b2T.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Batch_PerformativeH\x00\x12q\n\x0fexecute_command\x18\t \x01(\x0b2V.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Command_PerformativeH\x00\x12s\n\x10execute_pipeline\x18\n \x01(\x0b2W.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Pipeline_PerformativeH\x00\x12q\n\x0fexecution_error\x18\x0b \x01(\x0b2V.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execution_Error_PerformativeH\x00\x12o\n\x0emetrics_result\x18\x0c \x01(\x0b2U.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Metrics_Result_PerformativeH\x00\x12k\n\x0coutput_chunk\x18\r \x01(\x0b2S.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Output_Chunk_PerformativeH\x00\x12m\n\rprocess_event\x18\x0e \x01(\x0b2T.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Process_Event_PerformativeH\x00\x12m\n\rquery_metrics\x18\x0f \x01(\x0b2T.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Query_Metrics_PerformativeH\x00\x12k\n\x0cquery_status\x18\x10 \x01(\x0b2S.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Query_Status_PerformativeH\x00\x12i\n\x0bsend_signal\x18\x11 \x01(\x0b2R.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Send_Signal_PerformativeH\x00\x12m\n\rstatus_result\x18\x12 \x01(\x0b2T.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Status_Result_PerformativeH\x00\x12e\n\tterminate\x18\x13 \x01(\x0b2P.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Terminate_PerformativeH\x00\x12i\n\x0bwrite_stdin\x18\x14 \x01(\x0b2R.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Write_Stdin_PerformativeH\x00\x1a\xca\x01\n\tErrorCode\x12e\n\nerror_code\x18\x01 \x01(\x0e2Q.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.ErrorCode.ErrorCodeEnum"V\n\rErrorCodeEnum\x12\x1d\n\x19COMMAND_EXECUTION_FAILURE\x10\x00\x12\x11\n\rTIMEOUT_ERROR\x10\x01\x12\x13\n\x0fINVALID_COMMAND\x10\x02\x1a\xde\x08\n\x1cExecute_Command_Performative\x12\x0f\n\x07command\x18\x01 \x01(\t\x12\x0c\n\x04args\x18\x02 \x03(\t\x12t\n\x07options\x18\x03 \x03(\x0b2c.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Command_Performative.OptionsEntry\x12\x0f\n\x07timeout\x18\x04 \x01(\x05\x12\x16\n\x0etimeout_is_set\x18\x05 \x01(\x08\x12\x10\n\x08env_vars\x18\x06 \x01(\x0c\x12\x17\n\x0fenv_vars_is_set\x18\x07 \x01(\x08\x12\x15\n\rstream_output\x18\x08 \x01(\x08\x12\x1c\n\x14stream_output_is_set\x18\t \x01(\x08\x12\x18\n\x10await_completion\x18\n \x01(\x08\x12\x1f\n\x17await_completion_is_set\x18\x0b \x01(\x08\x12\x10\n\x08priority\x18\x0c \x01(\x05\x12\x17\n\x0fpriority_is_set\x18\r \x01(\x08\x12\x15\n\rcommand_class\x18\x0e \x01(\t\x12\x1c\n\x14command_class_is_set\x18\x0f \x01(\x08\x12\x11\n\tsupervise\x18\x10 \x01(\x08\x12\x18\n\x10supervise_is_set\x18\x11 \x01(\x08\x12\x13\n\x0bready_probe\x18\x12 \x01(\t\x12\x1a\n\x12ready_probe_is_set\x18\x13 \x01(\x08\x12\x0c\n\x04sink\x18\x14 \x01(\t\x12\x13\n\x0bsink_is_set\x18\x15 \x01(\x08\x12r\n\x06limits\x18\x16 \x03(\x0b2b.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Execute_Command_Performative.LimitsEntry\x12\x15\n\rlimits_is_set\x18\x17 \x01(\x08\x12\x0f\n\x07profile\x18\x18 \x01(\t\x12\x16\n\x0eprofile_is_set\x18\x19 \x01(\x08\x12\x17\n\x0fcompress_output\x18\x1a \x01(\x08\x12\x1e\n\x16compress_output_is_set\x18\x1b \x01(\x08\x12\x12\n\nopen_stdin\x18\x1c \x01(\x08\x12\x19\n\x11open_stdin_is_set\x18\x1d \x01(\x08\x12\x11\n\tcache_ttl\x18\x1e \x01(\x01\x12\x18\n\x10cache_ttl_is_set\x18\x1f \x01(\x08\x12\x11\n\tcache_env\x18  \x03(\t\x12\x18\n\x10cache_env_is_set\x18! \x01(\x08\x12\x13\n\x0bcache_files\x18" \x03(\t\x12\x1a\n\x12cache_files_is_set\x18# \x01(\x08\x1a.\n\x0cOptionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x028\x01\x1a-\n\x0bLimitsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x028\x01\x1a\x93\x02\n\x1aExecute_Batch_Performative\x12\x10\n\x08commands\x18\x01 \x03(\t\x12\x13\n\x0bparallelism\x18\x02 \x01(\x05\x12\x1a\n\x12parallelism_is_set\x18\x03 \x01(\x08\x12\x0f\n\x07timeout\x18\x04 \x01(\x05\x12\x16\n\x0etimeout_is_set\x18\x05 \x01(\x08\x12\x10\n\x08env_vars\x18\x06 \x01(\x0c\x12\x17\n\x0fenv_vars_is_set\x18\x07 \x01(\x08\x12\x10\n\x08priority\x18\x08 \x01(\x05\x12\x17\n\x0fpriority_is_set\x18\t \x01(\x08\x12\x15\n\rcommand_class\x18\n \x01(\t\x12\x1c\n\x14command_class_is_set\x18\x0b \x01(\x08\x1a\xc3\x02\n\x1dExecute_Pipeline_Performative\x12\x0e\n\x06stages\x18\x01 \x03(\t\x12\x0f\n\x07timeout\x18\x02 \x01(\x05\x12\x16\n\x0etimeout_is_set\x18\x03 \x01(\x08\x12\x10\n\x08env_vars\x18\x04 \x01(\x0c\x12\x17\n\x0fenv_vars_is_set\x18\x05 \x01(\x08\x12\x15\n\rstream_output\x18\x06 \x01(\x08\x12\x1c\n\x14stream_output_is_set\x18\x07 \x01(\x08\x12\x10\n\x08pipefail\x18\x08 \x01(\x08\x12\x17\n\x0fpipefail_is_set\x18\t \x01(\x08\x12\x10\n\x08priority\x18\n \x01(\x05\x12\x17\n\x0fpriority_is_set\x18\x0b \x01(\x08\x12\x15\n\rcommand_class\x18\x0c \x01(\t\x12\x1c\n\x14command_class_is_set\x18\r \x01(\x08\x1a\x9d\x01\n\x18Send_Signal_Performative\x12\x19\n\x11process_reference\x18\x01 \x01(\t\x12 \n\x18process_reference_is_set\x18\x02 \x01(\x08\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\x12\x19\n\x11process_id_is_set\x18\x04 \x01(\x08\x12\x15\n\rsignal_number\x18\x05 \x01(\x05\x1a\xb7\x01\n\x16Terminate_Performative\x12\x19\n\x11process_reference\x18\x01 \x01(\t\x12 \n\x18process_reference_is_set\x18\x02 \x01(\x08\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\x12\x19\n\x11process_id_is_set\x18\x04 \x01(\x08\x12\x14\n\x0cgrace_period\x18\x05 \x01(\x01\x12\x1b\n\x13grace_period_is_set\x18\x06 \x01(\x08\x1a\xb4\x01\n\x19Query_Status_Performative\x12\x19\n\x11process_reference\x18\x01 \x01(\t\x12 \n\x18process_reference_is_set\x18\x02 \x01(\x08\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\x12\x19\n\x11process_id_is_set\x18\x04 \x01(\x08\x12\x11\n\ttail_size\x18\x05 \x01(\x05\x12\x18\n\x10tail_size_is_set\x18\x06 \x01(\x08\x1a\xb5\x01\n\x18Write_Stdin_Performative\x12\x19\n\x11process_reference\x18\x01 \x01(\t\x12 \n\x18process_reference_is_set\x18\x02 \x01(\x08\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\x12\x19\n\x11process_id_is_set\x18\x04 \x01(\x08\x12\x0c\n\x04data\x18\x05 \x01(\x0c\x12\x0b\n\x03eof\x18\x06 \x01(\x08\x12\x12\n\neof_is_set\x18\x07 \x01(\x08\x1a\x1c\n\x1aQuery_Metrics_Performative\x1aM\n\x19Output_Chunk_Performative\x12\x0e\n\x06stdout\x18\x01 \x01(\t\x12\x0e\n\x06stderr\x18\x02 \x01(\t\x12\x10\n\x08sequence\x18\x03 \x01(\x05\x1a\x86\x01\n\x1aProcess_Event_Performative\x12\r\n\x05event\x18\x01 \x01(\t\x12\x0b\n\x03pid\x18\x02 \x01(\x05\x12\x10\n\x08restarts\x18\x03 \x01(\x05\x12\x11\n\texit_code\x18\x04 \x01(\x05\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x16\n\x0emessage_is_set\x18\x06 \x01(\x08\x1a\xa0\x03\n\x1bCommand_Result_Performative\x12\x0e\n\x06stdout\x18\x01 \x01(\t\x12\x0e\n\x06stderr\x18\x02 \x01(\t\x12\x11\n\texit_code\x18\x03 \x01(\x05\x12\x80\x01\n\x0eresource_usage\x18\x04 \x03(\x0b2h.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Command_Result_Performative.ResourceUsageEntry\x12\x1d\n\x15resource_usage_is_set\x18\x05 \x01(\x08\x12\x19\n\x11compressed_output\x18\x06 \x01(\x0c\x12 \n\x18compressed_output_is_set\x18\x07 \x01(\x08\x12\x18\n\x10stage_exit_codes\x18\x08 \x03(\x05\x12\x1f\n\x17stage_exit_codes_is_set\x18\t \x01(\x08\x1a4\n\x12ResourceUsageEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x028\x01\x1a\xa6\x02\n\x19Batch_Result_Performative\x12\x12\n\nexit_codes\x18\x01 \x03(\x05\x12\x0f\n\x07stdouts\x18\x02 \x03(\t\x12\x0f\n\x07stderrs\x18\x03 \x03(\t\x12~\n\x0eresource_usage\x18\x04 \x03(\x0b2f.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Batch_Result_Performative.ResourceUsageEntry\x12\x1d\n\x15resource_usage_is_set\x18\x05 \x01(\x08\x1a4\n\x12ResourceUsageEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x028\x01\x1a?\n\x1bControl_Result_Performative\x12\x0c\n\x04pids\x18\x01 \x03(\x05\x12\x12\n\nexit_codes\x18\x02 \x03(\x05\x1a\xc3\x01\n\x1aStatus_Result_Performative\x12\x0c\n\x04pids\x18\x01 \x03(\x05\x12\x0f\n\x07running\x18\x02 \x03(\x08\x12\x12\n\nexit_codes\x18\x03 \x03(\x05\x12\x0f\n\x07uptimes\x18\x04 \x03(\x01\x12\x15\n\rbytes_emitted\x18\x05 \x03(\x05\x12\x11\n\tcpu_times\x18\x06 \x03(\x01\x12\x0b\n\x03rss\x18\x07 \x03(\x05\x12\x14\n\x0cstdout_tails\x18\x08 \x03(\t\x12\x14\n\x0cstderr_tails\x18\t \x03(\t\x1a\xc2\x01\n\x1bMetrics_Result_Performative\x12s\n\x07metrics\x18\x01 \x03(\x0b2b.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.Metrics_Result_Performative.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x028\x01\x1a\x9b\x01\n\x1cExecution_Error_Performative\x12R\n\x05error\x18\x01 \x01(\x0b2C.aea.eightballer.shell_command.v0_1_0.ShellCommandMessage.ErrorCode\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x16\n\x0emessage_is_set\x18\x03 \x01(\x08B\x0e\n\x0cperformativeb\x06proto3')
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'shell_command_pb2', _globals)
@@ -12,17 +12,59 @@ if not _descriptor._USE_C_DESCRIPTORS:
     DESCRIPTOR._loaded_options = None
     _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._loaded_options = None
     _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._serialized_options = b'8\x01'
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_LIMITSENTRY']._loaded_options = None
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_LIMITSENTRY']._serialized_options = b'8\x01'
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._loaded_options = None
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_options = b'8\x01'
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._loaded_options = None
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_options = b'8\x01'
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE_METRICSENTRY']._loaded_options = None
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE_METRICSENTRY']._serialized_options = b'8\x01'
     _globals['_SHELLCOMMANDMESSAGE']._serialized_start = 62
-    _globals['_SHELLCOMMANDMESSAGE']._serialized_end = 1201
-    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE']._serialized_start = 429
-    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE']._serialized_end = 631
-    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE_ERRORCODEENUM']._serialized_start = 545
-    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE_ERRORCODEENUM']._serialized_end = 631
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE']._serialized_start = 634
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE']._serialized_end = 945
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._serialized_start = 899
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._serialized_end = 945
-    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE']._serialized_start = 947
-    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE']._serialized_end = 1027
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTION_ERROR_PERFORMATIVE']._serialized_start = 1030
-    _globals['_SHELLCOMMANDMESSAGE_EXECUTION_ERROR_PERFORMATIVE']._serialized_end = 1185
\ No newline at end of file
+    _globals['_SHELLCOMMANDMESSAGE']._serialized_end = 6096
+    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE']._serialized_start = 1860
+    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE']._serialized_end = 2062
+    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE_ERRORCODEENUM']._serialized_start = 1976
+    _globals['_SHELLCOMMANDMESSAGE_ERRORCODE_ERRORCODEENUM']._serialized_end = 2062
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE']._serialized_start = 2065
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE']._serialized_end = 3183
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._serialized_start = 3090
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_OPTIONSENTRY']._serialized_end = 3136
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_LIMITSENTRY']._serialized_start = 3138
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_COMMAND_PERFORMATIVE_LIMITSENTRY']._serialized_end = 3183
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_BATCH_PERFORMATIVE']._serialized_start = 3186
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_BATCH_PERFORMATIVE']._serialized_end = 3461
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_PIPELINE_PERFORMATIVE']._serialized_start = 3464
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTE_PIPELINE_PERFORMATIVE']._serialized_end = 3787
+    _globals['_SHELLCOMMANDMESSAGE_SEND_SIGNAL_PERFORMATIVE']._serialized_start = 3790
+    _globals['_SHELLCOMMANDMESSAGE_SEND_SIGNAL_PERFORMATIVE']._serialized_end = 3947
+    _globals['_SHELLCOMMANDMESSAGE_TERMINATE_PERFORMATIVE']._serialized_start = 3950
+    _globals['_SHELLCOMMANDMESSAGE_TERMINATE_PERFORMATIVE']._serialized_end = 4133
+    _globals['_SHELLCOMMANDMESSAGE_QUERY_STATUS_PERFORMATIVE']._serialized_start = 4136
+    _globals['_SHELLCOMMANDMESSAGE_QUERY_STATUS_PERFORMATIVE']._serialized_end = 4316
+    _globals['_SHELLCOMMANDMESSAGE_WRITE_STDIN_PERFORMATIVE']._serialized_start = 4319
+    _globals['_SHELLCOMMANDMESSAGE_WRITE_STDIN_PERFORMATIVE']._serialized_end = 4500
+    _globals['_SHELLCOMMANDMESSAGE_QUERY_METRICS_PERFORMATIVE']._serialized_start = 4502
+    _globals['_SHELLCOMMANDMESSAGE_QUERY_METRICS_PERFORMATIVE']._serialized_end = 4530
+    _globals['_SHELLCOMMANDMESSAGE_OUTPUT_CHUNK_PERFORMATIVE']._serialized_start = 4532
+    _globals['_SHELLCOMMANDMESSAGE_OUTPUT_CHUNK_PERFORMATIVE']._serialized_end = 4609
+    _globals['_SHELLCOMMANDMESSAGE_PROCESS_EVENT_PERFORMATIVE']._serialized_start = 4612
+    _globals['_SHELLCOMMANDMESSAGE_PROCESS_EVENT_PERFORMATIVE']._serialized_end = 4746
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE']._serialized_start = 4749
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE']._serialized_end = 5165
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_start = 5113
+    _globals['_SHELLCOMMANDMESSAGE_COMMAND_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_end = 5165
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE']._serialized_start = 5168
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE']._serialized_end = 5462
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_start = 5113
+    _globals['_SHELLCOMMANDMESSAGE_BATCH_RESULT_PERFORMATIVE_RESOURCEUSAGEENTRY']._serialized_end = 5165
+    _globals['_SHELLCOMMANDMESSAGE_CONTROL_RESULT_PERFORMATIVE']._serialized_start = 5464
+    _globals['_SHELLCOMMANDMESSAGE_CONTROL_RESULT_PERFORMATIVE']._serialized_end = 5527
+    _globals['_SHELLCOMMANDMESSAGE_STATUS_RESULT_PERFORMATIVE']._serialized_start = 5530
+    _globals['_SHELLCOMMANDMESSAGE_STATUS_RESULT_PERFORMATIVE']._serialized_end = 5725
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE']._serialized_start = 5728
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE']._serialized_end = 5922
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE_METRICSENTRY']._serialized_start = 5876
+    _globals['_SHELLCOMMANDMESSAGE_METRICS_RESULT_PERFORMATIVE_METRICSENTRY']._serialized_end = 5922
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTION_ERROR_PERFORMATIVE']._serialized_start = 5925
+    _globals['_SHELLCOMMANDMESSAGE_EXECUTION_ERROR_PERFORMATIVE']._serialized_end = 6080
\ No newline at end of file
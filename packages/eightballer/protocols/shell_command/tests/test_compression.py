@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#                                                                             --
+#
+#   Copyright 2025 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+#                                                                             --
+
+"""Test the compression of shell_command results."""
+
+import zlib
+
+import pytest
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.compression import (
+    ZLIB,
+    CODECS,
+    read_output,
+    compress_output,
+    decompress_output,
+)
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer
+
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize(("stdout", "stderr"), [("", ""), ("out\n" * 10_000, "err ✓\n"), ("", "only stderr")])
+def test_output_round_trips(codec, stdout, stderr):
+    """Test compressed output decompresses to the same streams."""
+    assert decompress_output(compress_output(stdout, stderr, codec)) == (stdout, stderr)
+
+
+def test_unknown_codec_is_refused():
+    """Test a codec that is unknown or not installed is refused."""
+    with pytest.raises(ValueError):
+        compress_output("out", "err", "lz4")
+
+
+def test_zlib_payload_is_plain_zlib():
+    """Test zlib payloads are readable with zlib alone."""
+    payload = zlib.decompress(compress_output("out", "err", ZLIB))
+    assert payload == b"\x00\x00\x00\x03outerr"
+
+
+def test_read_output_of_plain_and_compressed_results():
+    """Test read_output gives the output of a result whether it is compressed or not, through serialization."""
+    stdout = "line of broker debug output\n" * 50_000
+    plain = ShellCommandMessage(
+        performative=ShellCommandMessage.Performative.COMMAND_RESULT, stdout=stdout, stderr="err", exit_code=0
+    )
+    compressed = ShellCommandMessage(
+        performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+        stdout="",
+        stderr="",
+        exit_code=0,
+        compressed_output=compress_output(stdout, "err"),
+    )
+    compressed_bytes = ShellCommandSerializer.encode(compressed)
+    assert len(compressed_bytes) * 100 < len(ShellCommandSerializer.encode(plain))
+    assert read_output(plain) == read_output(ShellCommandSerializer.decode(compressed_bytes)) == (stdout, "err")
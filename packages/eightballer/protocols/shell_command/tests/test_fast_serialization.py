@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#                                                                             --
+#
+#   Copyright 2025 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+#                                                                             --
+
+"""Test the fast-path serializer of the shell_command protocol."""
+
+# pylint: disable=protected-access
+from typing import List
+
+import pytest
+from aea.mail.base_pb2 import Message as ProtobufMessage  # type: ignore
+
+from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.protocols.shell_command.custom_types import ErrorCode
+from packages.eightballer.protocols.shell_command.serialization import ShellCommandSerializer
+from packages.eightballer.protocols.shell_command.fast_serialization import (
+    FastShellCommandSerializer,
+    TrustedShellCommandMessage,
+    build_trusted_message,
+)
+from packages.eightballer.protocols.shell_command.tests.test_shell_command_messages import TestMessageShellCommand
+
+
+# the logger the consistency checks of generated messages report their failures on
+MESSAGE_LOGGER = "aea.packages.eightballer.protocols.shell_command.message"
+
+
+def build_messages() -> List[ShellCommandMessage]:
+    """Build the messages of the protocol test case along with edge cases of the wire format."""
+    messages = TestMessageShellCommand().build_messages()
+    messages += [
+        ShellCommandMessage(
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND, command="", args=(), options={}
+        ),
+        ShellCommandMessage(
+            performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
+            command="ünïcode ✓",
+            args=("a" * 300, ""),
+            options={"key": "välue", "": ""},
+            timeout=0,
+            priority=-5,
+        ),
+        ShellCommandMessage(
+            performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+            dialogue_reference=("", "x" * 200),
+            message_id=-3,
+            target=2**31 - 1,
+            stdout="",
+            stderr="",
+            sequence=0,
+        ),
+        ShellCommandMessage(
+            performative=ShellCommandMessage.Performative.COMMAND_RESULT,
+            dialogue_reference=("starter", ""),
+            message_id=2,
+            target=1,
+            stdout="out\n" * 10_000,
+            stderr="",
+            exit_code=-9,
+            resource_usage={},
+        ),
+        ShellCommandMessage(
+            performative=ShellCommandMessage.Performative.EXECUTION_ERROR, error=ErrorCode.INVALID_COMMAND
+        ),
+    ]
+    return messages
+
+
+@pytest.mark.parametrize("message", build_messages(), ids=lambda message: message.performative.value)
+def test_encode_matches_generated_serializer(message):
+    """Test the fast encoding is byte-for-byte the generated one."""
+    assert FastShellCommandSerializer.encode(message) == ShellCommandSerializer.encode(message)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+@pytest.mark.parametrize("message", build_messages(), ids=lambda message: message.performative.value)
+def test_decode_matches_generated_serializer(message, trusted):
+    """Test the fast decoding gives the message the generated one gives."""
+    encoded = ShellCommandSerializer.encode(message)
+    expected = ShellCommandSerializer.decode(encoded)
+    decoded = FastShellCommandSerializer.decode(encoded, trusted=trusted)
+    assert type(decoded) is ShellCommandMessage
+    assert decoded == expected
+    assert decoded._body == expected._body
+
+
+def test_decode_falls_back_on_unknown_fields():
+    """Test bytes the codec does not parse by hand are decoded by the generated serializer."""
+    message = build_messages()[-1]
+    envelope = ProtobufMessage()
+    envelope.ParseFromString(ShellCommandSerializer.encode(message))
+    # an unknown varint field, number 9, at the end of the dialogue message
+    dialogue_message = envelope.dialogue_message.SerializeToString() + b"\x48\x01"
+    encoded = b"\x12" + bytes((len(dialogue_message),)) + dialogue_message
+    assert FastShellCommandSerializer.decode(encoded) == ShellCommandSerializer.decode(encoded)
+
+
+def test_trusted_message_skips_consistency_checks(caplog):
+    """Test trusted messages are plain messages built without the consistency checks."""
+    message = TrustedShellCommandMessage(
+        performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+        dialogue_reference=("a", "b"),
+        message_id=2,
+        target=1,
+        stdout="out",
+        stderr="err",
+        sequence=1,
+    )
+    assert type(message) is ShellCommandMessage
+    assert message.stdout == "out" and message.sequence == 1 and message.target == 1
+    assert message.performative is ShellCommandMessage.Performative.OUTPUT_CHUNK
+
+    def consistency_errors():
+        return [record for record in caplog.records if record.name == MESSAGE_LOGGER]
+
+    build_trusted_message(ShellCommandMessage.Performative.OUTPUT_CHUNK, stdout=1)
+    assert not consistency_errors()
+    caplog.clear()
+    ShellCommandMessage(performative=ShellCommandMessage.Performative.OUTPUT_CHUNK, stdout=1)
+    assert len(consistency_errors()) == 1
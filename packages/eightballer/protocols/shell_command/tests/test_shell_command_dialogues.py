@@ -58,4 +58,13 @@ class TestDialoguesShellCommand(BaseProtocolDialoguesTestCase):
             options={"some str": "some str"},
             timeout=12,
             env_vars=b"some_bytes",
+            stream_output=True,
+            await_completion=True,
+            priority=12,
+            command_class="some str",
+            supervise=True,
+            ready_probe="some str",
+            sink="some str",
+            limits={"some str": 12},
+            profile="some str",
         )
@@ -50,12 +50,118 @@ class TestMessageShellCommand(BaseProtocolMessagesTestCase):
                 options={"some str": "some str"},
                 timeout=12,
                 env_vars=b"some_bytes",
+                stream_output=True,
+                await_completion=True,
+                priority=12,
+                command_class="some str",
+                supervise=True,
+                ready_probe="some str",
+                sink="some str",
+                limits={"some str": 12},
+                profile="some str",
+                compress_output=True,
+                open_stdin=True,
+                cache_ttl=1.0,
+                cache_env=("some str",),
+                cache_files=("some str",),
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.EXECUTE_BATCH,
+                commands=("some str",),
+                parallelism=12,
+                timeout=12,
+                env_vars=b"some_bytes",
+                priority=12,
+                command_class="some str",
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.EXECUTE_PIPELINE,
+                stages=("some str",),
+                timeout=12,
+                env_vars=b"some_bytes",
+                stream_output=True,
+                pipefail=True,
+                priority=12,
+                command_class="some str",
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.SEND_SIGNAL,
+                process_reference="some str",
+                process_id=12,
+                signal_number=12,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.TERMINATE,
+                process_reference="some str",
+                process_id=12,
+                grace_period=1.0,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.QUERY_STATUS,
+                process_reference="some str",
+                process_id=12,
+                tail_size=12,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.WRITE_STDIN,
+                process_reference="some str",
+                process_id=12,
+                data=b"some_bytes",
+                eof=True,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.QUERY_METRICS,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.OUTPUT_CHUNK,
+                stdout="some str",
+                stderr="some str",
+                sequence=12,
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.PROCESS_EVENT,
+                event="some str",
+                pid=12,
+                restarts=12,
+                exit_code=12,
+                message="some str",
             ),
             ShellCommandMessage(
                 performative=ShellCommandMessage.Performative.COMMAND_RESULT,
                 stdout="some str",
                 stderr="some str",
                 exit_code=12,
+                resource_usage={"some str": 1.0},
+                compressed_output=b"some_bytes",
+                stage_exit_codes=(12,),
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.BATCH_RESULT,
+                exit_codes=(12,),
+                stdouts=("some str",),
+                stderrs=("some str",),
+                resource_usage={"some str": 1.0},
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.CONTROL_RESULT,
+                pids=(12,),
+                exit_codes=(12,),
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.STATUS_RESULT,
+                pids=(12,),
+                running=(True,),
+                exit_codes=(12,),
+                uptimes=(1.0,),
+                bytes_emitted=(12,),
+                cpu_times=(1.0,),
+                rss=(12,),
+                stdout_tails=("some str",),
+                stderr_tails=("some str",),
+            ),
+            ShellCommandMessage(
+                performative=ShellCommandMessage.Performative.METRICS_RESULT,
+                metrics={"some str": 1.0},
             ),
             ShellCommandMessage(
                 performative=ShellCommandMessage.Performative.EXECUTION_ERROR,
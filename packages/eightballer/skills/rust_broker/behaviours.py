@@ -22,13 +22,22 @@ import json
 from subprocess import Popen
 from pathlib import Path
 import subprocess
-import sys
-from typing import cast
+from typing import Dict, cast
 
 import psutil
 from aea.skills.behaviours import TickerBehaviour
+from aea.configurations.base import PublicId
 
-from packages.eightballer.skills.rust_broker.dialogues import PrometheusDialogues, ShellCommandDialogues
+from packages.eightballer.skills.rust_broker.dialogues import (
+    HttpDialogues,
+    PrometheusDialogues,
+    ShellCommandDialogues,
+)
+from packages.eightballer.skills.rust_broker.fleet import BrokerFleetModel, BrokerInstance
+from packages.eightballer.skills.rust_broker.strategy import DataRequestModel
+from packages.eightballer.skills.rust_broker.scores import SCORES_PATH, PROMETHEUS_METRICS as SCORE_METRICS
+from packages.eightballer.skills.rust_broker.lifecycle import BROKER_READY_KEY, PROMETHEUS_METRICS
+from packages.eightballer.protocols.http.message import HttpMessage
 from packages.eightballer.protocols.prometheus.message import PrometheusMessage
 from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
 from packages.eightballer.connections.prometheus.connection import (
@@ -37,6 +46,11 @@ from packages.eightballer.connections.prometheus.connection import (
 from packages.eightballer.connections.shell_command.connection import (
     CONNECTION_ID as SHELL_CONNECTION_ID,
 )
+from packages.eightballer.connections.shell_command.metrics import parse_metric_key, prometheus_metrics
+
+
+BROKER_PORTS_KEY = "broker_ports"
+HTTP_CLIENT_CONNECTION_ID = PublicId.from_str("eightballer/http_client:0.1.0")
 
 
 class PrometheusBehaviour(TickerBehaviour):
@@ -58,22 +72,21 @@ class PrometheusBehaviour(TickerBehaviour):
                     metric["description"],
                     dict(metric["labels"]),
                 )
-
-        self.started = False
-        self.error = None
+            if prom_dialogues.shell_command_metrics:
+                for metric_name, description, labels in prometheus_metrics():
+                    self.add_prometheus_metric(metric_name, "Gauge", description, dict.fromkeys(labels, ""))
+            for metric_name, description, labels in PROMETHEUS_METRICS + SCORE_METRICS:
+                self.add_prometheus_metric(metric_name, "Gauge", description, dict.fromkeys(labels, ""))
+        self._pushed: Dict[str, float] = {}
+        self._requests_pushed = 0
+        self._encodes_pushed = 0
 
 
     def act(self) -> None:
         """Implement the act."""
 
-
-        if self.error is not None:
-            self.context.logger.error(self.error)
-            sys.exit(1)
-            return
-        if not self.started:
-            self.create_rust_process_message()
-            self.started = True
+        self.drive_broker_lifecycle()
+        self.export_provider_scores()
 
         memory_usage = psutil.Process().memory_info().rss / 1024**2
         # update prometheus metric
@@ -93,6 +106,57 @@ class PrometheusBehaviour(TickerBehaviour):
             labels={"agent_address": self.context.agent_address},
         )
 
+        prom_dialogues = cast(PrometheusDialogues, self.context.prometheus_dialogues)
+        if prom_dialogues.enabled and prom_dialogues.shell_command_metrics:
+            self.query_shell_command_metrics()
+        if prom_dialogues.enabled:
+            self.export_data_requests()
+
+    def export_data_requests(self) -> None:
+        """
+        Push the data requests served since the last tick, and the cost of encoding the data, to prometheus.
+
+        Requests are pushed once per tick rather than once each, so dashboards polling the data do not cost a
+        prometheus dialogue per request.
+        """
+        model = cast(DataRequestModel, self.context.data_request_model)
+        if model.requests != self._requests_pushed:
+            self.update_prometheus_metric("num_requests", "inc", float(model.requests - self._requests_pushed), {})
+            self._requests_pushed = model.requests
+        if model.encodes != self._encodes_pushed:
+            self.update_prometheus_metric("data_encodes", "set", float(model.encodes), {})
+            self.update_prometheus_metric("data_encode_seconds", "set", model.encode_seconds, {})
+            self._encodes_pushed = model.encodes
+
+    def drive_broker_lifecycle(self) -> None:
+        """
+        Spawn, probe or terminate each broker instance as its lifecycle is due, and publish the port map.
+
+        The lifecycle metrics of the instances are only pushed to prometheus when they change.
+        """
+        fleet = cast(BrokerFleetModel, self.context.broker_fleet)
+        for instance in fleet.instances:
+            lifecycle = instance.lifecycle
+            if lifecycle.should_spawn():
+                self.create_rust_process_message(instance)
+            elif lifecycle.should_terminate():
+                self.terminate_rust_process(instance)
+            for path in lifecycle.probes_due():
+                lifecycle.probe_sent(self.request_broker(instance, path), path)
+
+        self.context.shared_state[BROKER_READY_KEY] = fleet.ready
+        self.context.shared_state[BROKER_PORTS_KEY] = fleet.serving_ports()
+        if cast(PrometheusDialogues, self.context.prometheus_dialogues).enabled:
+            self.push_metrics(fleet.metrics())
+
+    def push_metrics(self, metrics: Dict[str, float]) -> None:
+        """Set gauges, by key as formatted by metric_key, pushing only the values which changed since last pushed."""
+        for key, value in metrics.items():
+            if self._pushed.get(key) != value:
+                self._pushed[key] = value
+                metric_name, labels = parse_metric_key(key)
+                self.update_prometheus_metric(metric_name, "set", value, labels)
+
 
     def __init__(self, **kwargs):
         """Initialize the behaviour."""
@@ -150,21 +214,71 @@ class PrometheusBehaviour(TickerBehaviour):
         self.context.outbox.put_message(message=message)
 
 
-    def create_rust_process_message(self) -> None:
-        """Create the rust process."""
+    def export_provider_scores(self) -> None:
+        """Scrape the scores of the providers of the serving instances, and push those which changed to prometheus."""
+        fleet = cast(BrokerFleetModel, self.context.broker_fleet)
+        for instance in fleet.instances:
+            if instance.lifecycle.ready and instance.score_board.scrape_due():
+                instance.score_board.scrape_sent(self.request_broker(instance, SCORES_PATH))
+        if cast(PrometheusDialogues, self.context.prometheus_dialogues).enabled:
+            for metric_name, value, labels in fleet.score_updates():
+                self.update_prometheus_metric(metric_name, "set", value, labels)
+
+    def create_rust_process_message(self, instance: BrokerInstance) -> None:
+        """Create the rust process of a broker instance."""
         shell_dialogues = cast(ShellCommandDialogues, self.context.shell_command_dialogues)
 
-        self.context.logger.info("Creating the rust process.")
+        self.context.logger.info(f"Creating the rust process of broker instance {instance.index} on {instance.port}.")
 
 
         msg, _ = shell_dialogues.create(
             counterparty=str(SHELL_CONNECTION_ID),
             performative=ShellCommandMessage.Performative.EXECUTE_COMMAND,
             command="./broker",
-            args=("--broker", "--port", "8080", "--host", "0.0.0.0"),
+            args=("--broker", "--port", str(instance.port), "--host", "0.0.0.0"),
             options={},
             env_vars=json.dumps({
                 "RUST_LOG": "DEBUG",
             }).encode("utf-8"),
+            sink=instance.sink,
+            supervise=True,
+            ready_probe=f"tcp://127.0.0.1:{instance.port}",
+        )
+        self.context.outbox.put_message(message=msg)
+        instance.lifecycle.spawn(msg.dialogue_reference[0])
+
+    def terminate_rust_process(self, instance: BrokerInstance) -> None:
+        """Terminate the rust process of an instance which failed to get ready or to recover, to spawn it again."""
+        shell_dialogues = cast(ShellCommandDialogues, self.context.shell_command_dialogues)
+
+        self.context.logger.warning(f"Terminating the rust process of broker instance {instance.index}.")
+        msg, _ = shell_dialogues.create(
+            counterparty=str(SHELL_CONNECTION_ID),
+            performative=ShellCommandMessage.Performative.TERMINATE,
+            process_reference=instance.lifecycle.process_reference,
+        )
+        self.context.outbox.put_message(message=msg)
+
+    def request_broker(self, instance: BrokerInstance, path: str) -> str:
+        """Request a path of a broker instance through the http client, returning the reference of the dialogue."""
+        http_dialogues = cast(HttpDialogues, self.context.http_dialogues)
+        msg, _ = http_dialogues.create(
+            counterparty=str(HTTP_CLIENT_CONNECTION_ID),
+            performative=HttpMessage.Performative.REQUEST,
+            method="GET",
+            url=instance.url(path),
+            headers="",
+            version="",
+            body=b"",
+        )
+        self.context.outbox.put_message(message=msg)
+        return msg.dialogue_reference[0]
+
+    def query_shell_command_metrics(self) -> None:
+        """Ask the shell command connection for a snapshot of its metrics, pushed to prometheus on reply."""
+        shell_dialogues = cast(ShellCommandDialogues, self.context.shell_command_dialogues)
+        msg, _ = shell_dialogues.create(
+            counterparty=str(SHELL_CONNECTION_ID),
+            performative=ShellCommandMessage.Performative.QUERY_METRICS,
         )
         self.context.outbox.put_message(message=msg)
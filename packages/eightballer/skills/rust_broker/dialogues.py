@@ -44,7 +44,29 @@ ShellCommandDialogue = BaseShellCommandDialogue
 
 HttpDialogue = BaseHttpDialogue
 PrometheusDialogue = BasePrometheusDialogue
-HttpDialogues = BaseHttpDialogues
+
+
+class HttpDialogues(Model, BaseHttpDialogues):
+    """The dialogues class keeps track of the requests served by the skill and the probes of the broker."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize dialogues."""
+        Model.__init__(self, **kwargs)
+
+        def role_from_first_message(  # pylint: disable=unused-argument
+            message: Message, receiver_address: Address
+        ) -> BaseDialogue.Role:
+            """Infer the role of the agent from an incoming/outgoing first message."""
+            # the skill is the client of the requests it sends, and the server of those it receives
+            if message.sender == receiver_address:
+                return HttpDialogue.Role.CLIENT
+            return HttpDialogue.Role.SERVER
+
+        BaseHttpDialogues.__init__(
+            self,
+            self_address=str(self.skill_id),
+            role_from_first_message=role_from_first_message,
+        )
 
 
 class PrometheusDialogues(Model, BasePrometheusDialogues):
@@ -54,6 +76,7 @@ class PrometheusDialogues(Model, BasePrometheusDialogues):
         """Initialize dialogues."""
         self.enabled = kwargs.pop("enabled", False)
         self.metrics = kwargs.pop("metrics", [])
+        self.shell_command_metrics = kwargs.pop("shell_command_metrics", False)
 
         Model.__init__(self, **kwargs)
 
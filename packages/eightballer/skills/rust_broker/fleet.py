@@ -0,0 +1,219 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the fleet of broker instances run by the rust_broker skill, one per core by default."""
+
+import os
+import time
+from typing import Any, Dict, List, Tuple, Callable, Optional
+
+from aea.skills.base import Model
+
+from packages.eightballer.skills.rust_broker.scores import (
+    DEFAULT_SCRAPE_INTERVAL,
+    DEFAULT_MAX_UPDATES_PER_TICK,
+    ScoreBoard,
+)
+from packages.eightballer.skills.rust_broker.lifecycle import (
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_PROBE_PATHS,
+    DEFAULT_PROBE_TIMEOUT,
+    DEFAULT_READY_TIMEOUT,
+    DEFAULT_BACKOFF_INITIAL,
+    DEFAULT_DEGRADED_FAILURES,
+    DEFAULT_SERVING_PROBE_INTERVAL,
+    BrokerLifecycle,
+)
+
+
+DEFAULT_BASE_PORT = 8080
+DEFAULT_INSTANCES = None
+BROKER_LOG_SINK = "logs/broker"
+
+
+def available_cores() -> int:
+    """Get the number of cores the agent may run on."""
+
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: nocover
+        return os.cpu_count() or 1
+
+
+class BrokerInstance:
+    """An instance of the broker, serving on its own port with its own lifecycle and provider scores."""
+
+    def __init__(self, index: int, port: int, lifecycle: BrokerLifecycle, score_board: ScoreBoard) -> None:
+        """Initialise the instance."""
+
+        self.index = index
+        self.port = port
+        self.lifecycle = lifecycle
+        self.score_board = score_board
+        self.labels = score_board.labels
+
+    @property
+    def sink(self) -> str:
+        """The log files the output of the instance is sunk to."""
+        return f"{BROKER_LOG_SINK}-{self.index}"
+
+    def url(self, path: str) -> str:
+        """Get the url of a path of the instance."""
+        return f"http://127.0.0.1:{self.port}{path}"
+
+
+class BrokerFleet:
+    """
+    The broker instances run by the skill, on consecutive ports from base_port.
+
+    The agent is ready once any of its instances is serving. The port map published to front proxies and
+    providers lists every instance, with its state, so load is only spread across those serving.
+    """
+
+    def __init__(
+        self,
+        base_port: int = DEFAULT_BASE_PORT,
+        instances: Optional[int] = DEFAULT_INSTANCES,
+        max_updates_per_tick: int = DEFAULT_MAX_UPDATES_PER_TICK,
+        lifecycle_kwargs: Optional[Dict[str, Any]] = None,
+        score_board_kwargs: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialise the fleet.
+
+        :param base_port: the port of the first instance, the others using the following ports.
+        :param instances: the number of instances, the number of available cores by default.
+        :param max_updates_per_tick: the number of prometheus updates of provider scores sent per tick, shared by
+            the instances.
+        :param lifecycle_kwargs: the keyword arguments of the lifecycle of each instance.
+        :param score_board_kwargs: the keyword arguments of the score board of each instance.
+        :param clock: the clock of the lifecycles and score boards.
+        """
+
+        count = available_cores() if instances is None else instances
+        if count < 1:
+            raise ValueError(f"A broker fleet runs at least one instance, got {count}.")
+        if base_port < 1 or base_port + count - 1 > 65535:
+            raise ValueError(f"Ports {base_port} to {base_port + count - 1} are not a valid port range.")
+
+        self.max_updates_per_tick = max_updates_per_tick
+        self.instances: List[BrokerInstance] = []
+        for index in range(count):
+            lifecycle = BrokerLifecycle(clock=clock, **(lifecycle_kwargs or {}))
+            score_board = ScoreBoard(labels={"instance": str(index)}, clock=clock, **(score_board_kwargs or {}))
+            self.instances.append(BrokerInstance(index, base_port + index, lifecycle, score_board))
+        self._next_update = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether any instance is serving."""
+        return any(instance.lifecycle.ready for instance in self.instances)
+
+    def by_process(self, process_reference: str) -> Optional[BrokerInstance]:
+        """Get the instance spawned by the dialogue of process_reference."""
+
+        for instance in self.instances:
+            if instance.lifecycle.process_reference == process_reference:
+                return instance
+        return None
+
+    def by_probe(self, reference: str) -> Optional[BrokerInstance]:
+        """Get the instance probed in the dialogue of reference."""
+
+        for instance in self.instances:
+            if instance.lifecycle.is_probe(reference):
+                return instance
+        return None
+
+    def by_scrape(self, reference: str) -> Optional[BrokerInstance]:
+        """Get the instance whose scores are scraped in the dialogue of reference."""
+
+        for instance in self.instances:
+            if instance.score_board.is_scrape(reference):
+                return instance
+        return None
+
+    def port_map(self) -> List[Dict[str, Any]]:
+        """Get the port, state and time to ready of each instance."""
+
+        return [
+            {
+                "instance": instance.index,
+                "port": instance.port,
+                "state": instance.lifecycle.state.value,
+                "time_to_ready": instance.lifecycle.time_to_ready,
+            }
+            for instance in self.instances
+        ]
+
+    def serving_ports(self) -> List[int]:
+        """Get the ports of the instances serving."""
+        return [instance.port for instance in self.instances if instance.lifecycle.ready]
+
+    def metrics(self) -> Dict[str, float]:
+        """Get the lifecycle metrics of every instance, labelled by instance."""
+
+        metrics: Dict[str, float] = {}
+        for instance in self.instances:
+            metrics.update(instance.lifecycle.metrics(instance.labels))
+        return metrics
+
+    def score_updates(self) -> List[Tuple[str, float, Dict[str, str]]]:
+        """
+        Take the next updates of the provider scores of the instances, max_updates_per_tick at most.
+
+        The instance taken from first rotates every tick, so that a busy instance does not starve the others.
+        """
+
+        updates: List[Tuple[str, float, Dict[str, str]]] = []
+        count = len(self.instances)
+        for offset in range(count):
+            budget = self.max_updates_per_tick - len(updates)
+            if budget <= 0:
+                break
+            updates.extend(self.instances[(self._next_update + offset) % count].score_board.updates(budget))
+        self._next_update = (self._next_update + 1) % count
+        return updates
+
+
+class BrokerFleetModel(Model, BrokerFleet):
+    """The fleet of broker instances, configured by the skill."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialise the model."""
+
+        lifecycle_kwargs = {
+            "probe_paths": tuple(kwargs.pop("probe_paths", DEFAULT_PROBE_PATHS)),
+            "probe_timeout": kwargs.pop("probe_timeout", DEFAULT_PROBE_TIMEOUT),
+            "serving_probe_interval": kwargs.pop("serving_probe_interval", DEFAULT_SERVING_PROBE_INTERVAL),
+            "backoff_initial": kwargs.pop("backoff_initial", DEFAULT_BACKOFF_INITIAL),
+            "backoff_max": kwargs.pop("backoff_max", DEFAULT_BACKOFF_MAX),
+            "ready_timeout": kwargs.pop("ready_timeout", DEFAULT_READY_TIMEOUT),
+            "degraded_failures": kwargs.pop("degraded_failures", DEFAULT_DEGRADED_FAILURES),
+        }
+        score_board_kwargs = {"scrape_interval": kwargs.pop("scrape_interval", DEFAULT_SCRAPE_INTERVAL)}
+        fleet_kwargs = {
+            "base_port": kwargs.pop("base_port", DEFAULT_BASE_PORT),
+            "instances": kwargs.pop("instances", DEFAULT_INSTANCES),
+            "max_updates_per_tick": kwargs.pop("max_updates_per_tick", DEFAULT_MAX_UPDATES_PER_TICK),
+        }
+        Model.__init__(self, **kwargs)
+        BrokerFleet.__init__(
+            self, lifecycle_kwargs=lifecycle_kwargs, score_board_kwargs=score_board_kwargs, **fleet_kwargs
+        )
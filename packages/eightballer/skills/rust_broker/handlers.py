@@ -19,13 +19,17 @@
 """This package contains a scaffold of a handler."""
 
 import json
-from typing import Any, SupportsFloat, cast
+from urllib.parse import urlparse
+from typing import Any, List, Optional, cast
 
 from rich import print
 from aea.skills.base import Handler
 from aea.protocols.base import Message
 
 from packages.eightballer.protocols.http.message import HttpMessage
+from packages.eightballer.skills.rust_broker.fleet import BrokerFleetModel
+from packages.eightballer.skills.rust_broker.strategy import DataRequestModel
+from packages.eightballer.skills.rust_broker.lifecycle import BrokerLifecycle
 from packages.eightballer.skills.rust_broker.dialogues import (
     HttpDialogue,
     HttpDialogues,
@@ -36,6 +40,11 @@ from packages.eightballer.skills.rust_broker.dialogues import (
 )
 from packages.eightballer.protocols.prometheus.message import PrometheusMessage
 from packages.eightballer.protocols.shell_command.message import ShellCommandMessage
+from packages.eightballer.connections.shell_command.metrics import prometheus_values
+
+
+READINESS_PATH = "/ready"
+PORT_MAP_PATH = "/brokers"
 
 
 class ShellCommandHandler(Handler):
@@ -57,9 +66,69 @@ class ShellCommandHandler(Handler):
         if shell_command_dialogue is None:
             self._handle_unidentified_dialogue(message)
             return
-        
-        if message.exit_code == -1:
-            self.context.logger.error(f"Shell command started! {shell_command_dialogue.last_outgoing_message.command}")
+        request = cast(ShellCommandMessage, shell_command_dialogue.last_outgoing_message)
+        if request.performative == ShellCommandMessage.Performative.QUERY_METRICS:
+            if message.performative == ShellCommandMessage.Performative.METRICS_RESULT:
+                self._handle_metrics_result(message)
+            return
+        if request.performative != ShellCommandMessage.Performative.EXECUTE_COMMAND:
+            self._handle_control_reply(message)
+            return
+
+        command = request.command
+        fleet = cast(BrokerFleetModel, self.context.broker_fleet)
+        instance = fleet.by_process(shell_command_dialogue.dialogue_label.dialogue_starter_reference)
+        lifecycle = instance.lifecycle if instance is not None else None
+        if message.performative == ShellCommandMessage.Performative.OUTPUT_CHUNK:
+            self._handle_output_chunk(message)
+        elif message.performative == ShellCommandMessage.Performative.PROCESS_EVENT:
+            self._handle_process_event(message, command, lifecycle)
+        elif message.performative == ShellCommandMessage.Performative.COMMAND_RESULT:
+            if message.exit_code == -1:
+                self.context.logger.info(f"Shell command started! {command}")
+            else:
+                self.context.logger.info(f"Shell command {command} exited with code {message.exit_code}")
+            if lifecycle is not None:
+                lifecycle.stopped()
+        elif message.performative == ShellCommandMessage.Performative.EXECUTION_ERROR:
+            self.context.logger.error(f"Shell command {command} failed: {message.error} {message.message}")
+            if lifecycle is not None:
+                lifecycle.stopped()
+
+    def _handle_control_reply(self, message: ShellCommandMessage) -> None:
+        """Log the reply to a request controlling processes, such as the termination of a broker instance."""
+        if message.performative == ShellCommandMessage.Performative.CONTROL_RESULT:
+            self.context.logger.info(f"Shell command processes {message.pids} exited with codes {message.exit_codes}")
+        elif message.performative == ShellCommandMessage.Performative.EXECUTION_ERROR:
+            # the process had already exited, its own dialogue reporting why
+            self.context.logger.warning(f"Shell command processes could not be controlled: {message.message}")
+
+    def _handle_output_chunk(self, message: ShellCommandMessage) -> None:
+        """Log a chunk of process output as a single record per stream."""
+        if message.stdout:
+            self.context.logger.debug(message.stdout.rstrip())
+        if message.stderr:
+            self.context.logger.debug(message.stderr.rstrip())
+
+    def _handle_metrics_result(self, message: ShellCommandMessage) -> None:
+        """Push the metrics of the shell command connection which changed since the last snapshot to prometheus."""
+        self.context.behaviours.prometheus_behaviour.push_metrics(prometheus_values(message.metrics))
+
+    def _handle_process_event(
+        self, message: ShellCommandMessage, command: str, lifecycle: Optional[BrokerLifecycle]
+    ) -> None:
+        """Log an event of a supervised process, moving the lifecycle of the broker on if it is the broker."""
+        if lifecycle is not None:
+            if message.event in ("started", "restarted"):
+                lifecycle.started()
+            elif message.event == "exited":
+                lifecycle.exited()
+        if message.event == "exited":
+            self.context.logger.warning(
+                f"Shell command {command} (pid {message.pid}) exited with code {message.exit_code}"
+            )
+        else:
+            self.context.logger.info(f"Shell command {command} (pid {message.pid}) {message.event}")
 
     def _handle_unidentified_dialogue(self, msg: Message) -> None:
         """Handle an unidentified dialogue."""
@@ -105,25 +174,16 @@ class PrometheusHandler(Handler):
         """Teardown the handler."""
 
 
-def find(dotted_path: str, data: dict[str, Any]) -> Any | None:
-    """Find entry at dotted_path in data."""
-
-    keys = dotted_path.split(".")
-    value = data
-    for key in keys:
-        value = value.get(key, {})
-    return None if value == {} else value
+def header_values(headers: str, name: str) -> List[str]:
+    """Get the comma separated values of a header, ignoring the weak validator prefix of ETags."""
 
-
-def is_number(value: SupportsFloat) -> bool:
-    """Test if value is a number."""
-    if value is None:
-        return False
-    try:
-        float(value)
-        return True
-    except ValueError:
-        return False
+    name = name.lower()
+    values = []
+    for line in headers.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == name:
+            values.extend(item.strip().removeprefix("W/") for item in value.split(","))
+    return values
 
 
 class HttpHandler(Handler):
@@ -153,6 +213,10 @@ class HttpHandler(Handler):
             self._handle_unidentified_dialogue(message)
             return
 
+        if message.performative == HttpMessage.Performative.RESPONSE and self._handle_broker_response(
+            message, http_dialogue.dialogue_label.dialogue_starter_reference
+        ):
+            return
         if message.performative == HttpMessage.Performative.RESPONSE and message.status_code == 200:
             self._handle_response(message)
         elif message.performative == HttpMessage.Performative.REQUEST:
@@ -160,39 +224,46 @@ class HttpHandler(Handler):
         else:
             self.context.logger.info(f"got unexpected http message: code = {message.status_code}")
 
+    def _handle_broker_response(self, http_msg: HttpMessage, reference: str) -> bool:
+        """Handle the response to a probe, or scrape, of a broker instance, returning whether it was one."""
+
+        fleet = cast(BrokerFleetModel, self.context.broker_fleet)
+        instance = fleet.by_probe(reference)
+        if instance is not None:
+            instance.lifecycle.probe_result(reference, http_msg.status_code == 200)
+            return True
+        instance = fleet.by_scrape(reference)
+        if instance is not None:
+            body = http_msg.body if http_msg.status_code == 200 else None
+            if not instance.score_board.scrape_result(reference, body):
+                self.context.logger.warning(
+                    f"Failed to scrape the provider scores of broker instance {instance.index}: "
+                    f"code = {http_msg.status_code}"
+                )
+            return True
+        return False
+
     def _handle_response(self, http_msg: HttpMessage) -> None:
         """Handle an Http response."""
 
-        model = self.context.advanced_data_request_model
-
-        msg_body = json.loads(http_msg.body)
-
-        success = False
-        for output in model.outputs:
-            json_path = output["json_path"]
-
-            # find desired output data in msg_body
-            value = cast(SupportsFloat, find(json_path, msg_body))
+        model = cast(DataRequestModel, self.context.data_request_model)
 
-            # if value is a numeric type, store it as fixed-point with number of decimals
-            if is_number(value):
-                float_value = float(value)
-                int_value = int(float_value * 10**model.decimals)
-                observation = {output["name"]: {"value": int_value, "decimals": model.decimals}}
-            elif isinstance(value, str):
-                observation = {output["name"]: {"value": value}}
-            else:
-                self.context.logger.warning(f"No valid output for {output['name']} found in response.")
-                continue
-            success = True
-            self.context.shared_state.update(observation)
-            self.context.logger.info(f"Observation: {observation}")
+        try:
+            observations, missing = model.extract(http_msg.body)
+        except ValueError as error:
+            self.context.logger.warning(f"Invalid JSON in response: {error}")
+            return
+        for name in missing:
+            self.context.logger.warning(f"No valid output for {name} found in response.")
+        if not observations:
+            return
+        self.context.shared_state.update(observations)
+        model.record(observations)
+        self.context.logger.info(f"Observations: {observations}")
 
-        if success and self.context.prometheus_dialogues.enabled:
+        if self.context.prometheus_dialogues.enabled:
             metric_name = "num_retrievals"
-            self.context.behaviours.advanced_data_request_behaviour.update_prometheus_metric(
-                metric_name, "inc", 1.0, {}
-            )
+            self.context.behaviours.prometheus_behaviour.update_prometheus_metric(metric_name, "inc", 1.0, {})
 
     def _handle_request(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
         """Handle a Http request."""
@@ -200,32 +271,63 @@ class HttpHandler(Handler):
             f"received http request with method={http_msg.method}, url={http_msg.url} and body={http_msg.body!r}"
         )
 
-        if http_msg.method == "get":
+        path = urlparse(http_msg.url).path
+        if http_msg.method == "get" and path in (READINESS_PATH, PORT_MAP_PATH):
+            self._handle_port_map(http_msg, http_dialogue, readiness=path == READINESS_PATH)
+        elif http_msg.method == "get":
             self._handle_get(http_msg, http_dialogue)
         elif http_msg.method == "post":
             self.context.logger.info("method 'post' is not supported.")
 
-    def _handle_get(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
-        """Handle a Http request of verb GET."""
-        model = self.context.data_request_model
-        outputs = [output["name"] for output in model.outputs]
-        data = {key: value for (key, value) in self.context.shared_state.items() if key in outputs}
+    def _handle_port_map(self, http_msg: HttpMessage, http_dialogue: HttpDialogue, readiness: bool) -> None:
+        """
+        Answer with the port map of the broker instances, for front proxies and providers to spread load on.
 
+        A readiness check is answered with a 503 unless an instance is serving, for load balancers to route on.
+        """
+        fleet = cast(BrokerFleetModel, self.context.broker_fleet)
+        ready = fleet.ready
+        body = {"ready": ready, "instances": fleet.port_map()}
+        status_code = 503 if readiness and not ready else 200
         http_response = http_dialogue.reply(
             performative=HttpMessage.Performative.RESPONSE,
             target_message=http_msg,
             version=http_msg.version,
-            status_code=200,
-            status_text="Success",
+            status_code=status_code,
+            status_text="Success" if status_code == 200 else "Service Unavailable",
             headers=http_msg.headers,
-            body=json.dumps(data).encode("utf-8"),
+            body=json.dumps(body).encode("utf-8"),
         )
-        self.context.logger.debug(f"responding with: {http_response}")
         self.context.outbox.put_message(message=http_response)
 
-        if self.context.prometheus_dialogues.enabled:
-            metric_name = "num_requests"
-            self.context.behaviours.prometheus_behaviour.update_prometheus_metric(metric_name, "inc", 1.0, {})
+    def _handle_get(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
+        """
+        Handle a Http request of verb GET.
+
+        The observations are served from a snapshot encoded once per version. A request whose If-None-Match
+        holds the ETag of the snapshot is answered with a 304 and no body.
+        """
+        model = cast(DataRequestModel, self.context.data_request_model)
+        body, etag = model.snapshot()
+        model.requests += 1
+        headers = f"Content-Type: application/json\nETag: {etag}"
+
+        if_none_match = header_values(http_msg.headers, "If-None-Match")
+        if etag in if_none_match or "*" in if_none_match:
+            model.not_modified += 1
+            status_code, status_text, body = 304, "Not Modified", b""
+        else:
+            status_code, status_text = 200, "Success"
+        http_response = http_dialogue.reply(
+            performative=HttpMessage.Performative.RESPONSE,
+            target_message=http_msg,
+            version=http_msg.version,
+            status_code=status_code,
+            status_text=status_text,
+            headers=headers,
+            body=body,
+        )
+        self.context.outbox.put_message(message=http_response)
 
     def _handle_unidentified_dialogue(self, msg: Message) -> None:
         """Handle an unidentified dialogue."""
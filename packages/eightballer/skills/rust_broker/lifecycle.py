@@ -0,0 +1,240 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the lifecycle of the broker run by the rust_broker skill."""
+
+import time
+from enum import Enum
+from typing import Dict, List, Tuple, Callable, Optional
+
+from packages.eightballer.connections.shell_command.metrics import metric_key
+
+
+DEFAULT_PROBE_PATHS = ("/", "/scores")
+DEFAULT_PROBE_TIMEOUT = 2.0
+DEFAULT_SERVING_PROBE_INTERVAL = 5.0
+DEFAULT_BACKOFF_INITIAL = 0.5
+DEFAULT_BACKOFF_MAX = 8.0
+DEFAULT_READY_TIMEOUT = 60.0
+DEFAULT_DEGRADED_FAILURES = 3
+
+BROKER_READY_KEY = "broker_ready"
+
+BROKER_READY = "broker_ready"
+BROKER_STATE = "broker_state"
+BROKER_TIME_TO_READY = "broker_time_to_ready_seconds"
+PROMETHEUS_METRICS = (
+    (BROKER_READY, "Whether a broker instance is serving.", ("instance",)),
+    (BROKER_STATE, "Whether a broker instance is in a state, by state.", ("instance", "state")),
+    (BROKER_TIME_TO_READY, "Time from the spawn of a broker instance to it serving.", ("instance",)),
+)
+
+
+class BrokerState(Enum):
+    """The states of the broker."""
+
+    SPAWNING = "spawning"
+    WAITING_READY = "waiting_ready"
+    SERVING = "serving"
+    DEGRADED = "degraded"
+    RESTARTING = "restarting"
+
+
+class BrokerLifecycle:
+    """
+    The state machine of the broker, driven by the events of its process and the results of http probes.
+
+    The broker is spawning until its process is started, then waiting to be ready until every probe path
+    answers with a 200. A serving broker failing a round of probes is degraded, and restarted once it fails
+    degraded_failures rounds in a row or, when waiting to be ready, after ready_timeout. Probes are repeated
+    every serving_probe_interval while serving, and with an exponential backoff otherwise.
+    """
+
+    def __init__(
+        self,
+        probe_paths: Tuple[str, ...] = DEFAULT_PROBE_PATHS,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+        serving_probe_interval: float = DEFAULT_SERVING_PROBE_INTERVAL,
+        backoff_initial: float = DEFAULT_BACKOFF_INITIAL,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        degraded_failures: int = DEFAULT_DEGRADED_FAILURES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialise the lifecycle, with a broker yet to be spawned."""
+
+        self.probe_paths = tuple(probe_paths)
+        self.probe_timeout = probe_timeout
+        self.serving_probe_interval = serving_probe_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.ready_timeout = ready_timeout
+        self.degraded_failures = degraded_failures
+        self._clock = clock
+
+        self.state = BrokerState.SPAWNING
+        self.process_reference: Optional[str] = None
+        self.spawned_at: Optional[float] = None
+        self.time_to_ready: Optional[float] = None
+        self.failures = 0
+        self.respawns = 0
+        self.next_probe_at = 0.0
+        # the broker is spawned on the first tick
+        self.respawn_at: Optional[float] = 0.0
+        self._backoff = backoff_initial
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._round: Dict[str, bool] = {}
+
+    @property
+    def ready(self) -> bool:
+        """Whether the broker is serving, and so can receive traffic."""
+        return self.state == BrokerState.SERVING
+
+    def _transition(self, state: BrokerState) -> None:
+        """Move to a state, probing it from scratch."""
+
+        self.state = state
+        self._pending.clear()
+        self._round.clear()
+        self._backoff = self.backoff_initial
+
+    def spawn(self, process_reference: str) -> None:
+        """Record the broker being spawned by the dialogue of process_reference."""
+
+        self._transition(BrokerState.SPAWNING)
+        self.process_reference = process_reference
+        self.spawned_at = self._clock()
+        self.time_to_ready = None
+        self.failures = 0
+        self.respawn_at = None
+
+    def started(self) -> None:
+        """Record the process of the broker being started, or restarted by its supervisor."""
+
+        self._transition(BrokerState.WAITING_READY)
+        if self.spawned_at is None:
+            self.spawned_at = self._clock()
+        self.next_probe_at = self._clock()
+
+    def exited(self) -> None:
+        """Record the process of the broker exiting, its supervisor restarting it."""
+
+        self._transition(BrokerState.RESTARTING)
+        self.spawned_at = self._clock()
+        self.time_to_ready = None
+
+    def stopped(self) -> None:
+        """Record the process of the broker being stopped for good, so it is spawned again after a backoff."""
+
+        self._transition(BrokerState.RESTARTING)
+        self.process_reference = None
+        self.respawns += 1
+        delay = min(self.backoff_initial * 2 ** min(self.respawns - 1, 16), self.backoff_max)
+        self.respawn_at = self._clock() + delay
+
+    def should_spawn(self) -> bool:
+        """Whether the broker is due to be spawned."""
+        return self.respawn_at is not None and self._clock() >= self.respawn_at
+
+    def should_terminate(self) -> bool:
+        """
+        Whether the broker is to be terminated, as it failed to get ready or to recover.
+
+        The broker moves on to restarting, so it is only terminated once.
+        """
+
+        now = self._clock()
+        timed_out = (
+            self.state == BrokerState.WAITING_READY
+            and self.spawned_at is not None
+            and now - self.spawned_at >= self.ready_timeout
+        )
+        failed = self.state == BrokerState.DEGRADED and self.failures >= self.degraded_failures
+        if (timed_out or failed) and self.process_reference is not None:
+            self._transition(BrokerState.RESTARTING)
+            return True
+        return False
+
+    def probes_due(self) -> List[str]:
+        """Get the paths to probe, if a round of probes is due."""
+
+        now = self._clock()
+        self._expire_probes(now)
+        probing = self.state in (BrokerState.WAITING_READY, BrokerState.SERVING, BrokerState.DEGRADED)
+        if not probing or self._pending or self._round or now < self.next_probe_at:
+            return []
+        return list(self.probe_paths)
+
+    def probe_sent(self, reference: str, path: str) -> None:
+        """Record a probe of path sent in the dialogue of reference."""
+        self._pending[reference] = (path, self._clock())
+
+    def is_probe(self, reference: str) -> bool:
+        """Whether the dialogue of reference is a probe awaiting its result."""
+        return reference in self._pending
+
+    def probe_result(self, reference: str, ok: bool) -> None:
+        """Record the result of a probe, ending the round once every path has answered."""
+
+        pending = self._pending.pop(reference, None)
+        if pending is None:
+            return
+        path, _ = pending
+        self._round[path] = ok
+        if not self._pending:
+            self._end_round()
+
+    def _expire_probes(self, now: float) -> None:
+        """Fail the probes unanswered for longer than probe_timeout."""
+
+        expired = [ref for ref, (_, sent_at) in self._pending.items() if now - sent_at >= self.probe_timeout]
+        for reference in expired:
+            self.probe_result(reference, False)
+
+    def _end_round(self) -> None:
+        """Move on the results of a complete round of probes."""
+
+        now = self._clock()
+        ok = all(self._round.values())
+        self._round.clear()
+        if ok:
+            if self.state == BrokerState.WAITING_READY and self.spawned_at is not None:
+                self.time_to_ready = now - self.spawned_at
+            if self.state != BrokerState.SERVING:
+                self._transition(BrokerState.SERVING)
+            self.failures = 0
+            self.respawns = 0
+            self.next_probe_at = now + self.serving_probe_interval
+            return
+        self.failures += 1
+        if self.state == BrokerState.SERVING:
+            self._transition(BrokerState.DEGRADED)
+        self.next_probe_at = now + self._backoff
+        self._backoff = min(self._backoff * 2, self.backoff_max)
+
+    def metrics(self, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """Get the readiness, time to ready and state of the broker, by key as formatted by metric_key."""
+
+        labels = labels or {}
+        metrics = {metric_key(BROKER_READY, labels): float(self.ready)}
+        for state in BrokerState:
+            metrics[metric_key(BROKER_STATE, {**labels, "state": state.value})] = float(state == self.state)
+        if self.time_to_ready is not None:
+            metrics[metric_key(BROKER_TIME_TO_READY, labels)] = self.time_to_ready
+        return metrics
+
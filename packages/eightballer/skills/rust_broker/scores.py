@@ -0,0 +1,182 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the scores of the providers connected to the broker, scraped from its /scores endpoint."""
+
+import json
+import math
+import time
+from typing import Dict, List, Tuple, Callable, Optional
+from collections import OrderedDict
+
+
+DEFAULT_SCRAPE_INTERVAL = 10.0
+DEFAULT_MAX_UPDATES_PER_TICK = 50
+
+SCORES_PATH = "/scores"
+PROVIDER_SCORE = "broker_provider_score"
+PROVIDERS = "broker_providers"
+PROMETHEUS_METRICS = (
+    (PROVIDER_SCORE, "Score of a provider connected to a broker instance, by provider.", ("instance", "provider")),
+    (PROVIDERS, "Number of providers connected to a broker instance.", ("instance",)),
+)
+
+# the value a series is set to once its provider disconnects
+EXPIRED = math.nan
+
+
+def parse_scores(body: bytes) -> Dict[str, float]:
+    """
+    Parse the scores of the providers served by the broker.
+
+    The scores are a list of pairs of a provider address and its score, or of objects with an address, or
+    provider, and a score. An object of scores by address is accepted as well.
+    """
+
+    data = json.loads(body)
+    if isinstance(data, dict):
+        return {str(address): float(score) for address, score in data.items()}
+    scores = {}
+    for entry in data:
+        if isinstance(entry, dict):
+            address = entry.get("address", entry.get("provider"))
+            scores[str(address)] = float(entry["score"])
+        else:
+            address, score = entry
+            scores[str(address)] = float(score)
+    return scores
+
+
+class ScoreBoard:
+    """
+    The scores of the providers connected to the broker, exported to Prometheus as they change.
+
+    Each scrape only queues updates for the providers whose score changed, and for those which disconnected
+    since, whose series are expired. The updates are coalesced by provider and sent at most
+    max_updates_per_tick at a time, so hundreds of providers do not turn into hundreds of dialogues per tick.
+    """
+
+    def __init__(
+        self,
+        scrape_interval: float = DEFAULT_SCRAPE_INTERVAL,
+        max_updates_per_tick: int = DEFAULT_MAX_UPDATES_PER_TICK,
+        labels: Optional[Dict[str, str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialise the score board, with a scrape due and the labels of the broker its series are labelled with."""
+
+        self.scrape_interval = scrape_interval
+        self.max_updates_per_tick = max_updates_per_tick
+        self.labels = dict(labels or {})
+        self._clock = clock
+
+        self.scores: Dict[str, float] = {}
+        self.scrapes = 0
+        self.next_scrape_at = 0.0
+        self._scrape: Optional[Tuple[str, float]] = None
+        self._labels: Dict[str, Dict[str, str]] = {}
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._providers_changed = False
+
+    def scrape_due(self) -> bool:
+        """Whether a scrape is due, an unanswered scrape being given up on after scrape_interval."""
+
+        now = self._clock()
+        if self._scrape is not None and now - self._scrape[1] < self.scrape_interval:
+            return False
+        return now >= self.next_scrape_at
+
+    def scrape_sent(self, reference: str) -> None:
+        """Record a scrape sent in the dialogue of reference."""
+
+        now = self._clock()
+        self._scrape = (reference, now)
+        self.next_scrape_at = now + self.scrape_interval
+
+    def is_scrape(self, reference: str) -> bool:
+        """Whether the dialogue of reference is a scrape awaiting its result."""
+        return self._scrape is not None and self._scrape[0] == reference
+
+    def scrape_result(self, reference: str, body: Optional[bytes]) -> bool:
+        """
+        Record the result of a scrape.
+
+        :param reference: the reference of the dialogue of the scrape.
+        :param body: the body of the response, or None if the scrape failed.
+        :return: whether the scores were updated, the scores being kept as they are on a failed scrape.
+        """
+
+        if not self.is_scrape(reference):
+            return False
+        self._scrape = None
+        if body is None:
+            return False
+        try:
+            scores = parse_scores(body)
+        except (ValueError, TypeError, KeyError):
+            return False
+        self.update(scores)
+        return True
+
+    def update(self, scores: Dict[str, float]) -> None:
+        """Queue the updates of the providers whose score changed, or which disconnected, since the last scrape."""
+
+        self.scrapes += 1
+        previous = self.scores
+        for address, score in scores.items():
+            if previous.get(address) != score:
+                self._pending[address] = score
+                self._pending.move_to_end(address)
+        for address in previous.keys() - scores.keys():
+            self._pending[address] = EXPIRED
+            self._pending.move_to_end(address)
+        if len(scores) != len(previous):
+            self._providers_changed = True
+        self.scores = scores
+
+    @property
+    def pending(self) -> int:
+        """The number of updates yet to be sent."""
+        return len(self._pending) + self._providers_changed
+
+    def updates(self, limit: Optional[int] = None) -> List[Tuple[str, float, Dict[str, str]]]:
+        """
+        Take the next updates to send, the name, value and labels of a metric each.
+
+        The labels of each provider are built once and reused for all its updates, until its series expires.
+
+        :param limit: the number of updates to take, max_updates_per_tick by default.
+        :return: the updates.
+        """
+
+        limit = self.max_updates_per_tick if limit is None else limit
+        updates: List[Tuple[str, float, Dict[str, str]]] = []
+        if self._providers_changed and limit > 0:
+            updates.append((PROVIDERS, float(len(self.scores)), self.labels))
+            self._providers_changed = False
+        while self._pending and len(updates) < limit:
+            address, score = self._pending.popitem(last=False)
+            if score is EXPIRED:
+                labels = self._labels.pop(address, None) or {**self.labels, "provider": address}
+            else:
+                labels = self._labels.get(address)
+                if labels is None:
+                    labels = self._labels[address] = {**self.labels, "provider": address}
+            updates.append((PROVIDER_SCORE, score, labels))
+        return updates
+
@@ -18,7 +18,12 @@
 
 """This package contains a scaffold of a model."""
 
-from typing import Any
+import re
+import json
+import math
+import time
+import hashlib
+from typing import Any, Dict, List, Tuple, Union, Optional
 
 from aea.skills.base import Model
 
@@ -32,6 +37,84 @@ DEFAULT_USE_HTTP_SERVER = False
 
 HTTP_REQUEST_METHODS = {"GET", "PUT", "POST", "PATCH", "DELETE"}
 
+PATH_SEGMENT = re.compile(r"([^\[\]]*)((?:\[-?\d+\])*)")
+PATH_INDEX = re.compile(r"\[(-?\d+)\]")
+NUMBER = re.compile(r"([+-]?)(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?", re.ASCII)
+# beyond the range of a double, a larger exponent is not a price but a way to allocate a huge int
+MAX_EXPONENT = 400
+
+Accessor = Tuple[Union[str, int], ...]
+
+
+def compile_path(json_path: str) -> Accessor:
+    """
+    Compile the path of an output into the keys and indexes it accesses, in order.
+
+    The path is a dotted path of keys, each optionally followed by array indexes, as in `data.prices[0].usd`.
+    """
+
+    accessor: List[Union[str, int]] = []
+    for segment in json_path.split("."):
+        match = PATH_SEGMENT.fullmatch(segment)
+        if match is None or not segment:
+            raise ValueError(f"invalid segment {segment!r} in json_path {json_path!r}")
+        key, indexes = match.groups()
+        if key:
+            accessor.append(key)
+        accessor.extend(int(index) for index in PATH_INDEX.findall(indexes))
+    return tuple(accessor)
+
+
+def to_fixed_point(text: str, decimals: int) -> Optional[int]:
+    """
+    Convert a decimal number to a fixed-point int with decimals, truncating any further digits.
+
+    The digits are shifted as they are, without a float round-trip, so "0.29" is exactly 29000 with 5 decimals.
+
+    :param text: the number, in decimal or exponent notation.
+    :param decimals: the number of decimals of the fixed-point int.
+    :return: the fixed-point int, or None if text is not a finite number.
+    """
+
+    # plain decimals, by far the most common, skip the regex
+    integer, _, fraction = text.partition(".")
+    sign = integer[:1]
+    digits = (integer[1:] if sign in ("-", "+") else integer) + fraction
+    if digits.isdigit() and digits.isascii():
+        return _shift(sign == "-", digits, decimals - len(fraction))
+
+    match = NUMBER.fullmatch(text.strip())
+    if match is None:
+        return None
+    sign, integer, fraction, exponent = match.groups()
+    fraction = fraction or ""
+    if not integer and not fraction:
+        return None
+    exponent = int(exponent) if exponent else 0
+    if abs(exponent) > MAX_EXPONENT:
+        return None
+    return _shift(sign == "-", integer + fraction, decimals - len(fraction) + exponent)
+
+
+def _shift(negative: bool, digits: str, shift: int) -> int:
+    """Shift decimal digits by a power of ten, truncating the digits shifted past the point."""
+
+    value = int(digits) * 10**shift if shift >= 0 else int(digits[:shift] or 0)
+    return -value if negative else value
+
+
+def fixed_point(value: Any, decimals: int) -> Optional[int]:
+    """Convert a decoded JSON number, or numeric string, to a fixed-point int with decimals."""
+
+    if isinstance(value, str):
+        return to_fixed_point(value, decimals)
+    if isinstance(value, float):
+        # the shortest repr of a float is the decimal it was decoded from
+        return to_fixed_point(repr(value), decimals) if math.isfinite(value) else None
+    if isinstance(value, int):
+        return int(value) * 10**decimals
+    return None
+
 
 class DataRequestModel(Model):
     """This class models the AdvancedDataRequest skill."""
@@ -49,6 +132,16 @@ class DataRequestModel(Model):
 
         self._validate_config()
 
+        self.observations: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.encodes = 0
+        self.encode_seconds = 0.0
+        self._encoded_version = -1
+        self._body = b""
+        self._etag = ""
+
     def _validate_config(self) -> None:  # noqa
         """Ensure the configuration settings are all valid."""
         msg = []
@@ -58,6 +151,7 @@ class DataRequestModel(Model):
             msg.append(f"'method' must be one of {HTTP_REQUEST_METHODS}")
         if not isinstance(self.body, str):
             msg.append("'body' must be provided as a string")
+        self.output_accessors: List[Tuple[str, Accessor]] = []
         if not isinstance(self.outputs, list):
             msg.append("outputs must be provided as a list")
         else:
@@ -69,6 +163,11 @@ class DataRequestModel(Model):
                         msg.append(f"output {ind} must include key 'name'")
                     if "json_path" not in output:
                         msg.append(f"output {ind} must include key 'json_path'")
+                    if "name" in output and "json_path" in output:
+                        try:
+                            self.output_accessors.append((output["name"], compile_path(output["json_path"])))
+                        except ValueError as error:
+                            msg.append(f"output {ind} has an {error}")
         if not isinstance(self.decimals, int):
             msg.append("'decimals' must be provided as an integer")
         if not isinstance(self.use_http_server, bool):
@@ -76,3 +175,66 @@ class DataRequestModel(Model):
 
         if msg:
             raise ValueError("Invalid skill configuration: " + ",".join(msg))
+
+    def extract(self, body: bytes) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Extract the observations of the outputs from the body of a response, parsed once for all of them.
+
+        Numbers and numeric strings are observed as fixed-point ints with decimals, other strings as they are.
+        Decimal numbers are decoded as their text, and integers as Python ints, so that neither is rounded to
+        the nearest double on the way.
+
+        :param body: the JSON body of the response.
+        :return: the observation of each output found, and the names of the outputs not found.
+        :raises ValueError: if the body is not valid JSON.
+        """
+
+        data = json.loads(body, parse_float=str)
+        observations: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        decimals = self.decimals
+        for name, accessor in self.output_accessors:
+            value = data
+            try:
+                for step in accessor:
+                    value = value[step]
+            except (KeyError, IndexError, TypeError):
+                missing.append(name)
+                continue
+            int_value = fixed_point(value, decimals)
+            if int_value is not None:
+                observations[name] = {"value": int_value, "decimals": decimals}
+            elif isinstance(value, str):
+                observations[name] = {"value": value}
+            else:
+                missing.append(name)
+        return observations, missing
+
+    def record(self, observations: Dict[str, Dict[str, Any]]) -> bool:
+        """Record observations of the outputs, moving on to a new version if any changed, and return whether any did."""
+
+        changed = False
+        for name, observation in observations.items():
+            if self.observations.get(name) != observation:
+                self.observations[name] = observation
+                changed = True
+        if changed:
+            self.version += 1
+        return changed
+
+    def snapshot(self) -> Tuple[bytes, str]:
+        """
+        Get the JSON body of the observations of the outputs and its ETag, encoded once per version.
+
+        The ETag is a hash of the body, rather than the version, so it stays valid across restarts of the agent.
+        """
+
+        if self._encoded_version != self.version:
+            start = time.perf_counter()
+            # not orjson, which refuses integers beyond 64 bits such as large fixed point values
+            self._body = json.dumps(self.observations).encode("utf-8")
+            self._etag = f'"{hashlib.blake2b(self._body, digest_size=8).hexdigest()}"'
+            self.encode_seconds += time.perf_counter() - start
+            self.encodes += 1
+            self._encoded_version = self.version
+        return self._body, self._etag
@@ -0,0 +1,75 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the fleet of broker instances."""
+# pylint: skip-file
+
+import pytest
+
+from packages.eightballer.skills.rust_broker.fleet import BrokerFleet, available_cores
+from packages.eightballer.skills.rust_broker.scores import PROVIDERS
+
+
+def test_fleet_defaults_to_one_instance_per_core():
+    """Test that the fleet runs an instance per available core, on consecutive ports."""
+    fleet = BrokerFleet(base_port=9000)
+    assert len(fleet.instances) == available_cores()
+    assert [instance.port for instance in fleet.instances] == list(range(9000, 9000 + available_cores()))
+    with pytest.raises(ValueError):
+        BrokerFleet(instances=0)
+    with pytest.raises(ValueError):
+        BrokerFleet(base_port=65535, instances=2)
+
+
+def test_instances_are_looked_up_and_labelled():
+    """Test that instances are found by their dialogues, and their metrics labelled by instance."""
+    fleet = BrokerFleet(base_port=9000, instances=2)
+    first, second = fleet.instances
+    first.lifecycle.spawn("first")
+    second.lifecycle.spawn("second")
+    assert fleet.by_process("second") is second
+    assert fleet.by_process("other") is None
+
+    second.lifecycle.started()
+    for path in second.lifecycle.probes_due():
+        second.lifecycle.probe_sent(path, path)
+    assert fleet.by_probe("/scores") is second
+    for path in ("/", "/scores"):
+        fleet.by_probe(path).lifecycle.probe_result(path, True)
+
+    assert fleet.ready
+    assert fleet.serving_ports() == [9001]
+    assert [entry["state"] for entry in fleet.port_map()] == ["spawning", "serving"]
+    metrics = fleet.metrics()
+    assert metrics['broker_ready{instance="0"}'] == 0.0
+    assert metrics['broker_ready{instance="1"}'] == 1.0
+    assert second.url("/scores") == "http://127.0.0.1:9001/scores"
+
+
+def test_score_updates_share_a_budget_across_instances():
+    """Test that the score updates of all instances are bounded per tick, rotating the instance served first."""
+    fleet = BrokerFleet(instances=2, max_updates_per_tick=10)
+    for instance in fleet.instances:
+        instance.score_board.update({f"0x{index}": 1.0 for index in range(20)})
+
+    first = fleet.score_updates()
+    assert len(first) == 10
+    assert {labels["instance"] for _, _, labels in first} == {"0"}
+    second = fleet.score_updates()
+    assert {labels["instance"] for _, _, labels in second} == {"1"}
+    assert (PROVIDERS, 20.0, {"instance": "1"}) in second
@@ -0,0 +1,138 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the lifecycle of the broker."""
+# pylint: skip-file
+
+from packages.eightballer.skills.rust_broker.lifecycle import BrokerState, BrokerLifecycle
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the time."""
+        return self.now
+
+
+def probe_round(lifecycle, *results):
+    """Send the due probes and answer them with results, in order."""
+    paths = lifecycle.probes_due()
+    assert len(paths) == len(results)
+    for path in paths:
+        lifecycle.probe_sent(f"probe-{path}", path)
+    for path, ok in zip(paths, results):
+        lifecycle.probe_result(f"probe-{path}", ok)
+
+
+def make_lifecycle(clock):
+    """Make a lifecycle whose broker is spawned and started."""
+    lifecycle = BrokerLifecycle(backoff_initial=1.0, backoff_max=4.0, ready_timeout=30.0, clock=clock)
+    assert lifecycle.should_spawn()
+    lifecycle.spawn("broker")
+    assert lifecycle.state == BrokerState.SPAWNING
+    assert not lifecycle.should_spawn()
+    lifecycle.started()
+    return lifecycle
+
+
+def test_broker_is_serving_once_every_path_answers():
+    """Test that the broker waits to be ready until every path answers, backing off between rounds."""
+    clock = FakeClock()
+    lifecycle = make_lifecycle(clock)
+    assert lifecycle.state == BrokerState.WAITING_READY
+
+    probe_round(lifecycle, True, False)
+    assert lifecycle.state == BrokerState.WAITING_READY
+    assert lifecycle.probes_due() == []
+    clock.now = 1.0
+    probe_round(lifecycle, True, True)
+
+    assert lifecycle.ready
+    assert lifecycle.time_to_ready == 1.0
+    assert lifecycle.metrics()["broker_ready"] == 1.0
+    assert lifecycle.metrics()['broker_state{state="serving"}'] == 1.0
+    clock.now = 5.0
+    assert lifecycle.probes_due() == []
+    clock.now = 6.0
+    assert lifecycle.probes_due() == ["/", "/scores"]
+
+
+def test_degraded_broker_recovers_or_is_restarted():
+    """Test that a serving broker failing probes is degraded, then restarted once it keeps failing."""
+    clock = FakeClock()
+    lifecycle = make_lifecycle(clock)
+    probe_round(lifecycle, True, True)
+
+    clock.now = 5.0
+    probe_round(lifecycle, False, True)
+    assert lifecycle.state == BrokerState.DEGRADED
+    clock.now = 6.0
+    probe_round(lifecycle, True, True)
+    assert lifecycle.state == BrokerState.SERVING
+
+    for now in (11.0, 12.0, 14.0):
+        clock.now = now
+        probe_round(lifecycle, False, False)
+    assert lifecycle.state == BrokerState.DEGRADED
+    assert lifecycle.should_terminate()
+    assert lifecycle.state == BrokerState.RESTARTING
+    assert not lifecycle.should_terminate()
+
+    lifecycle.stopped()
+    assert lifecycle.process_reference is None
+    assert not lifecycle.should_spawn()
+    clock.now = 15.0
+    assert lifecycle.should_spawn()
+
+
+def test_unanswered_probes_fail_and_slow_brokers_are_restarted():
+    """Test that probes time out, and a broker not ready within ready_timeout is restarted."""
+    clock = FakeClock()
+    lifecycle = make_lifecycle(clock)
+    for path in lifecycle.probes_due():
+        lifecycle.probe_sent(f"probe-{path}", path)
+    assert lifecycle.is_probe("probe-/")
+    clock.now = 2.0
+    assert lifecycle.probes_due() == []
+    assert not lifecycle.is_probe("probe-/")
+    assert lifecycle.failures == 1
+
+    clock.now = 30.0
+    assert lifecycle.should_terminate()
+
+
+def test_supervisor_restarts_reset_readiness():
+    """Test that the broker exiting is not ready until its restarted process answers the probes."""
+    clock = FakeClock()
+    lifecycle = make_lifecycle(clock)
+    probe_round(lifecycle, True, True)
+    clock.now = 3.0
+    lifecycle.exited()
+    assert lifecycle.state == BrokerState.RESTARTING
+    assert not lifecycle.ready
+    assert lifecycle.probes_due() == []
+    clock.now = 4.0
+    lifecycle.started()
+    clock.now = 4.5
+    probe_round(lifecycle, True, True)
+    assert lifecycle.time_to_ready == 1.5
@@ -0,0 +1,98 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the scores of the providers connected to the broker."""
+# pylint: skip-file
+
+import json
+import math
+
+from packages.eightballer.skills.rust_broker.scores import PROVIDERS, PROVIDER_SCORE, ScoreBoard, parse_scores
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Get the time."""
+        return self.now
+
+
+def test_parse_scores_formats():
+    """Test that pairs, objects and a mapping of scores are parsed alike."""
+    expected = {"0xa": 2.0, "0xb": 1.5}
+    assert parse_scores(json.dumps([["0xa", 2], ["0xb", 1.5]]).encode()) == expected
+    assert parse_scores(json.dumps([{"address": "0xa", "score": 2}, {"provider": "0xb", "score": "1.5"}])) == expected
+    assert parse_scores(json.dumps(expected).encode()) == expected
+
+
+def test_only_changed_and_expired_providers_are_exported():
+    """Test that a scrape only exports the scores which changed, and expires providers which disconnected."""
+    board = ScoreBoard()
+    board.update({"0xa": 1.0, "0xb": 2.0})
+    updates = board.updates()
+    assert updates[0] == (PROVIDERS, 2.0, {})
+    assert sorted(value for _, value, _ in updates[1:]) == [1.0, 2.0]
+    labels = {address: labels for _, _, labels in updates[1:] for address in labels.values()}
+
+    board.update({"0xa": 1.0, "0xb": 3.0})
+    updates = board.updates()
+    assert updates == [(PROVIDER_SCORE, 3.0, {"provider": "0xb"})]
+    assert updates[0][2] is labels["0xb"]
+
+    board.update({"0xb": 3.0})
+    (providers, expired) = board.updates()
+    assert providers == (PROVIDERS, 1.0, {})
+    assert expired[2] == {"provider": "0xa"} and math.isnan(expired[1])
+    assert board.updates() == []
+
+
+def test_updates_are_coalesced_and_bounded_per_tick():
+    """Test that updates are sent at most max_updates_per_tick at a time, with the latest score per provider."""
+    board = ScoreBoard(max_updates_per_tick=100)
+    board.update({f"0x{index}": 1.0 for index in range(300)})
+    board.update({f"0x{index}": 2.0 for index in range(300)})
+    assert board.pending == 301
+    sent = []
+    while board.pending:
+        updates = board.updates()
+        assert len(updates) <= 100
+        sent.extend(updates)
+    assert len(sent) == 301
+    assert all(value == 2.0 for name, value, _ in sent if name == PROVIDER_SCORE)
+
+
+def test_scrapes_are_paced_and_failures_keep_the_scores():
+    """Test that a scrape is due every scrape_interval, and a failed scrape keeps the last scores."""
+    clock = FakeClock()
+    board = ScoreBoard(scrape_interval=10.0, clock=clock)
+    assert board.scrape_due()
+    board.scrape_sent("scrape")
+    assert not board.scrape_due()
+    assert board.scrape_result("scrape", b'[["0xa", 1]]')
+    assert not board.scrape_result("scrape", b'[["0xa", 2]]')
+
+    clock.now = 10.0
+    assert board.scrape_due()
+    board.scrape_sent("failed")
+    assert not board.scrape_result("failed", b"not json")
+    assert board.scores == {"0xa": 1.0}
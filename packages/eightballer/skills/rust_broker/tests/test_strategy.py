@@ -0,0 +1,119 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 eightballer
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the tests of the extraction of outputs by the data request model."""
+# pylint: skip-file
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from packages.eightballer.skills.rust_broker.strategy import DataRequestModel, compile_path, to_fixed_point
+
+
+def make_model(**outputs):
+    """Make a data request model with outputs by name."""
+    outputs = [{"name": name, "json_path": json_path} for name, json_path in outputs.items()]
+    return DataRequestModel(name="data_request_model", skill_context=MagicMock(), outputs=outputs)
+
+
+def test_paths_compile_to_keys_and_indexes():
+    """Test that dotted paths with array indexes compile to their steps, and invalid paths are rejected."""
+    assert compile_path("data.prices[0][-1].usd") == ("data", "prices", 0, -1, "usd")
+    assert compile_path("[2]") == (2,)
+    with pytest.raises(ValueError):
+        compile_path("data..usd")
+    with pytest.raises(ValueError):
+        make_model(price="data[first]")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("0.29", 29000),
+        ("-12.345678", -1234567),
+        ("1.5e3", 150000000),
+        ("1e-05", 1),
+        (" 42 ", 4200000),
+        (".5", 50000),
+        ("nan", None),
+        ("1e9999", None),
+        ("", None),
+    ],
+)
+def test_numbers_convert_to_fixed_point_exactly(text, expected):
+    """Test that numeric strings are shifted to fixed-point ints without a float round-trip."""
+    assert to_fixed_point(text, 5) == expected
+
+
+def test_outputs_are_extracted_from_a_single_parse():
+    """Test that every output is extracted from the body, numbers as fixed-point ints and other strings as is."""
+    model = make_model(price="data.prices[1].usd", float_price="data.float", symbol="data.symbol", missing="data.none")
+    body = json.dumps({"data": {"prices": [{"usd": "1"}, {"usd": "0.29"}], "float": 0.29, "symbol": "ETH"}})
+
+    observations, missing = model.extract(body.encode("utf-8"))
+
+    assert observations == {
+        "price": {"value": 29000, "decimals": 5},
+        "float_price": {"value": 29000, "decimals": 5},
+        "symbol": {"value": "ETH"},
+    }
+    assert missing == ["missing"]
+    with pytest.raises(ValueError):
+        model.extract(b"not json")
+
+
+def test_numbers_are_extracted_without_losing_digits():
+    """Test that integers beyond 64 bits and decimals beyond the precision of a double are extracted exactly."""
+    model = make_model(supply="supply", price="price")
+    model.decimals = 24
+    body = b'{"supply": 123456789012345678901, "price": 0.123456789012345678901234}'
+
+    observations, _ = model.extract(body)
+
+    assert observations["supply"]["value"] == 123456789012345678901 * 10**24
+    assert observations["price"]["value"] == 123456789012345678901234
+
+
+def test_snapshot_is_encoded_once_per_version():
+    """Test that the served observations are only encoded again once an observation changes."""
+    model = make_model(price="price")
+    assert model.record({"price": {"value": 1, "decimals": 5}})
+    body, etag = model.snapshot()
+    assert json.loads(body) == {"price": {"value": 1, "decimals": 5}}
+
+    assert not model.record({"price": {"value": 1, "decimals": 5}})
+    assert model.snapshot() == (body, etag)
+    assert model.encodes == 1
+
+    assert model.record({"price": {"value": 2, "decimals": 5}})
+    changed_body, changed_etag = model.snapshot()
+    assert changed_etag != etag
+    assert model.encodes == 2
+    assert model.encode_seconds > 0
+
+
+def test_snapshot_encodes_values_beyond_64_bits():
+    """Test that fixed-point values beyond 64 bits, such as wei amounts, are served exactly."""
+    model = make_model(supply="supply")
+    observations, _ = model.extract(json.dumps({"supply": "100000000000000000000"}).encode("utf-8"))
+    assert observations["supply"]["value"] == 10**25 > 2**63
+    model.record(observations)
+    body, _ = model.snapshot()
+    assert json.loads(body) == {"supply": {"value": 10**25, "decimals": 5}}